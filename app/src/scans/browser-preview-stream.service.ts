@@ -9,13 +9,17 @@ import * as WebSocket from 'ws';
 import type { PubSubEngine } from 'graphql-subscriptions';
 import { BROWSER_PREVIEW_STREAM } from './scans.constants';
 
+/**
+ * Frame header. The JPEG itself follows as the next (binary) WebSocket message.
+ */
 export interface BrowserPreviewFrame {
   type: 'frame';
-  data: string;
   timestamp: number;
   frame_number: number;
   latency_ms: number;
   url?: string;
+  size?: number;
+  dropped?: number;
 }
 
 export interface BrowserPreviewError {
@@ -58,13 +62,36 @@ export class BrowserPreviewStreamService
     );
 
     const ws = new WebSocket(wsUrl);
+    let pendingFrame: BrowserPreviewFrame | null = null;
 
     ws.on('open', () => {
       this.logger.debug(`WebSocket connected for run ${runId}`);
     });
 
-    ws.on('message', (rawData: WebSocket.RawData) => {
+    ws.on('message', (rawData: WebSocket.RawData, isBinary: boolean) => {
       try {
+        if (isBinary) {
+          const header = pendingFrame;
+          pendingFrame = null;
+          if (!header) {
+            return;
+          }
+          const jpeg = Array.isArray(rawData)
+            ? Buffer.concat(rawData)
+            : Buffer.from(rawData as Buffer | ArrayBuffer);
+          void pubSub.publish(BROWSER_PREVIEW_STREAM, {
+            browserPreviewStream: {
+              runId,
+              frame: jpeg.toString('base64'),
+              timestamp: header.timestamp,
+              frameNumber: header.frame_number,
+              latencyMs: header.latency_ms,
+              url: header.url,
+            },
+          });
+          return;
+        }
+
         let messageText: string;
         if (Buffer.isBuffer(rawData)) {
           messageText = rawData.toString('utf-8');
@@ -78,16 +105,7 @@ export class BrowserPreviewStreamService
         const message = JSON.parse(messageText) as BrowserPreviewMessage;
 
         if (message.type === 'frame') {
-          void pubSub.publish(BROWSER_PREVIEW_STREAM, {
-            browserPreviewStream: {
-              runId,
-              frame: message.data,
-              timestamp: message.timestamp,
-              frameNumber: message.frame_number,
-              latencyMs: message.latency_ms,
-              url: message.url,
-            },
-          });
+          pendingFrame = message;
         } else if (message.type === 'error') {
           this.logger.error(
             `Browser preview stream error for run ${runId}: ${message.message}`,
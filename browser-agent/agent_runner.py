@@ -0,0 +1,207 @@
+"""Execution of a single agent run, shared by the API process and the run worker processes.
+
+Importing this module has no side effects: the API process and each worker build their own
+browser pool with `create_browser_pool()` and point the DOM cache at the shared directory
+with `configure_dom_cache()`.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from browser_agent.agent.service import Agent
+from browser_agent.agent.views import AgentOutput
+from browser_agent.browser.frame_hub import FrameHub
+from browser_agent.browser.pool import BrowserPool
+from browser_agent.browser.profile import BrowserProfile
+from browser_agent.browser.session import BrowserSession
+from browser_agent.browser.views import BrowserStateSummary
+from browser_agent.dom.serialization_cache import dom_serialization_cache
+
+BROWSER_POOL_MIN_SIZE = int(os.getenv('BROWSER_POOL_MIN_SIZE', '1'))
+BROWSER_POOL_MAX_SIZE = int(os.getenv('BROWSER_POOL_MAX_SIZE', os.getenv('MAX_CONCURRENT_RUNS', '5')))
+BROWSER_POOL_MAX_USES = int(os.getenv('BROWSER_POOL_MAX_USES', '20'))
+# Reuse serialized DOMs of pages seen before (experimental, off by default), shared by all runs and worker processes
+DOM_SERIALIZATION_CACHE = os.getenv('DOM_SERIALIZATION_CACHE', 'false').lower()[:1] in 'ty1'
+# Directory of the cache's disk tier ("" = memory only)
+DOM_SERIALIZATION_CACHE_DIR = os.getenv('DOM_SERIALIZATION_CACHE_DIR', str(Path(__file__).parent / 'data' / 'dom_cache'))
+
+
+def create_browser_pool() -> BrowserPool:
+	return BrowserPool(
+		min_size=min(BROWSER_POOL_MIN_SIZE, BROWSER_POOL_MAX_SIZE),
+		max_size=BROWSER_POOL_MAX_SIZE,
+		max_uses=BROWSER_POOL_MAX_USES,
+		session_factory=lambda: BrowserSession(
+			headless=True, keep_alive=True, browser_profile=BrowserProfile(dom_serialization_cache=DOM_SERIALIZATION_CACHE)
+		),
+	)
+
+
+def configure_dom_cache() -> None:
+	dom_serialization_cache.configure(directory=DOM_SERIALIZATION_CACHE_DIR)
+
+
+@dataclass
+class RunState:
+	status: str  # "queued" | "running" | "done" | "error"
+	screenshot_b64: str | None = None
+	events: asyncio.Queue = field(default_factory=asyncio.Queue)
+	message_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+	result: str | None = None
+	error: str | None = None
+	browser_session: BrowserSession | None = None
+	completed_at: float = 0.0
+	# Multi-process mode: frames relayed from the worker owning the run
+	remote_frames: FrameHub = field(default_factory=FrameHub)
+
+
+def get_llm():
+	if os.getenv('OPENAI_API_KEY'):
+		from browser_agent.llm.openai.chat import ChatOpenAI
+
+		return ChatOpenAI(model='gpt-5.1')
+	if os.getenv('ANTHROPIC_API_KEY'):
+		from browser_agent.llm.anthropic.chat import ChatAnthropic
+
+		return ChatAnthropic(model='claude-sonnet-4-5')
+	raise RuntimeError('No LLM API key found. Set OPENAI_API_KEY or ANTHROPIC_API_KEY.')
+
+
+async def run_agent(
+	state: RunState,
+	browser_pool: BrowserPool,
+	url: str,
+	task: str,
+	max_steps: int = 100,
+	system_extension: str | None = None,
+) -> None:
+	"""Run one agent on a leased browser, reporting progress and the outcome through `state`."""
+	state.status = 'running'
+	agent_ref: list = [None]
+
+	async def register_new_step_callback(
+		browser_state: BrowserStateSummary,
+		agent_output: AgentOutput,
+		step_n: int,
+	) -> None:
+		state.screenshot_b64 = browser_state.screenshot
+
+		# Drain pending user messages and inject into agent
+		while not state.message_queue.empty():
+			msg: str = state.message_queue.get_nowait()
+			if agent_ref[0] is not None:
+				agent_ref[0].message_manager.add_new_task(msg)
+			await state.events.put(
+				{
+					'type': 'user_message',
+					'content': msg,
+					'timestamp': time.time(),
+				}
+			)
+
+	async def register_step_finalized_callback(
+		agent_output: AgentOutput,
+		step_n: int,
+		post_action_url: str,
+	) -> None:
+		# Extract action details
+		action_data = agent_output.action[0] if agent_output.action else None
+		action_name = 'unknown'
+		action_params = {}
+		action_display = 'No action'
+
+		if action_data:
+			action_dict = action_data.model_dump(exclude_unset=True)
+			if action_dict:
+				action_name = list(action_dict.keys())[0]
+				action_params = action_dict[action_name]
+
+				if action_name == 'click':
+					idx = action_params.get('index', 'unknown')
+					action_display = f'Clicked element #{idx}'
+				elif action_name == 'input':
+					idx = action_params.get('index', 'unknown')
+					text = action_params.get('text', '')
+					action_display = f'Typed "{text}" into element #{idx}'
+				elif action_name == 'go_to_url':
+					nav_url = action_params.get('url', '')
+					action_display = f'Navigated to {nav_url}'
+				elif action_name == 'scroll':
+					direction = 'down' if action_params.get('down', True) else 'up'
+					action_display = f'Scrolled {direction}'
+				elif action_name == 'wait':
+					action_display = 'Waited for page to load'
+				elif action_name == 'go_back':
+					action_display = 'Went back to previous page'
+				else:
+					action_display = f'Performed {action_name}'
+
+		event = {
+			'type': 'step',
+			'step': step_n,
+			'timestamp': time.time(),
+			'thinking': agent_output.thinking,
+			'action': {
+				'name': action_name,
+				'params': action_params,
+				'display': action_display,
+			},
+			'context': {
+				'url': post_action_url,
+				'title': '',
+			},
+		}
+
+		await state.events.put(event)
+
+	def mark_failed(exc: Exception) -> None:
+		state.error = str(exc)
+		state.status = 'error'
+		state.completed_at = time.time()
+
+	try:
+		# Lease a warm browser; its browser context is disposed and it returns to the pool (or is discarded on error) on exit
+		async with browser_pool.lease() as browser_session:
+			state.browser_session = browser_session
+			try:
+				agent = Agent(
+					task=task,
+					llm=get_llm(),
+					browser_session=browser_session,
+					register_new_step_callback=register_new_step_callback,
+					register_step_finalized_callback=register_step_finalized_callback,
+					extend_system_message=system_extension,
+				)
+				agent_ref[0] = agent
+				result = await agent.run(max_steps=max_steps)
+				state.result = result.final_result()
+				state.status = 'done'
+				state.completed_at = time.time()
+			except Exception as exc:
+				mark_failed(exc)
+				raise
+			finally:
+				# Finish the run and detach its viewers before the browser can be leased to the next run
+				state.browser_session = None
+		await state.events.put(
+			{
+				'type': 'done',
+				'result': state.result,
+				'timestamp': time.time(),
+			}
+		)
+	except Exception as exc:
+		if state.status != 'error':
+			mark_failed(exc)
+		await state.events.put(
+			{
+				'type': 'error',
+				'message': state.error,
+				'timestamp': time.time(),
+			}
+		)
+	finally:
+		state.browser_session = None
@@ -157,7 +157,11 @@ class CreateAgentStepEvent(BaseEvent):
 		# Capture screenshot as base64 data URL if available
 		screenshot_url = None
 		if browser_state_summary.screenshot:
-			screenshot_url = f'data:image/png;base64,{browser_state_summary.screenshot}'
+			from browser_agent.screenshots.utils import screenshot_media_type
+
+			screenshot_url = (
+				f'data:{screenshot_media_type(browser_state_summary.screenshot)};base64,{browser_state_summary.screenshot}'
+			)
 			import logging
 
 			logger = logging.getLogger(__name__)
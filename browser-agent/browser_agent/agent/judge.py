@@ -14,6 +14,7 @@ from browser_agent.llm.messages import (
 	SystemMessage,
 	UserMessage,
 )
+from browser_agent.screenshots.utils import screenshot_media_type
 
 logger = logging.getLogger(__name__)
 
@@ -79,11 +80,12 @@ def construct_judge_messages(
 		for img_path in selected_screenshots:
 			encoded = _encode_image(img_path)
 			if encoded:
+				media_type = screenshot_media_type(encoded)
 				encoded_images.append(
 					ContentPartImageParam(
 						image_url=ImageURL(
-							url=f'data:image/png;base64,{encoded}',
-							media_type='image/png',
+							url=f'data:{media_type};base64,{encoded}',
+							media_type=media_type,
 						)
 					)
 				)
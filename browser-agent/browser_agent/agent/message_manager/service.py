@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from dataclasses import dataclass
 from typing import Literal
 
 from browser_agent.agent.message_manager.views import (
@@ -29,6 +31,26 @@ from browser_agent.utils import match_url_with_domain_pattern, time_execution_sy
 
 logger = logging.getLogger(__name__)
 
+# A background summary older than `speculative_lead_steps` plus this many steps is dropped as stale
+SPECULATIVE_COMPACTION_MAX_AGE_MARGIN = 2
+
+COMPACTION_SYSTEM_PROMPT = (
+	'You are summarizing an agent run for prompt compaction.\n'
+	'Capture task requirements, key facts, decisions, partial progress, errors, and next steps.\n'
+	'Preserve important entities, values, URLs, and file paths.\n'
+	'CRITICAL: Only mark a step as completed if you see explicit success confirmation in the history. '
+	'If a step was started but not explicitly confirmed complete, mark it as "IN-PROGRESS". '
+	'Never infer completion from context — only report what was confirmed.\n'
+	'Return plain text only. Do not include tool calls or JSON.'
+)
+
+
+@dataclass
+class _CompactionResult:
+	summary: str
+	covered_items: list[HistoryItem]  # agent_history_items as they were when the summary was requested
+	step_number: int
+
 
 # ========== Logging Helper Functions ==========
 # These functions are used ONLY for formatting debug log output.
@@ -137,6 +159,10 @@ class MessageManager:
 		self.sensitive_data = sensitive_data
 		self.last_input_messages = []
 		self.last_state_message_text: str | None = None
+		self._joined_history_cache: tuple[list[str], str] | None = None
+		self._compaction_task: asyncio.Task[_CompactionResult | None] | None = None
+		self._ready_compaction: _CompactionResult | None = None
+		self._history_size: tuple[int, int] | None = None  # (step number, history chars) at the last background check
 		# Only initialize messages if state is empty
 		if len(self.state.history.get_messages()) == 0:
 			self._set_message_with_type(self.system_prompt, 'system')
@@ -156,13 +182,13 @@ class MessageManager:
 
 		if self.max_history_items is None:
 			# Include all items
-			return compacted_prefix + '\n'.join(item.to_string() for item in self.state.agent_history_items)
+			return compacted_prefix + self._joined_history_text()
 
 		total_items = len(self.state.agent_history_items)
 
 		# If we have fewer items than the limit, just return all items
 		if total_items <= self.max_history_items:
-			return compacted_prefix + '\n'.join(item.to_string() for item in self.state.agent_history_items)
+			return compacted_prefix + self._joined_history_text()
 
 		# We have more items than the limit, so we need to omit some
 		omitted_count = total_items - self.max_history_items
@@ -205,6 +231,23 @@ class MessageManager:
 			self.sensitive_data = effective_sensitive_data
 			self.sensitive_data_description = self._get_sensitive_data_description(browser_state_summary.url)
 
+	def _joined_history_text(self) -> str:
+		"""All history items joined by newlines, extended incrementally while items are only appended."""
+		strings = [item.to_string() for item in self.state.agent_history_items]  # memoized per item
+		cached = self._joined_history_cache
+		if cached is not None:
+			cached_strings, cached_text = cached
+			if len(cached_strings) <= len(strings) and all(a is b for a, b in zip(cached_strings, strings)):
+				if len(cached_strings) == len(strings):
+					return cached_text
+				new_text = '\n'.join(strings[len(cached_strings) :])
+				joined = f'{cached_text}\n{new_text}' if cached_strings else new_text
+				self._joined_history_cache = (strings, joined)
+				return joined
+		joined = '\n'.join(strings)
+		self._joined_history_cache = (strings, joined)
+		return joined
+
 	async def maybe_compact_messages(
 		self,
 		llm: BaseChatModel | None,
@@ -213,7 +256,10 @@ class MessageManager:
 	) -> bool:
 		"""Summarize older history into a compact memory block.
 
-		Step interval is the primary trigger; char count is a minimum floor.
+		Step interval is the primary trigger; char count is a minimum floor. With `settings.background`
+		the summary is requested speculatively up to `speculative_lead_steps` before it is due, if the history is
+		projected to cross the char floor by then at its current growth rate, and swapped in on the first step where it is both due and ready, unless it has gone stale by then. Until then the
+		step goes ahead with the current history, so the agent never waits on the compaction LLM.
 		"""
 		if not settings or not settings.enabled:
 			return False
@@ -224,17 +270,74 @@ class MessageManager:
 
 		# Step cadence gate
 		steps_since = step_info.step_number - (self.state.last_compaction_step or 0)
-		if steps_since < settings.compact_every_n_steps:
-			return False
+		due = steps_since >= settings.compact_every_n_steps
 
 		# Char floor gate
-		history_items = self.state.agent_history_items
-		full_history_text = '\n'.join(item.to_string() for item in history_items).strip()
+		history_text = self._joined_history_text().strip()
 		trigger_char_count = settings.trigger_char_count or 40000
-		if len(full_history_text) < trigger_char_count:
-			return False
-
-		logger.debug(f'Compacting message history (items={len(history_items)}, chars={len(full_history_text)})')
+		over_floor = len(history_text) >= trigger_char_count
+
+		if not settings.background:
+			if not due or not over_floor:
+				return False
+			result = await self._summarize_history(llm, settings, history_text, step_info.step_number)
+			return result is not None and self._apply_compaction(result, settings, step_info.step_number)
+
+		previous_size, self._history_size = self._history_size, (step_info.step_number, len(history_text))
+
+		if self._compaction_task is not None and self._compaction_task.done():
+			task, self._compaction_task = self._compaction_task, None
+			if not task.cancelled():
+				try:
+					self._ready_compaction = task.result()
+				except Exception as e:
+					logger.warning(f'Background message compaction failed: {type(e).__name__}: {e}')
+
+		if self._ready_compaction is not None:
+			max_age = max(0, settings.speculative_lead_steps) + SPECULATIVE_COMPACTION_MAX_AGE_MARGIN
+			if step_info.step_number - self._ready_compaction.step_number > max_age:
+				logger.debug(f'Discarding compaction summary from step {self._ready_compaction.step_number} as stale')
+				self._ready_compaction = None
+			elif not (due and over_floor):
+				return False
+			else:
+				result, self._ready_compaction = self._ready_compaction, None
+				if self._apply_compaction(result, settings, step_info.step_number):
+					return True
+
+		if self._compaction_task is None:
+			steps_until_due = settings.compact_every_n_steps - steps_since
+			approaching = steps_until_due <= max(0, settings.speculative_lead_steps)
+			growth_per_step = 0.0
+			if previous_size is not None and step_info.step_number > previous_size[0]:
+				growth_per_step = max(0.0, (len(history_text) - previous_size[1]) / (step_info.step_number - previous_size[0]))
+			projected_chars = len(history_text) + growth_per_step * max(0, steps_until_due)
+			if (due and over_floor) or (approaching and projected_chars >= trigger_char_count):
+				self._compaction_task = asyncio.create_task(
+					self._summarize_history(llm, settings, history_text, step_info.step_number),
+					name='message_compaction',
+				)
+		elif due and over_floor:
+			logger.debug('Compaction summary not ready yet, continuing with the full history')
+		return False
+
+	def cancel_background_compaction(self) -> None:
+		"""Drop any in-flight or unapplied background summary, e.g. when the agent shuts down."""
+		if self._compaction_task is not None and not self._compaction_task.done():
+			self._compaction_task.cancel()
+		self._compaction_task = None
+		self._ready_compaction = None
+
+	async def _summarize_history(
+		self,
+		llm: BaseChatModel,
+		settings: MessageCompactionSettings,
+		history_text: str,
+		step_number: int,
+	) -> _CompactionResult | None:
+		"""Ask `llm` to summarize the current history. Returns None if it fails or comes back empty."""
+		covered_items = list(self.state.agent_history_items)
+		logger.debug(f'Compacting message history (items={len(covered_items)}, chars={len(history_text)})')
 
 		# Build compaction input
 		compaction_sections = []
@@ -242,7 +345,7 @@ class MessageManager:
 			compaction_sections.append(
 				f'<previous_compacted_memory>\n{self.state.compacted_memory}\n</previous_compacted_memory>'
 			)
-		compaction_sections.append(f'<agent_history>\n{full_history_text}\n</agent_history>')
+		compaction_sections.append(f'<agent_history>\n{history_text}\n</agent_history>')
 		if settings.include_read_state and self.state.read_state_description:
 			compaction_sections.append(f'<read_state>\n{self.state.read_state_description}\n</read_state>')
 		compaction_input = '\n\n'.join(compaction_sections)
@@ -251,15 +354,7 @@ class MessageManager:
 			filtered = self._filter_sensitive_data(UserMessage(content=compaction_input))
 			compaction_input = filtered.text
 
-		system_prompt = (
-			'You are summarizing an agent run for prompt compaction.\n'
-			'Capture task requirements, key facts, decisions, partial progress, errors, and next steps.\n'
-			'Preserve important entities, values, URLs, and file paths.\n'
-			'CRITICAL: Only mark a step as completed if you see explicit success confirmation in the history. '
-			'If a step was started but not explicitly confirmed complete, mark it as "IN-PROGRESS". '
-			'Never infer completion from context — only report what was confirmed.\n'
-			'Return plain text only. Do not include tool calls or JSON.'
-		)
+		system_prompt = COMPACTION_SYSTEM_PROMPT
 		if settings.summary_max_chars:
 			system_prompt += f' Keep under {settings.summary_max_chars} characters if possible.'
 
@@ -269,27 +364,38 @@ class MessageManager:
 			summary = (response.completion or '').strip()
 		except Exception as e:
 			logger.warning(f'Failed to compact messages: {e}')
-			return False
+			return None
 
 		if not summary:
-			return False
+			return None
 
 		if settings.summary_max_chars and len(summary) > settings.summary_max_chars:
 			summary = summary[: settings.summary_max_chars].rstrip() + '…'
 
-		self.state.compacted_memory = summary
+		return _CompactionResult(summary=summary, covered_items=covered_items, step_number=step_number)
+
+	def _apply_compaction(self, result: _CompactionResult, settings: MessageCompactionSettings, step_number: int) -> bool:
+		"""Swap the summary in at `step_number`, dropping only items it covers. Items added since it was requested are kept."""
+		history_items = self.state.agent_history_items
+		covered = result.covered_items
+		if len(history_items) < len(covered) or any(a is not b for a, b in zip(history_items, covered)):
+			logger.debug('History changed while it was being summarized, discarding the compaction summary')
+			return False
+
+		self.state.compacted_memory = result.summary
 		self.state.compaction_count += 1
-		self.state.last_compaction_step = step_info.step_number
+		# The cadence counts from when the summary took effect, not from when it was requested
+		self.state.last_compaction_step = step_number
 
-		# Keep first item + most recent items
+		# Keep first item + most recent items of what was summarized, plus everything added since
 		keep_last = max(0, settings.keep_last_items)
-		if len(history_items) > keep_last + 1:
-			if keep_last == 0:
-				self.state.agent_history_items = [history_items[0]]
-			else:
-				self.state.agent_history_items = [history_items[0]] + history_items[-keep_last:]
+		if len(covered) > keep_last + 1:
+			kept_covered = covered[-keep_last:] if keep_last else []
+			self.state.agent_history_items = [history_items[0]] + kept_covered + history_items[len(covered) :]
 
-		logger.debug(f'Compaction complete (summary_chars={len(summary)}, history_items={len(self.state.agent_history_items)})')
+		logger.debug(
+			f'Compaction complete (summary_chars={len(result.summary)}, history_items={len(self.state.agent_history_items)})'
+		)
 
 		return True
 
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from browser_agent.llm.messages import (
 	BaseMessage,
@@ -25,6 +25,9 @@ class HistoryItem(BaseModel):
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	# (field values, rendered string) - history is re-rendered every step, items rarely change
+	_rendered: tuple[tuple, str] | None = PrivateAttr(default=None)
+
 	def model_post_init(self, __context) -> None:
 		"""Validate that error and system_message are not both provided"""
 		if self.error is not None and self.system_message is not None:
@@ -32,6 +35,20 @@ class HistoryItem(BaseModel):
 
 	def to_string(self) -> str:
 		"""Get string representation of the history item"""
+		key = (
+			self.step_number,
+			self.evaluation_previous_goal,
+			self.memory,
+			self.next_goal,
+			self.action_results,
+			self.error,
+			self.system_message,
+		)
+		if self._rendered is None or self._rendered[0] != key:
+			self._rendered = (key, self._render())
+		return self._rendered[1]
+
+	def _render(self) -> str:
 		step_str = 'step' if self.step_number is not None else 'step_unknown'
 
 		if self.error:
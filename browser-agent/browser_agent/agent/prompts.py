@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Literal, Optional
 from browser_agent.dom.views import NodeType, SimplifiedNode
 from browser_agent.llm.messages import ContentPartImageParam, ContentPartTextParam, ImageURL, SystemMessage, UserMessage
 from browser_agent.observability import observe_debug
+from browser_agent.screenshots.utils import fit_within, screenshot_media_type
 from browser_agent.utils import is_new_tab_page, sanitize_surrogates
 
 if TYPE_CHECKING:
@@ -358,7 +359,7 @@ Available tabs:
 		return agent_state
 
 	def _resize_screenshot(self, screenshot_b64: str) -> str:
-		"""Resize screenshot to llm_screenshot_size if configured."""
+		"""Scale the screenshot to fit llm_screenshot_size (keeping its aspect ratio) if configured."""
 		if not self.llm_screenshot_size:
 			return screenshot_b64
 
@@ -370,16 +371,22 @@ Available tabs:
 			from PIL import Image
 
 			img = Image.open(BytesIO(base64.b64decode(screenshot_b64)))
-			if img.size == self.llm_screenshot_size:
+			target_size = fit_within(img.size, self.llm_screenshot_size)
+			# Already rendered at the target size by the browser (screenshot_downscale), don't resample it again
+			if abs(img.size[0] - target_size[0]) <= 1 and abs(img.size[1] - target_size[1]) <= 1:
 				return screenshot_b64
 
 			logging.getLogger(__name__).info(
-				f'🔄 Resizing screenshot from {img.size[0]}x{img.size[1]} to {self.llm_screenshot_size[0]}x{self.llm_screenshot_size[1]} for LLM'
+				f'🔄 Resizing screenshot from {img.size[0]}x{img.size[1]} to {target_size[0]}x{target_size[1]} for LLM'
 			)
 
-			img_resized = img.resize(self.llm_screenshot_size, Image.Resampling.LANCZOS)
+			img_resized = img.resize(target_size, Image.Resampling.LANCZOS)
 			buffer = BytesIO()
-			img_resized.save(buffer, format='PNG')
+			# Keep the capture format so jpeg/webp screenshots stay compressed
+			if img.format in ('JPEG', 'WEBP'):
+				img_resized.save(buffer, format=img.format, quality=85)
+			else:
+				img_resized.save(buffer, format='PNG')
 			return base64.b64encode(buffer.getvalue()).decode('utf-8')
 		except Exception as e:
 			logging.getLogger(__name__).warning(f'Failed to resize screenshot: {e}, using original')
@@ -447,11 +454,12 @@ Available tabs:
 				processed_screenshot = self._resize_screenshot(screenshot)
 
 				# Add the screenshot
+				screenshot_type = screenshot_media_type(processed_screenshot)
 				content_parts.append(
 					ContentPartImageParam(
 						image_url=ImageURL(
-							url=f'data:image/png;base64,{processed_screenshot}',
-							media_type='image/png',
+							url=f'data:{screenshot_type};base64,{processed_screenshot}',
+							media_type=screenshot_type,
 							detail=self.vision_detail_level,
 						),
 					)
@@ -25,6 +25,7 @@ from browser_agent.agent.cloud_events import (
 )
 from browser_agent.agent.message_manager.utils import save_conversation
 from browser_agent.llm.base import BaseChatModel
+from browser_agent.llm.client_pool import llm_client_pool
 from browser_agent.llm.exceptions import ModelProviderError, ModelRateLimitError
 from browser_agent.llm.messages import BaseMessage, ContentPartImageParam, ContentPartTextParam, UserMessage
 from browser_agent.tokens.service import TokenCost
@@ -65,7 +66,7 @@ from browser_agent.browser.events import _get_timeout
 from browser_agent.browser.session import DEFAULT_BROWSER_PROFILE
 from browser_agent.browser.views import BrowserStateSummary
 from browser_agent.config import CONFIG
-from browser_agent.dom.views import DOMInteractedElement, MatchLevel
+from browser_agent.dom.views import MATCH_ATTRIBUTES, DOMInteractedElement, DOMSelectorMap, MatchLevel
 from browser_agent.filesystem.file_system import FileSystem
 from browser_agent.observability import observe, observe_debug
 from browser_agent.telemetry.service import ProductTelemetry
@@ -207,6 +208,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		llm_screenshot_size: tuple[int, int] | None = None,
 		message_compaction: MessageCompactionSettings | bool | None = True,
 		max_clickable_elements_length: int = 40000,
+		lazy_screenshots: bool = False,
 		_url_shortening_limit: int = 25,
 		**kwargs,
 	):
@@ -373,6 +375,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		self._fallback_llm: BaseChatModel | None = fallback_llm
 		self._using_fallback_llm: bool = False
 		self._original_llm: BaseChatModel = llm  # Store original for reference
+		self._retains_llm_client_pool = False
 		self.directly_open_url = directly_open_url
 		self.include_recent_events = include_recent_events
 		self._url_shortening_limit = _url_shortening_limit
@@ -413,6 +416,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			loop_detection_enabled=loop_detection_enabled,
 			message_compaction=message_compaction,
 			max_clickable_elements_length=max_clickable_elements_length,
+			lazy_screenshots=lazy_screenshots,
 		)
 
 		# Token cost service
@@ -444,6 +448,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		self._set_screenshot_service()
 
 		# Action setup
+		self._agent_output_types: dict[type[ActionModel], type[AgentOutput]] = {}
 		self._setup_action_models()
 		self._set_browser_use_version_and_source(source)
 
@@ -769,21 +774,28 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		# Initially only include actions with no filters
 		self.ActionModel = self.tools.registry.create_action_model()
 		# Create output model with the dynamic actions
-		if self.settings.flash_mode:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.ActionModel)
-		elif self.settings.use_thinking:
-			self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
-		else:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.ActionModel)
+		self.AgentOutput = self._get_agent_output_type(self.ActionModel)
 
 		# used to force the done action when max_steps is reached
 		self.DoneActionModel = self.tools.registry.create_action_model(include_actions=['done'])
-		if self.settings.flash_mode:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.DoneActionModel)
-		elif self.settings.use_thinking:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
-		else:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.DoneActionModel)
+		self.DoneAgentOutput = self._get_agent_output_type(self.DoneActionModel)
+
+	def _get_agent_output_type(self, action_model: type[ActionModel]) -> type[AgentOutput]:
+		"""AgentOutput subclass for `action_model`, built once per action model.
+
+		The registry hands out the same action model for the same set of page actions, so reusing the
+		output type also lets providers reuse its cached JSON schema on consecutive steps.
+		"""
+		agent_output = self._agent_output_types.get(action_model)
+		if agent_output is None:
+			if self.settings.flash_mode:
+				agent_output = AgentOutput.type_with_custom_actions_flash_mode(action_model)
+			elif self.settings.use_thinking:
+				agent_output = AgentOutput.type_with_custom_actions(action_model)
+			else:
+				agent_output = AgentOutput.type_with_custom_actions_no_thinking(action_model)
+			self._agent_output_types[action_model] = agent_output
+		return agent_output
 
 	def _get_skill_slug(self, skill: 'Skill', all_skills: list['Skill']) -> str:
 		"""Generate a clean slug from skill title for action names
@@ -1064,6 +1076,24 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		finally:
 			await self._finalize(browser_state_summary)
 
+	def _step_screenshot_needed(self) -> bool:
+		"""Whether this step's screenshot has a consumer; always True unless `lazy_screenshots` is enabled."""
+		if not self.settings.lazy_screenshots:
+			return True
+		use_vision = self.settings.use_vision
+		if use_vision is True:
+			return True
+		# use_vision='auto' only shows the screenshot when the previous action asked for it
+		if use_vision == 'auto' and any(
+			result.metadata and result.metadata.get('include_screenshot') for result in self.state.last_result or []
+		):
+			return True
+		# History consumers: GIF generation and the judge (which only looks at screenshots with vision enabled)
+		if self.settings.generate_gif or (self.settings.use_judge and use_vision is not False):
+			return True
+		# Step callbacks and step event subscribers receive the browser state including the screenshot
+		return bool(self.register_new_step_callback or self.eventbus.handlers.get('CreateAgentStepEvent'))
+
 	async def _prepare_context(self, step_info: AgentStepInfo | None = None) -> BrowserStateSummary:
 		"""Prepare the context for the step: browser state, action models, page actions"""
 		# step_start_time is now set in step() method
@@ -1071,10 +1101,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		assert self.browser_session is not None, 'BrowserSession is not set up'
 
 		self.logger.debug(f'🌐 Step {self.state.n_steps}: Getting browser state...')
-		# Always take screenshots for all steps
-		self.logger.debug('📸 Requesting browser state with include_screenshot=True')
+		# Take screenshots for all steps unless lazy_screenshots is on and nothing will use this one
+		include_screenshot = self._step_screenshot_needed()
+		self.logger.debug(f'📸 Requesting browser state with include_screenshot={include_screenshot}')
 		browser_state_summary = await self.browser_session.get_browser_state_summary(
-			include_screenshot=True,  # always capture even if use_vision=False so that cloud sync is useful (it's fast now anyway)
+			include_screenshot=include_screenshot,  # by default always capture even if use_vision=False so that cloud sync is useful
 			include_recent_events=self.include_recent_events,
 		)
 		if browser_state_summary.screenshot:
@@ -2516,6 +2547,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		)
 		signal_handler.register()
 
+		# Keep pooled LLM connections (shared with the judge, extraction and compaction LLMs) open until close()
+		self._retain_llm_client_pool()
+
 		try:
 			await self._log_agent_run()
 
@@ -3096,6 +3130,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 		# Initialize browser session
 		await self.browser_session.start()
+		self._retain_llm_client_pool()
 
 		results = []
 
@@ -3301,10 +3336,15 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		This helps handle SPA pages where shadow DOM and dynamic content
 		may not be immediately available even when document.readyState is 'complete'.
 
+		The waiting happens in the page (see `BrowserSession.wait_for_interactive_elements`), driven by DOM
+		mutations, and the full browser state is only built once the page looks ready or has settled; the
+		selector map decides whether there are enough elements. Each in-page wait is capped at `poll_interval`
+		and, once a built state was still short, only ends early after another DOM change.
+
 		Args:
 			min_elements: Minimum number of interactive elements to wait for
 			timeout: Maximum time to wait in seconds
-			poll_interval: Time between polling attempts in seconds
+			poll_interval: Longest single in-page wait, and the time between attempts when the page cannot be observed
 
 		Returns:
 			BrowserStateSummary if minimum elements found, None if timeout
@@ -3313,21 +3353,32 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 		start_time = time.time()
 		last_count = 0
+		require_change = False
+
+		while (remaining := timeout - (time.time() - start_time)) > 0:
+			ready = await self.browser_session.wait_for_interactive_elements(
+				min_elements, timeout=min(remaining, poll_interval), require_change=require_change
+			)
+			if ready is False:
+				# The DOM did not change since the last build
+				continue
 
-		while (time.time() - start_time) < timeout:
 			state = await self.browser_session.get_browser_state_summary(include_screenshot=False)
-			if state and state.dom_state.selector_map:
-				current_count = len(state.dom_state.selector_map)
-				if current_count >= min_elements:
-					self.logger.debug(f'✅ Page has {current_count} elements (needed {min_elements}), proceeding with action')
-					return state
-				if current_count != last_count:
-					self.logger.debug(
-						f'⏳ Waiting for elements: {current_count}/{min_elements} '
-						f'(timeout in {timeout - (time.time() - start_time):.1f}s)'
-					)
-					last_count = current_count
-			await asyncio.sleep(poll_interval)
+			current_count = len(state.dom_state.selector_map) if state and state.dom_state.selector_map else 0
+			if current_count >= min_elements:
+				self.logger.debug(f'✅ Page has {current_count} elements (needed {min_elements}), proceeding with action')
+				return state
+			if current_count != last_count:
+				self.logger.debug(
+					f'⏳ Waiting for elements: {current_count}/{min_elements} '
+					f'(timeout in {timeout - (time.time() - start_time):.1f}s)'
+				)
+				last_count = current_count
+
+			if ready is None:
+				# Page could not be observed, fall back to polling
+				await asyncio.sleep(poll_interval)
+			require_change = ready is True
 
 		# Return last state even if we didn't reach min_elements
 		self.logger.warning(f'⚠️ Timeout waiting for {min_elements} elements, proceeding with {last_count} elements')
@@ -3507,136 +3558,77 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			return action
 
 		selector_map = browser_state_summary.dom_state.selector_map
-		highlight_index: int | None = None
-		match_level: MatchLevel | None = None
 
-		# Debug: log what we're looking for and what's available
 		self.logger.info(
 			f'🔍 Searching for element: <{historical_element.node_name}> '
 			f'hash={historical_element.element_hash} stable_hash={historical_element.stable_hash}'
 		)
-		# Log what elements are in selector_map for debugging
-		if historical_element.node_name:
-			hist_name = historical_element.node_name.lower()
-			matching_nodes = [
-				(idx, elem.node_name, elem.attributes.get('name') if elem.attributes else None)
-				for idx, elem in selector_map.items()
-				if elem.node_name.lower() == hist_name
-			]
-			self.logger.info(
-				f'🔍 Selector map has {len(selector_map)} elements, '
-				f'{len(matching_nodes)} are <{hist_name.upper()}>: {matching_nodes}'
-			)
-
-		# Level 1: EXACT hash match
-		for idx, elem in selector_map.items():
-			if elem.element_hash == historical_element.element_hash:
-				highlight_index = idx
-				match_level = MatchLevel.EXACT
-				break
-
-		if highlight_index is None:
-			self.logger.debug(f'EXACT hash match failed (checked {len(selector_map)} elements)')
-
-		# Level 2: STABLE hash match (dynamic classes filtered)
-		# Use stored stable_hash (computed at save time from EnhancedDOMTreeNode - single source of truth)
-		if highlight_index is None and historical_element.stable_hash is not None:
-			for idx, elem in selector_map.items():
-				if elem.compute_stable_hash() == historical_element.stable_hash:
-					highlight_index = idx
-					match_level = MatchLevel.STABLE
-					self.logger.info('Element matched at STABLE level (dynamic classes filtered)')
-					break
-			if highlight_index is None:
-				self.logger.debug('STABLE hash match failed')
-		elif highlight_index is None:
-			self.logger.debug('STABLE hash match skipped (no stable_hash in history)')
 
-		# Level 3: XPATH match
-		if highlight_index is None and historical_element.x_path:
-			for idx, elem in selector_map.items():
-				if elem.xpath == historical_element.x_path:
-					highlight_index = idx
-					match_level = MatchLevel.XPATH
-					self.logger.info(f'Element matched at XPATH level: {historical_element.x_path}')
-					break
-			if highlight_index is None:
-				self.logger.debug(f'XPATH match failed for: {historical_element.x_path[-60:]}')
-
-		# Level 4: ax_name (accessible name) match - robust for dynamic SPAs with menus
-		# This uses the accessible name from the accessibility tree which is stable
-		# even when DOM structure changes (e.g., dynamically generated menu items)
-		if highlight_index is None and historical_element.ax_name:
-			hist_name = historical_element.node_name.lower()
-			hist_ax_name = historical_element.ax_name
-			for idx, elem in selector_map.items():
-				# Match by node type and accessible name
-				elem_ax_name = elem.ax_node.name if elem.ax_node else None
-				if elem.node_name.lower() == hist_name and elem_ax_name == hist_ax_name:
-					highlight_index = idx
-					match_level = MatchLevel.AX_NAME
-					self.logger.info(f'Element matched at AX_NAME level: "{hist_ax_name}"')
-					break
-			if highlight_index is None:
-				# Log available ax_names for debugging
-				same_type_ax_names = [
-					(idx, elem.ax_node.name if elem.ax_node else None)
-					for idx, elem in selector_map.items()
-					if elem.node_name.lower() == hist_name and elem.ax_node and elem.ax_node.name
-				]
-				self.logger.debug(
-					f'AX_NAME match failed for <{hist_name.upper()}> ax_name="{hist_ax_name}". '
-					f'Page has {len(same_type_ax_names)} <{hist_name.upper()}> with ax_names: '
-					f'{same_type_ax_names[:5]}{"..." if len(same_type_ax_names) > 5 else ""}'
-				)
-
-		# Level 5: Unique attribute fallback (for old history files without stable_hash)
-		if highlight_index is None and historical_element.attributes:
-			hist_attrs = historical_element.attributes
-			hist_name = historical_element.node_name.lower()
-
-			# Try matching by unique identifiers: name, id, or aria-label
-			for attr_key in ['name', 'id', 'aria-label']:
-				if attr_key in hist_attrs and hist_attrs[attr_key]:
-					for idx, elem in selector_map.items():
-						if (
-							elem.node_name.lower() == hist_name
-							and elem.attributes
-							and elem.attributes.get(attr_key) == hist_attrs[attr_key]
-						):
-							highlight_index = idx
-							match_level = MatchLevel.ATTRIBUTE
-							self.logger.info(f'Element matched via {attr_key} attribute: {hist_attrs[attr_key]}')
-							break
-					if highlight_index is not None:
-						break
-
-			if highlight_index is None:
-				tried_attrs = [k for k in ['name', 'id', 'aria-label'] if k in hist_attrs and hist_attrs[k]]
-				# Log what was tried and what's available on the page for debugging
-				same_node_elements = [
-					(idx, elem.attributes.get('aria-label') or elem.attributes.get('id') or elem.attributes.get('name'))
-					for idx, elem in selector_map.items()
-					if elem.node_name.lower() == hist_name and elem.attributes
-				]
-				self.logger.info(
-					f'🔍 ATTRIBUTE match failed for <{hist_name.upper()}> '
-					f'(tried: {tried_attrs}, looking for: {[hist_attrs.get(k) for k in tried_attrs]}). '
-					f'Page has {len(same_node_elements)} <{hist_name.upper()}> elements with identifiers: '
-					f'{same_node_elements[:5]}{"..." if len(same_node_elements) > 5 else ""}'
-				)
-
-		if highlight_index is None:
+		# Indexed lookups, built once per DOM state and shared by every action replayed against it
+		match = browser_state_summary.dom_state.match_index.match(historical_element)
+		if match is None:
+			self._log_unmatched_element(historical_element, selector_map)
 			return None
 
+		highlight_index, match_level = match
+		if match_level == MatchLevel.AX_NAME:
+			self.logger.info(f'Element matched at AX_NAME level: "{historical_element.ax_name}"')
+		elif match_level == MatchLevel.ATTRIBUTE:
+			attrs = historical_element.attributes or {}
+			identifiers = {k: attrs[k] for k in MATCH_ATTRIBUTES if attrs.get(k)}
+			self.logger.info(f'Element matched via unique attribute: {identifiers}')
+		elif match_level == MatchLevel.XPATH:
+			self.logger.info(f'Element matched at XPATH level: {historical_element.x_path}')
+		elif match_level == MatchLevel.STABLE:
+			self.logger.info('Element matched at STABLE level (dynamic classes filtered)')
+
 		old_index = action.get_index()
 		if old_index != highlight_index:
 			action.set_index(highlight_index)
-			level_name = match_level.name if match_level else 'UNKNOWN'
-			self.logger.info(f'Element index updated {old_index} → {highlight_index} (matched at {level_name} level)')
+			self.logger.info(f'Element index updated {old_index} → {highlight_index} (matched at {match_level.name} level)')
 
 		return action
 
+	def _log_unmatched_element(self, historical_element: DOMInteractedElement, selector_map: DOMSelectorMap) -> None:
+		"""Log what the current page offers for each match level after a recorded element could not be found."""
+		hist_name = historical_element.node_name.lower()
+		matching_nodes = {idx: elem for idx, elem in selector_map.items() if elem.node_name.lower() == hist_name}
+		same_node_elements = list(matching_nodes.values())
+		self.logger.info(
+			f'🔍 Selector map has {len(selector_map)} elements, {len(matching_nodes)} are <{hist_name.upper()}>: '
+			f'{[(idx, elem.attributes.get("name") if elem.attributes else None) for idx, elem in matching_nodes.items()]}'
+		)
+		self.logger.debug(f'EXACT hash match failed (checked {len(selector_map)} elements)')
+		if historical_element.stable_hash is not None:
+			self.logger.debug('STABLE hash match failed')
+		else:
+			self.logger.debug('STABLE hash match skipped (no stable_hash in history)')
+		if historical_element.x_path:
+			self.logger.debug(f'XPATH match failed for: {historical_element.x_path[-60:]}')
+
+		if historical_element.ax_name:
+			same_type_ax_names = [elem.ax_node.name for elem in same_node_elements if elem.ax_node and elem.ax_node.name]
+			self.logger.debug(
+				f'AX_NAME match failed for <{hist_name.upper()}> ax_name="{historical_element.ax_name}". '
+				f'Page has {len(same_type_ax_names)} <{hist_name.upper()}> with ax_names: '
+				f'{same_type_ax_names[:5]}{"..." if len(same_type_ax_names) > 5 else ""}'
+			)
+
+		hist_attrs = historical_element.attributes or {}
+		if hist_attrs:
+			tried_attrs = [k for k in MATCH_ATTRIBUTES if hist_attrs.get(k)]
+			identifiers = [
+				elem.attributes.get('aria-label') or elem.attributes.get('id') or elem.attributes.get('name')
+				for elem in same_node_elements
+				if elem.attributes
+			]
+			self.logger.info(
+				f'🔍 ATTRIBUTE match failed for <{hist_name.upper()}> '
+				f'(tried: {tried_attrs}, looking for: {[hist_attrs.get(k) for k in tried_attrs]}). '
+				f'Page has {len(identifiers)} <{hist_name.upper()}> elements with identifiers: '
+				f'{identifiers[:5]}{"..." if len(identifiers) > 5 else ""}'
+			)
+
 	def _format_element_for_error(self, elem: DOMInteractedElement | None) -> str:
 		"""Format element info for error messages during history rerun."""
 		if elem is None:
@@ -3926,6 +3918,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 	def message_manager(self) -> MessageManager:
 		return self._message_manager
 
+	def _retain_llm_client_pool(self) -> None:
+		if not self._retains_llm_client_pool:
+			llm_client_pool.retain()
+			self._retains_llm_client_pool = True
+
 	async def close(self):
 		"""Close all resources"""
 		try:
@@ -3951,6 +3948,14 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			if self.skill_service is not None:
 				await self.skill_service.close()
 
+			# Don't leave a speculative compaction request running after the agent is gone
+			self._message_manager.cancel_background_compaction()
+
+			# Give back the shared LLM clients; connections close once no agent on this loop used them for a while
+			if self._retains_llm_client_pool:
+				self._retains_llm_client_pool = False
+				await llm_client_pool.release()
+
 			# Force garbage collection
 			gc.collect()
 
@@ -3974,24 +3979,14 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 	async def _update_action_models_for_page(self, page_url: str) -> None:
 		"""Update action models with page-specific actions"""
-		# Create new action model with current page's filtered actions
+		# Create new action model with current page's filtered actions (cached per set of matching actions)
 		self.ActionModel = self.tools.registry.create_action_model(page_url=page_url)
 		# Update output model with the new actions
-		if self.settings.flash_mode:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.ActionModel)
-		elif self.settings.use_thinking:
-			self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
-		else:
-			self.AgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.ActionModel)
+		self.AgentOutput = self._get_agent_output_type(self.ActionModel)
 
 		# Update done action model too
 		self.DoneActionModel = self.tools.registry.create_action_model(include_actions=['done'], page_url=page_url)
-		if self.settings.flash_mode:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_flash_mode(self.DoneActionModel)
-		elif self.settings.use_thinking:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
-		else:
-			self.DoneAgentOutput = AgentOutput.type_with_custom_actions_no_thinking(self.DoneActionModel)
+		self.DoneAgentOutput = self._get_agent_output_type(self.DoneActionModel)
 
 	async def authenticate_cloud_sync(self, show_instructions: bool = True) -> bool:
 		"""
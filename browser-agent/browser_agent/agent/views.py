@@ -43,6 +43,8 @@ class MessageCompactionSettings(BaseModel):
 	summary_max_chars: int = 6000
 	include_read_state: bool = False
 	compaction_llm: BaseChatModel | None = None
+	background: bool = False  # Summarize in the background and swap the summary in once ready, instead of blocking the step
+	speculative_lead_steps: int = 3  # With background, start summarizing this many steps before compaction is due
 
 	@model_validator(mode='after')
 	def _resolve_trigger_threshold(self) -> MessageCompactionSettings:
@@ -89,6 +91,7 @@ class AgentSettings(BaseModel):
 	loop_detection_window: int = 20  # Rolling window size for action similarity tracking
 	loop_detection_enabled: bool = True  # Whether to enable loop detection nudges
 	max_clickable_elements_length: int = 40000  # Max characters for clickable elements in prompt
+	lazy_screenshots: bool = False  # Skip step screenshots that nothing (vision, gif, judge, callbacks) would use
 
 
 class PageFingerprint(BaseModel):
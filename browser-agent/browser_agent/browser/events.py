@@ -187,6 +187,9 @@ class ScreenshotEvent(BaseEvent[str]):
 
 	full_page: bool = False
 	clip: dict[str, float] | None = None  # {x, y, width, height}
+	format: Literal['png', 'jpeg', 'webp'] = 'png'
+	quality: int | None = None  # jpeg/webp only
+	max_size: tuple[int, int] | None = None  # (width, height) to fit the viewport capture into, keeping aspect ratio
 
 	event_timeout: float | None = Field(default_factory=lambda: _get_timeout('TIMEOUT_ScreenshotEvent', 15.0))  # seconds
 
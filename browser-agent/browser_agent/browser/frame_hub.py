@@ -0,0 +1,133 @@
+"""Fan-out of live screencast frames to any number of concurrent viewers.
+
+A single `asyncio.Queue` shared by several consumers makes them steal frames from each
+other. `FrameHub` instead gives every subscriber its own small ring buffer: publishing never
+blocks, a slow subscriber only loses its own oldest frames, and a late joiner immediately
+receives the most recent frame instead of waiting for the next repaint.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class StreamFrame:
+	"""One JPEG screencast frame as published to viewers."""
+
+	data: bytes
+	url: str
+	timestamp: float
+	seq: int
+
+
+class FrameSubscription:
+	"""Per-viewer view onto a `FrameHub`. Use as an async context manager to auto-unsubscribe."""
+
+	def __init__(self, hub: 'FrameHub', buffer_size: int):
+		self._hub = hub
+		self._buffer: deque[StreamFrame] = deque(maxlen=buffer_size)
+		self._ready = asyncio.Event()
+		self.dropped = 0
+
+	def _push(self, frame: StreamFrame) -> None:
+		if len(self._buffer) == self._buffer.maxlen:
+			self.dropped += 1  # deque(maxlen) evicts the oldest frame
+			self._hub.dropped += 1
+		self._buffer.append(frame)
+		self._ready.set()
+
+	async def get(self, timeout: float | None = None) -> StreamFrame | None:
+		"""Wait for the next buffered frame. Returns None on timeout or once the hub is closed."""
+		while not self._buffer:
+			if self._hub.closed:
+				return None
+			self._ready.clear()
+			try:
+				await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+			except TimeoutError:
+				return None
+		return self._buffer.popleft()
+
+	def close(self) -> None:
+		self._hub._unsubscribe(self)
+		self._ready.set()
+
+	async def __aenter__(self) -> 'FrameSubscription':
+		return self
+
+	async def __aexit__(self, *exc_info) -> None:
+		self.close()
+
+
+class FrameHub:
+	"""Publish/subscribe hub for screencast frames with per-subscriber ring buffers."""
+
+	def __init__(self, buffer_size: int = 3):
+		self.buffer_size = buffer_size
+		self._subscribers: set[FrameSubscription] = set()
+		self._latest: StreamFrame | None = None
+		self._seq = 0
+		self._listeners: list[Callable[[int], None]] = []
+		self.closed = False
+		self.dropped = 0  # frames evicted from any subscriber's buffer before being read
+
+	@property
+	def latest(self) -> StreamFrame | None:
+		return self._latest
+
+	@property
+	def subscriber_count(self) -> int:
+		return len(self._subscribers)
+
+	@property
+	def published(self) -> int:
+		return self._seq
+
+	def add_listener(self, callback: Callable[[int], None]) -> None:
+		"""Call `callback(subscriber_count)` whenever a viewer subscribes or unsubscribes."""
+		self._listeners.append(callback)
+
+	def remove_listener(self, callback: Callable[[int], None]) -> None:
+		if callback in self._listeners:
+			self._listeners.remove(callback)
+
+	def publish(self, data: bytes, url: str = '') -> StreamFrame:
+		"""Store `data` as the latest frame and hand it to every subscriber. Never blocks."""
+		self._seq += 1
+		frame = StreamFrame(data=data, url=url, timestamp=time.time(), seq=self._seq)
+		self._latest = frame
+		for subscription in self._subscribers:
+			subscription._push(frame)
+		return frame
+
+	def subscribe(self, buffer_size: int | None = None, replay_latest: bool = True) -> FrameSubscription:
+		"""Register a new viewer. With `replay_latest`, the current frame is queued for it right away."""
+		subscription = FrameSubscription(self, buffer_size or self.buffer_size)
+		if replay_latest and self._latest is not None:
+			subscription._push(self._latest)
+		self._subscribers.add(subscription)
+		self._notify()
+		return subscription
+
+	def close(self) -> None:
+		"""Wake every subscriber so pending `get()` calls return None."""
+		self.closed = True
+		for subscription in list(self._subscribers):
+			subscription._ready.set()
+
+	def reset(self) -> None:
+		"""Forget the latest frame and reopen the hub, e.g. when a pooled browser is reused."""
+		self._latest = None
+		self.closed = False
+
+	def _unsubscribe(self, subscription: FrameSubscription) -> None:
+		if subscription in self._subscribers:
+			self._subscribers.discard(subscription)
+			self._notify()
+
+	def _notify(self) -> None:
+		for callback in list(self._listeners):
+			callback(len(self._subscribers))
@@ -0,0 +1,269 @@
+"""Pool of pre-launched browser sessions that can be leased by short-lived agent runs.
+
+Launching a local browser (process spawn, CDP URL discovery, watchdog attachment) costs
+seconds per run. The pool keeps `min_size` sessions launched with `keep_alive=True` and
+hands them out to callers. Every lease runs in its own browser context, disposed on release,
+so each run starts without the cookies, storage, cache and tabs of earlier ones.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from browser_agent.browser.session import BrowserSession
+from browser_agent.utils import create_task_with_error_handling
+
+logger = logging.getLogger(__name__)
+
+
+def _absolute_path(path: str | Path) -> str:
+	return str(Path(path).expanduser().resolve())
+
+
+class BrowserPool:
+	"""Bounded pool of warm, reusable `BrowserSession` instances.
+
+	```python
+	pool = BrowserPool(min_size=2, max_size=5)
+	await pool.start()
+	async with pool.lease() as browser_session:
+	    agent = Agent(task=..., llm=..., browser_session=browser_session)
+	    await agent.run()
+	await pool.close()
+	```
+
+	Sessions are recycled after `max_uses` leases, or immediately when a lease ends with an
+	exception or the browser lost its CDP connection.
+	"""
+
+	def __init__(
+		self,
+		min_size: int = 1,
+		max_size: int = 5,
+		max_uses: int = 20,
+		session_factory: Callable[[], BrowserSession] | None = None,
+	):
+		if min_size < 0 or max_size < 1 or min_size > max_size:
+			raise ValueError(f'Invalid pool size: min_size={min_size}, max_size={max_size}')
+		self.min_size = min_size
+		self.max_size = max_size
+		self.max_uses = max_uses
+		self._session_factory = session_factory or (lambda: BrowserSession(headless=True, keep_alive=True))
+
+		self._idle: list[BrowserSession] = []
+		self._uses: dict[str, int] = {}  # session.id -> completed leases
+		self._size = 0  # idle + leased + launching
+		self._condition = asyncio.Condition()
+		self._closed = False
+		self._fill_task: asyncio.Task | None = None
+
+	@property
+	def size(self) -> int:
+		return self._size
+
+	@property
+	def idle(self) -> int:
+		return len(self._idle)
+
+	async def start(self) -> None:
+		"""Begin warming `min_size` browsers in the background."""
+		self._closed = False
+		self._schedule_fill()
+
+	async def close(self) -> None:
+		"""Kill every idle browser and stop replenishing. Leased sessions are killed when released."""
+		self._closed = True
+		if self._fill_task and not self._fill_task.done():
+			self._fill_task.cancel()
+		async with self._condition:
+			idle, self._idle = self._idle, []
+			self._condition.notify_all()
+		await asyncio.gather(*(self._discard(session) for session in idle), return_exceptions=True)
+
+	@asynccontextmanager
+	async def lease(self) -> AsyncIterator[BrowserSession]:
+		"""Lease a started browser session for the duration of the `async with` block."""
+		session = await self.acquire()
+		try:
+			yield session
+		except BaseException:
+			await self.release(session, discard=True)
+			raise
+		else:
+			await self.release(session)
+
+	async def acquire(self) -> BrowserSession:
+		"""Return a warm session switched to a fresh browser context, launching one if the pool has room."""
+		session = await self._acquire_session()
+		try:
+			await asyncio.wait_for(self._open_context(session), timeout=15.0)
+		except BaseException:
+			await self._discard(session)
+			async with self._condition:
+				self._size -= 1
+				self._condition.notify()
+			self._schedule_fill()
+			raise
+		return session
+
+	async def _acquire_session(self) -> BrowserSession:
+		"""Return an idle warm session, launching a new one if the pool has room, else wait for a release."""
+		while True:
+			async with self._condition:
+				if self._closed:
+					raise RuntimeError('BrowserPool is closed')
+				if self._idle:
+					return self._idle.pop()
+				if self._size < self.max_size:
+					self._size += 1
+					break
+				await self._condition.wait()
+
+		# Cold start outside the lock so other callers can still grab released sessions
+		try:
+			return await self._launch()
+		except BaseException:
+			async with self._condition:
+				self._size -= 1
+				self._condition.notify()
+			raise
+
+	async def release(self, session: BrowserSession, discard: bool = False) -> None:
+		"""Return a leased session to the pool, disposing its browser context first, or kill it if it can't be reused."""
+		uses = self._uses.get(session.id, 0) + 1
+		self._uses[session.id] = uses
+
+		reusable = not discard and not self._closed and uses < self.max_uses and session.is_cdp_connected
+		if reusable:
+			try:
+				await asyncio.wait_for(self._close_context(session), timeout=15.0)
+			except Exception as e:
+				logger.warning(f'Failed to scrub pooled {session}, discarding it: {type(e).__name__}: {e}')
+				reusable = False
+
+		if not reusable:
+			await self._discard(session)
+			async with self._condition:
+				self._size -= 1
+				self._condition.notify()
+			self._schedule_fill()
+			return
+
+		async with self._condition:
+			self._idle.append(session)
+			self._condition.notify()
+
+	async def _launch(self) -> BrowserSession:
+		session = self._session_factory()
+		if not session.browser_profile.keep_alive:
+			raise ValueError('BrowserPool sessions must be created with keep_alive=True so Agent.close() leaves them running')
+		try:
+			await session.start()
+		except BaseException:
+			await self._discard(session)
+			raise
+		self._uses[session.id] = 0
+		logger.debug(f'Launched pooled {session}')
+		return session
+
+	async def _discard(self, session: BrowserSession) -> None:
+		self._uses.pop(session.id, None)
+		try:
+			await session.kill()
+		except Exception as e:
+			logger.debug(f'Error killing pooled {session}: {type(e).__name__}: {e}')
+
+	async def _open_context(self, session: BrowserSession) -> None:
+		"""Move the session into a new browser context, isolated from every earlier lease.
+
+		Unlike clearing storage for the origins a run is known to have visited, disposing the context
+		also drops storage of origins that never set a cookie and of subdomains of cookie domains.
+		"""
+		cdp_client = session.cdp_client
+		default_targets = session.get_page_targets()
+
+		context_id = (await cdp_client.send.Target.createBrowserContext(params={}))['browserContextId']
+		# Browser-wide settings only apply to the default context unless given the context explicitly
+		profile = session.browser_profile
+		if profile.downloads_path:
+			await cdp_client.send.Browser.setDownloadBehavior(
+				params={
+					'behavior': 'allow',
+					'downloadPath': _absolute_path(profile.downloads_path),
+					'eventsEnabled': True,
+					'browserContextId': context_id,
+				}
+			)
+		if profile.permissions:
+			await cdp_client.send.Browser.grantPermissions(
+				params={'permissions': profile.permissions, 'browserContextId': context_id}  # type: ignore
+			)
+
+		session._browser_context_id = context_id
+		target_id = await session._cdp_create_new_page('about:blank')
+		await session.get_or_create_cdp_session(target_id, focus=True)
+
+		# The default context's tabs would otherwise show up in the agent's tab list
+		for target in default_targets:
+			try:
+				await session._cdp_close_page(target.target_id)
+			except Exception as e:
+				logger.debug(f'Failed to close tab {target.target_id[-4:]} while isolating lease: {e}')
+
+	async def _close_context(self, session: BrowserSession) -> None:
+		"""Dispose the lease's browser context with all its tabs, cookies, storage and cache, leaving one blank tab."""
+		context_id, session._browser_context_id = session._browser_context_id, None
+
+		# Keep a tab in the default context so the browser stays open while the lease's tabs go away
+		keep_target_id = await session._cdp_create_new_page('about:blank')
+		await session.get_or_create_cdp_session(keep_target_id, focus=True)
+		if context_id:
+			await session.cdp_client.send.Target.disposeBrowserContext(params={'browserContextId': context_id})
+		for target in session.get_page_targets():
+			if target.target_id == keep_target_id:
+				continue
+			try:
+				await session._cdp_close_page(target.target_id)
+			except Exception as e:
+				logger.debug(f'Failed to close tab {target.target_id[-4:]} while releasing lease: {e}')
+
+		session._cached_browser_state_summary = None
+		session._cached_selector_map.clear()
+		session._downloaded_files.clear()
+		session._closed_popup_messages.clear()
+		# Don't show the next run's late-joining viewers the last frame of this one
+		session._latest_streaming_frame = None
+		session.frame_hub.reset()
+
+	def _schedule_fill(self) -> None:
+		if self._closed or (self._fill_task and not self._fill_task.done()):
+			return
+		self._fill_task = create_task_with_error_handling(
+			self._fill(), name='browser_pool_fill', logger_instance=logger, suppress_exceptions=True
+		)
+
+	async def _fill(self) -> None:
+		"""Launch browsers until at least `min_size` exist (idle + leased)."""
+		while not self._closed:
+			async with self._condition:
+				if self._size >= self.min_size:
+					return
+				self._size += 1
+			try:
+				session = await self._launch()
+			except Exception as e:
+				async with self._condition:
+					self._size -= 1
+				logger.warning(f'Failed to warm pooled browser: {type(e).__name__}: {e}')
+				return
+			async with self._condition:
+				if self._closed:
+					self._size -= 1
+				else:
+					self._idle.append(session)
+					self._condition.notify()
+					continue
+			await self._discard(session)
+			return
@@ -655,6 +655,40 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 		default=True, description='Only show element IDs in highlights if llm_representation is less than 10 characters.'
 	)
 	paint_order_filtering: bool = Field(default=True, description='Enable paint order filtering. Slightly experimental.')
+	incremental_dom: bool = Field(
+		default=False,
+		description='Keep a live copy of the DOM tree from CDP mutation events and only refetch changed subtrees between steps, instead of a full DOM.getDocument per step. Experimental.',
+	)
+	dom_serialization_cache: bool = Field(
+		default=False,
+		description='Reuse the serialization of identical pages across steps and runs (process-wide cache, optionally on disk via browser_agent.dom.serialization_cache.dom_serialization_cache.configure()). Experimental.',
+	)
+
+	# --- Step screenshots ---
+	screenshot_format: Literal['png', 'jpeg', 'webp'] = Field(
+		default='png', description='Image format of step screenshots. jpeg/webp are several times smaller than png.'
+	)
+	screenshot_quality: int = Field(
+		default=80, ge=1, le=100, description='Compression quality (1-100) of jpeg/webp step screenshots.'
+	)
+	screenshot_downscale: bool = Field(
+		default=False,
+		description="Have the browser render step screenshots at the agent's llm_screenshot_size (when set) instead of at full resolution.",
+	)
+	screenshot_reuse_threshold: int | None = Field(
+		default=None,
+		ge=0,
+		description='Reuse the previous step screenshot when the new one differs by at most this many bits of a 256-bit perceptual hash. None only reuses byte-identical screenshots. Higher values may hide small changes such as typed text.',
+	)
+	screenshot_from_stream: bool = Field(
+		default=False,
+		description='While the live preview screencast is running, use its latest frame as the step screenshot instead of capturing one, if it was painted after the last action. Needs stream_fps >= 16: below that the screencast skips frames and is never used.',
+	)
+	screenshot_stream_max_age: float = Field(
+		default=2.0,
+		gt=0,
+		description='Maximum age in seconds of a screencast frame used as step screenshot (screenshot_from_stream).',
+	)
 	interaction_highlight_color: str = Field(
 		default='rgb(255, 127, 39)',
 		description='Color to use for highlighting elements during interactions (CSS color string).',
@@ -683,6 +717,22 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	)
 	record_video_framerate: int = Field(default=30, description='The framerate to use for the video recording.')
 
+	record_har_streaming: bool = Field(
+		default=False,
+		description='Write each HAR entry to disk as soon as its request completes instead of keeping all of them in memory until the browser stops.',
+	)
+	record_har_max_body_size: int | None = Field(
+		default=10 * 1024 * 1024,
+		description='Largest response body (bytes) fetched for the HAR; larger bodies are left out. None for no limit.',
+	)
+	record_har_body_mime_types: list[str] | None = Field(
+		default=None,
+		description='Only fetch HAR response bodies whose MIME type starts with one of these prefixes, e.g. ["text/", "application/json"]. None for all.',
+	)
+	record_har_body_concurrency: int = Field(
+		default=8, ge=1, description='Maximum number of response bodies fetched for the HAR at the same time.'
+	)
+
 	stream_fps: int = Field(
 		default=10,
 		description='Frames per second for live browser preview streaming.',
@@ -691,6 +741,10 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 		default=85,
 		description='JPEG quality (0-100) for live browser preview streaming.',
 	)
+	stream_adaptive: bool = Field(
+		default=True,
+		description='Pause the live preview screencast while nobody is watching and lower quality/resolution/frame rate when viewers fall behind.',
+	)
 
 	# TODO: finish implementing extension support in extensions.py
 	# extension_ids_to_preinstall: list[str] = Field(
@@ -785,6 +839,17 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 			)
 		return self
 
+	@model_validator(mode='after')
+	def warn_screenshot_from_stream_frame_skip(self) -> Self:
+		"""Warn when screenshot_from_stream can never apply because the screencast skips frames."""
+		# Same everyNthFrame as StreamingWatchdog, which asks Chrome for every (30 / stream_fps)th frame
+		if self.screenshot_from_stream and (self.stream_fps <= 0 or int(30 / self.stream_fps) > 1):
+			logger.warning(
+				f'⚠️ BrowserProfile(screenshot_from_stream=True) has no effect with stream_fps={self.stream_fps}: '
+				'the screencast is off or skips frames, so step screenshots are always captured. Use stream_fps >= 16.'
+			)
+		return self
+
 	@model_validator(mode='after')
 	def validate_proxy_settings(self) -> Self:
 		"""Ensure proxy configuration is consistent."""
@@ -1,8 +1,11 @@
 """Event-driven browser session with backwards compatibility."""
 
 import asyncio
+import base64
+import inspect
 import logging
 import time
+from collections.abc import Callable
 from functools import cached_property
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Self, Union, cast, overload
@@ -45,6 +48,7 @@ from browser_agent.browser.events import (
 	TabClosedEvent,
 	TabCreatedEvent,
 )
+from browser_agent.browser.frame_hub import FrameHub, FrameSubscription
 from browser_agent.browser.profile import BrowserProfile, ProxySettings
 from browser_agent.browser.views import BrowserStateSummary, TabInfo
 from browser_agent.dom.views import DOMRect, EnhancedDOMTreeNode, TargetInfo
@@ -381,7 +385,7 @@ class BrowserSession(BaseModel):
 	# LLM screenshot resizing configuration
 	llm_screenshot_size: tuple[int, int] | None = Field(
 		default=None,
-		description='Target size (width, height) to resize screenshots before sending to LLM. Coordinates from LLM will be scaled back to original viewport size.',
+		description='Size (width, height) that screenshots are scaled to fit, keeping their aspect ratio, before sending to LLM. Coordinates from LLM will be scaled back to original viewport size.',
 	)
 
 	# Cache of original viewport size for coordinate conversion (set when browser state is captured)
@@ -529,11 +533,21 @@ class BrowserSession(BaseModel):
 	_recording_watchdog: Any | None = PrivateAttr(default=None)
 	_streaming_watchdog: Any | None = PrivateAttr(default=None)
 	_captcha_watchdog: Any | None = PrivateAttr(default=None)
+	_traffic_analysis_watchdog: Any | None = PrivateAttr(default=None)
 	_watchdogs_attached: bool = PrivateAttr(default=False)
 
-	# Streaming frame queue for live preview
-	_streaming_frame_queue: asyncio.Queue[str] = PrivateAttr(default_factory=lambda: asyncio.Queue(maxsize=10))
+	# CDP event method -> handlers, fanned out from the single handler cdp-use allows per method
+	_cdp_event_listeners: dict[str, list[Callable[[Any, str | None], Any]]] = PrivateAttr(default_factory=dict)
+	_cdp_event_listeners_client: CDPClient | None = PrivateAttr(default=None)
+
+	# Live preview frames, fanned out to every subscribed viewer
+	_frame_hub: FrameHub = PrivateAttr(default_factory=FrameHub)
+	_streaming_subscription: FrameSubscription | None = PrivateAttr(default=None)
 	_latest_streaming_frame: str | None = PrivateAttr(default=None)
+	# Browser context new tabs are opened in, None for the browser's default context (see BrowserPool)
+	_browser_context_id: str | None = PrivateAttr(default=None)
+	# time.time() when the last action started; screencast frames painted before it show a stale page
+	_last_action_started: float = PrivateAttr(default=0.0)
 
 	_cloud_browser_client: CloudBrowserClient = PrivateAttr(default_factory=lambda: CloudBrowserClient())
 	_demo_mode: 'DemoMode | None' = PrivateAttr(default=None)
@@ -635,7 +649,10 @@ class BrowserSession(BaseModel):
 		self._recording_watchdog = None
 		self._streaming_watchdog = None
 		self._captcha_watchdog = None
+		self._traffic_analysis_watchdog = None
 		self._watchdogs_attached = False
+		self._cdp_event_listeners.clear()
+		self._cdp_event_listeners_client = None
 		if self._demo_mode:
 			self._demo_mode.reset()
 			self._demo_mode = None
@@ -1066,7 +1083,7 @@ class BrowserSession(BaseModel):
 			else:
 				# No pages open at all, create a new one (handles switching to it automatically)
 				assert self._cdp_client_root is not None, 'CDP client root not initialized - browser may not be connected yet'
-				new_target = await self._cdp_client_root.send.Target.createTarget(params={'url': 'about:blank'})
+				new_target = await self._cdp_client_root.send.Target.createTarget(params=self._new_target_params())
 				target_id = new_target['targetId']
 				# Don't await, these may circularly trigger SwitchTabEvent and could deadlock, dispatch to enqueue and return
 				self.event_bus.dispatch(TabCreatedEvent(url='about:blank', target_id=target_id))
@@ -1238,11 +1255,40 @@ class BrowserSession(BaseModel):
 		assert self._cdp_client_root is not None, 'CDP client not initialized - browser may not be connected yet'
 		return self._cdp_client_root
 
+	def on_cdp_event(self, method: str, handler: Callable[[Any, str | None], Any]) -> None:
+		"""Subscribe `handler(event, session_id)` to a root CDP client event such as 'Network.responseReceived'.
+
+		cdp-use keeps a single handler per event method, so watchdogs that registered directly would
+		silently replace each other's handlers. All handlers subscribed here are called in order.
+		"""
+		cdp_client = self.cdp_client
+		if self._cdp_event_listeners_client is not cdp_client:
+			# New root client (reconnect): handlers registered on the old one are gone
+			self._cdp_event_listeners.clear()
+			self._cdp_event_listeners_client = cdp_client
+
+		handlers = self._cdp_event_listeners.get(method)
+		if handlers is None:
+			handlers = self._cdp_event_listeners[method] = []
+
+			async def dispatch(event: Any, session_id: str | None) -> None:
+				for subscribed in list(handlers):
+					try:
+						result = subscribed(event, session_id)
+						if inspect.isawaitable(result):
+							await result
+					except Exception as e:
+						self.logger.debug(f'Error in {method} handler {getattr(subscribed, "__name__", subscribed)}: {e}')
+
+			domain, event_name = method.split('.', 1)
+			getattr(getattr(cdp_client.register, domain), event_name)(dispatch)
+
+		if handler not in handlers:
+			handlers.append(handler)
+
 	async def new_page(self, url: str | None = None) -> 'Page':
 		"""Create a new page (tab)."""
-		from cdp_use.cdp.target.commands import CreateTargetParameters
-
-		params: CreateTargetParameters = {'url': url or 'about:blank'}
+		params = self._new_target_params(url or 'about:blank')
 		result = await self.cdp_client.send.Target.createTarget(params)
 
 		target_id = result['targetId']
@@ -1534,6 +1580,106 @@ class BrowserSession(BaseModel):
 		dom_state = state.dom_state
 		return dom_state.llm_representation()
 
+	async def wait_for_interactive_elements(
+		self, min_elements: int, timeout: float, require_change: bool = False, throttle: float = 0.1, quiet: float = 0.5
+	) -> bool | None:
+		"""Wait in the page until it is worth building the browser state to look for `min_elements` elements.
+
+		A MutationObserver on the document and on every open shadow root recounts candidate elements (links,
+		form controls, ARIA widgets, same-origin iframes included) at most once per `throttle` seconds while
+		the DOM changes, so waiting costs one CDP round trip instead of repeated full DOM builds. The CSS count
+		misses elements that are only interactive through JS listeners, cursor styles or scrolling, so the wait
+		also ends once the DOM has been quiet for `quiet` seconds, leaving the decision to the selector map.
+
+		Args:
+			min_elements: Number of visible interactive elements to wait for
+			timeout: Maximum time to wait in seconds; keep it short, the caller rebuilds the state in between
+			require_change: Only finish after the DOM changed, e.g. when the last built state was still short
+			quiet: Seconds without DOM mutations after which the page counts as settled
+
+		Returns:
+			True if the state should be (re)built, False if the DOM did not change before the timeout,
+			None if the page could not be evaluated
+		"""
+		import json
+
+		script = """
+		(function(minElements, timeoutMs, throttleMs, quietMs, requireChange) {
+			const SELECTOR = 'a[href], button, input:not([type="hidden"]), select, textarea, summary, [onclick], ' +
+				'[contenteditable=""], [contenteditable="true"], [tabindex]:not([tabindex="-1"]), ' +
+				'[role="button"], [role="link"], [role="checkbox"], [role="radio"], [role="tab"], [role="switch"], ' +
+				'[role="menuitem"], [role="option"], [role="combobox"], [role="textbox"], [role="searchbox"], [role="slider"]';
+			const OPTIONS = { childList: true, subtree: true, attributes: true, characterData: true };
+			const visible = el => el.checkVisibility ? el.checkVisibility() : el.getClientRects().length > 0;
+			const observed = new WeakSet();
+			let observer = null;
+			// Mutations inside a shadow root are not reported to observers of the document
+			const watch = root => {
+				if (!observed.has(root)) {
+					observed.add(root);
+					observer.observe(root, OPTIONS);
+				}
+			};
+			function count(root) {
+				watch(root);
+				let n = 0;
+				for (const el of root.querySelectorAll(SELECTOR)) if (visible(el)) n++;
+				for (const el of root.querySelectorAll('*')) {
+					if (el.shadowRoot) n += count(el.shadowRoot);
+					if (el.tagName === 'IFRAME') {
+						try { if (el.contentDocument) n += count(el.contentDocument); } catch (e) {}
+					}
+				}
+				return n;
+			}
+			return new Promise(resolve => {
+				let changed = !requireChange, timer = null, quietTimer = null, deadline = null;
+				const finish = ready => {
+					observer.disconnect();
+					clearTimeout(timer);
+					clearTimeout(quietTimer);
+					clearTimeout(deadline);
+					resolve(ready);
+				};
+				const settle = () => {
+					clearTimeout(quietTimer);
+					quietTimer = setTimeout(() => finish(true), quietMs);
+				};
+				const check = () => {
+					timer = null;
+					const n = count(document);
+					if (changed && document.readyState !== 'loading' && n >= minElements) finish(true);
+				};
+				observer = new MutationObserver(() => {
+					changed = true;
+					settle();
+					if (timer === null) timer = setTimeout(check, throttleMs);
+				});
+				deadline = setTimeout(() => finish(changed), timeoutMs);
+				check();
+				if (changed) settle();
+			});
+		})
+		"""
+		script = (
+			f'{script.strip()}({min_elements}, {int(timeout * 1000)}, {int(throttle * 1000)}, {int(quiet * 1000)}, '
+			f'{json.dumps(require_change)})'
+		)
+
+		try:
+			cdp_session = await self.get_or_create_cdp_session()
+			async with asyncio.timeout(timeout + 5.0):
+				result = await cdp_session.cdp_client.send.Runtime.evaluate(
+					params={'expression': script, 'returnByValue': True, 'awaitPromise': True},
+					session_id=cdp_session.session_id,
+				)
+		except Exception as e:
+			# e.g. the execution context was destroyed by a navigation while waiting
+			self.logger.debug(f'Failed to wait for interactive elements in page: {type(e).__name__}: {e}')
+			return None
+		value = result.get('result', {}).get('value')
+		return value if isinstance(value, bool) else None
+
 	async def attach_all_watchdogs(self) -> None:
 		"""Initialize and attach all watchdogs with explicit handler registration."""
 		# Prevent duplicate watchdog attachment
@@ -1557,6 +1703,7 @@ class BrowserSession(BaseModel):
 		from browser_agent.browser.watchdogs.security_watchdog import SecurityWatchdog
 		from browser_agent.browser.watchdogs.storage_state_watchdog import StorageStateWatchdog
 		from browser_agent.browser.watchdogs.streaming_watchdog import StreamingWatchdog
+		from browser_agent.browser.watchdogs.traffic_analysis_watchdog import TrafficAnalysisWatchdog
 
 		# Initialize CrashWatchdog
 		# CrashWatchdog.model_rebuild()
@@ -1682,6 +1829,11 @@ class BrowserSession(BaseModel):
 			self._har_recording_watchdog = HarRecordingWatchdog(event_bus=self.event_bus, browser_session=self)
 			self._har_recording_watchdog.attach_to_session()
 
+		# Initialize TrafficAnalysisWatchdog (passively indexes response headers and cookies per origin)
+		TrafficAnalysisWatchdog.model_rebuild()
+		self._traffic_analysis_watchdog = TrafficAnalysisWatchdog(event_bus=self.event_bus, browser_session=self)
+		self._traffic_analysis_watchdog.attach_to_session()
+
 		# Initialize CaptchaWatchdog (listens for captcha solver events from the browser proxy)
 		if self.browser_profile.captcha_solver:
 			CaptchaWatchdog.model_rebuild()
@@ -1807,7 +1959,7 @@ class BrowserSession(BaseModel):
 
 			# Ensure we have at least one page
 			if not page_targets_from_manager:
-				new_target = await self._cdp_client_root.send.Target.createTarget(params={'url': 'about:blank'})
+				new_target = await self._cdp_client_root.send.Target.createTarget(params=self._new_target_params())
 				target_id = new_target['targetId']
 				self.logger.debug(f'📄 Created new blank page: {target_id}')
 			else:
@@ -2088,7 +2240,7 @@ class BrowserSession(BaseModel):
 				self.logger.debug(f'🔄 Agent focus set to fallback target {fallback_id[:8]}...')
 			else:
 				# No pages exist — create one
-				new_target = await self._cdp_client_root.send.Target.createTarget(params={'url': 'about:blank'})
+				new_target = await self._cdp_client_root.send.Target.createTarget(params=self._new_target_params())
 				target_id = new_target['targetId']
 				await self.get_or_create_cdp_session(target_id, focus=True)
 				self.logger.debug(f'🔄 Created new blank page during reconnect: {target_id[:8]}...')
@@ -2650,28 +2802,38 @@ class BrowserSession(BaseModel):
 		except Exception as e:
 			self.logger.warning(f'Failed to remove highlights: {e}')
 
+	@property
+	def frame_hub(self) -> FrameHub:
+		"""Pub/sub hub of live screencast frames; each viewer should `subscribe()` on its own."""
+		return self._frame_hub
+
 	def push_streaming_frame(self, frame_b64: str) -> None:
-		"""Push a streaming frame to the queue and update latest frame.
+		"""Publish a streaming frame to all subscribed viewers and update latest frame.
+
+		Without viewers only the latest frame is kept, the frame is neither decoded nor published.
 
 		Args:
 		    frame_b64: Base64-encoded JPEG frame data
 		"""
 		self._latest_streaming_frame = frame_b64
-		try:
-			self._streaming_frame_queue.put_nowait(frame_b64)
-		except asyncio.QueueFull:
-			try:
-				self._streaming_frame_queue.get_nowait()
-				self._streaming_frame_queue.put_nowait(frame_b64)
-			except Exception:
-				pass
+		if self._frame_hub.subscriber_count == 0:
+			return
+		url = ''
+		if self.agent_focus_target_id and self.session_manager:
+			target = self.session_manager.get_target(self.agent_focus_target_id)
+			url = target.url if target else ''
+		# Decoded once here so viewers can send raw JPEG bytes without re-encoding per client
+		self._frame_hub.publish(base64.b64decode(frame_b64), url)
 
 	def get_latest_streaming_frame(self) -> str | None:
 		"""Get the most recent streaming frame."""
 		return self._latest_streaming_frame
 
 	async def get_streaming_frame(self, timeout: float = 1.0) -> str | None:
-		"""Get the next streaming frame from the queue.
+		"""Get the next streaming frame for the session's single default consumer.
+
+		Concurrent viewers should each use `frame_hub.subscribe()` instead, otherwise they
+		share (and split) this one subscription.
 
 		Args:
 		    timeout: Maximum time to wait for a frame
@@ -2679,10 +2841,10 @@ class BrowserSession(BaseModel):
 		Returns:
 		    Base64-encoded frame or None if timeout
 		"""
-		try:
-			return await asyncio.wait_for(self._streaming_frame_queue.get(), timeout=timeout)
-		except (asyncio.TimeoutError, asyncio.QueueEmpty):
-			return None
+		if self._streaming_subscription is None:
+			self._streaming_subscription = self._frame_hub.subscribe(buffer_size=10, replay_latest=False)
+		frame = await self._streaming_subscription.get(timeout=timeout)
+		return base64.b64encode(frame.data).decode('ascii') if frame else None
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='get_element_coordinates')
 	async def get_element_coordinates(self, backend_node_id: int, cdp_session: CDPSession) -> DOMRect | None:
@@ -3326,7 +3488,8 @@ class BrowserSession(BaseModel):
 	async def _cdp_create_new_page(self, url: str = 'about:blank', background: bool = False, new_window: bool = False) -> str:
 		"""Create a new page/tab using CDP Target.createTarget. Returns target ID."""
 		# Only include newWindow when True, letting Chrome auto-create window as needed
-		params = CreateTargetParameters(url=url, background=background)
+		params = self._new_target_params(url)
+		params['background'] = background
 		if new_window:
 			params['newWindow'] = True
 		# Use the root CDP client to create tabs at the browser level
@@ -3337,6 +3500,13 @@ class BrowserSession(BaseModel):
 			result = await self.cdp_client.send.Target.createTarget(params=params)
 		return result['targetId']
 
+	def _new_target_params(self, url: str = 'about:blank') -> CreateTargetParameters:
+		"""Target.createTarget params for a new tab, placed in the session's browser context if it has its own."""
+		params = CreateTargetParameters(url=url)
+		if self._browser_context_id:
+			params['browserContextId'] = self._browser_context_id
+		return params
+
 	async def _cdp_close_page(self, target_id: TargetID) -> None:
 		"""Close a page/tab using CDP Target.closeTarget."""
 		await self.cdp_client.send.Target.closeTarget(params={'targetId': target_id})
@@ -4,6 +4,8 @@ import asyncio
 import time
 from typing import TYPE_CHECKING
 
+from pydantic import Field
+
 from browser_agent.browser.events import (
 	BrowserErrorEvent,
 	BrowserStateRequestEvent,
@@ -11,12 +13,14 @@ from browser_agent.browser.events import (
 	TabCreatedEvent,
 )
 from browser_agent.browser.watchdog_base import BaseWatchdog
+from browser_agent.dom.markdown_extractor import MarkdownCache
 from browser_agent.dom.service import DomService
 from browser_agent.dom.views import (
 	EnhancedDOMTreeNode,
 	SerializedDOMState,
 )
 from browser_agent.observability import observe_debug
+from browser_agent.screenshots.utils import hash_distance, perceptual_hash
 from browser_agent.utils import create_task_with_error_handling, time_execution_async
 
 if TYPE_CHECKING:
@@ -38,10 +42,15 @@ class DOMWatchdog(BaseWatchdog):
 	selector_map: dict[int, EnhancedDOMTreeNode] | None = None
 	current_dom_state: SerializedDOMState | None = None
 	enhanced_dom_tree: EnhancedDOMTreeNode | None = None
+	# Clean markdown for the extract action, reused while the page's DOM doesn't change
+	markdown_cache: MarkdownCache = Field(default_factory=MarkdownCache)
 
 	# Internal DOM service
 	_dom_service: DomService | None = None
 
+	# Last step screenshot and its perceptual hash (if computed), to reuse it while the page looks the same
+	_last_screenshot: tuple[str, int | None] | None = None
+
 	# Network tracking - maps request_id to (url, start_time, method, resource_type)
 	_pending_requests: dict[str, tuple[str, float, str, str | None]] = {}
 
@@ -547,6 +556,8 @@ class DOMWatchdog(BaseWatchdog):
 					paint_order_filtering=self.browser_session.browser_profile.paint_order_filtering,
 					max_iframes=self.browser_session.browser_profile.max_iframes,
 					max_iframe_depth=self.browser_session.browser_profile.max_iframe_depth,
+					incremental=self.browser_session.browser_profile.incremental_dom,
+					serialization_cache=self.browser_session.browser_profile.dom_serialization_cache,
 				)
 
 			# Get serialized DOM tree using the service
@@ -679,14 +690,28 @@ class DOMWatchdog(BaseWatchdog):
 		try:
 			self.logger.debug('🔍 DOMWatchdog._capture_clean_screenshot: Capturing clean screenshot...')
 
-			await self.browser_session.get_or_create_cdp_session(target_id=self.browser_session.agent_focus_target_id, focus=True)
+			cdp_session = await self.browser_session.get_or_create_cdp_session(
+				target_id=self.browser_session.agent_focus_target_id, focus=True
+			)
+
+			frame_b64 = self._get_fresh_streaming_frame(cdp_session.session_id)
+			if frame_b64:
+				return await self._reuse_unchanged_screenshot(frame_b64)
 
 			# Check if handler is registered
 			handlers = self.event_bus.handlers.get('ScreenshotEvent', [])
 			handler_names = [getattr(h, '__name__', str(h)) for h in handlers]
 			self.logger.debug(f'📸 ScreenshotEvent handlers registered: {len(handlers)} - {handler_names}')
 
-			screenshot_event = self.event_bus.dispatch(ScreenshotEvent(full_page=False))
+			profile = self.browser_session.browser_profile
+			screenshot_event = self.event_bus.dispatch(
+				ScreenshotEvent(
+					full_page=False,
+					format=profile.screenshot_format,
+					quality=profile.screenshot_quality,
+					max_size=self.browser_session.llm_screenshot_size if profile.screenshot_downscale else None,
+				)
+			)
 			self.logger.debug('📸 Dispatched ScreenshotEvent, waiting for event to complete...')
 
 			# Wait for the event itself to complete (this waits for all handlers)
@@ -697,7 +722,7 @@ class DOMWatchdog(BaseWatchdog):
 			if screenshot_b64 is None:
 				raise RuntimeError('Screenshot handler returned None')
 			self.logger.debug('🔍 DOMWatchdog._capture_clean_screenshot: ✅ Clean screenshot captured successfully')
-			return str(screenshot_b64)
+			return await self._reuse_unchanged_screenshot(str(screenshot_b64))
 
 		except TimeoutError:
 			self.logger.warning('📸 Clean screenshot timed out after 6 seconds - no handler registered or slow page?')
@@ -706,6 +731,50 @@ class DOMWatchdog(BaseWatchdog):
 			self.logger.warning(f'📸 Clean screenshot failed: {type(e).__name__}: {e}')
 			raise
 
+	def _get_fresh_streaming_frame(self, session_id: str) -> str | None:
+		"""Latest live preview frame as base64 JPEG, if `screenshot_from_stream` is on and the frame is newer than the last action."""
+		profile = self.browser_session.browser_profile
+		streaming_watchdog = self.browser_session._streaming_watchdog
+		# Debug highlights stay on the page until a real capture removes them
+		if not profile.screenshot_from_stream or profile.dom_highlight_elements or streaming_watchdog is None:
+			return None
+		frame_b64 = streaming_watchdog.latest_frame(
+			session_id, since=self.browser_session._last_action_started, max_age=profile.screenshot_stream_max_age
+		)
+		if frame_b64 is None:
+			self.logger.debug('📸 No fresh screencast frame, capturing screenshot')
+			return None
+		self.logger.debug('📸 Using screencast frame as screenshot')
+		return frame_b64
+
+	async def _reuse_unchanged_screenshot(self, screenshot_b64: str) -> str:
+		"""Return the previous step's screenshot object if the page looks the same, else remember the new one.
+
+		Handing out the same string lets consumers (screenshot storage, message serialization) skip work for
+		unchanged pages by identity. Byte-identical captures always match; with `screenshot_reuse_threshold`
+		set, so do captures whose perceptual hashes differ by at most that many bits.
+		"""
+		previous = self._last_screenshot
+		if previous is not None and previous[0] == screenshot_b64:
+			return previous[0]
+
+		threshold = self.browser_session.browser_profile.screenshot_reuse_threshold
+		if threshold is None:
+			self._last_screenshot = (screenshot_b64, None)
+			return screenshot_b64
+
+		try:
+			screenshot_hash = await asyncio.to_thread(perceptual_hash, screenshot_b64)
+		except Exception as e:
+			self.logger.debug(f'📸 Could not hash screenshot: {e}')
+			self._last_screenshot = (screenshot_b64, None)
+			return screenshot_b64
+		if previous is not None and previous[1] is not None and hash_distance(previous[1], screenshot_hash) <= threshold:
+			self.logger.debug('📸 Screenshot unchanged since last step, reusing it')
+			return previous[0]
+		self._last_screenshot = (screenshot_b64, screenshot_hash)
+		return screenshot_b64
+
 	def _detect_pagination_buttons(self, selector_map: dict[int, EnhancedDOMTreeNode]) -> list['PaginationButton']:
 		"""Detect pagination buttons from the DOM selector map.
 
@@ -622,7 +622,7 @@ class DownloadsWatchdog(BaseWatchdog):
 						self.logger.error(f'[DownloadsWatchdog] Error in network response handler: {type(e).__name__}: {e}')
 
 				# Register the callback globally (once)
-				cdp_client.register.Network.responseReceived(on_response_received)
+				self.browser_session.on_cdp_event('Network.responseReceived', on_response_received)
 				self._network_callback_registered = True
 				self.logger.debug('[DownloadsWatchdog] ✅ Registered global network response callback')
 
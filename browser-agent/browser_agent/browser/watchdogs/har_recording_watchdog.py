@@ -3,13 +3,21 @@
 Captures HTTPS network activity via CDP Network domain and writes a HAR 1.2
 file on browser shutdown. Respects `record_har_content` (omit/embed/attach)
 and `record_har_mode` (full/minimal).
+
+With `record_har_streaming`, each entry is serialized to a temporary file as
+soon as its request completes and dropped from memory; on shutdown only the
+HAR envelope is written around it. Response bodies are fetched with bounded
+concurrency and skipped above `record_har_max_body_size` or outside
+`record_har_body_mime_types`; attached bodies are deduplicated by content hash.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import json
+import shutil
 from dataclasses import dataclass, field
 from importlib import metadata as importlib_metadata
 from pathlib import Path
@@ -59,6 +67,7 @@ class _HarEntryBuilder:
 	ts_response: float | None = None
 	ts_finished: float | None = None
 	encoded_data_length: int | None = None
+	decoded_data_length: int = 0  # sum of dataReceived.dataLength, used when the body isn't fetched
 	response_body: bytes | None = None
 	content_length: int | None = None  # From Content-Length header
 	protocol: str | None = None
@@ -154,6 +163,10 @@ class HarRecordingWatchdog(BaseWatchdog):
 		self._top_level_pages: dict[
 			str, dict
 		] = {}  # frameId -> {url, title, startedDateTime, monotonic_start, onContentLoad, onLoad}
+		self._body_tasks: set[asyncio.Task] = set()
+		self._sidecar_files: set[str] = set()  # attach mode: bodies already written, by content-hash filename
+		self._entries_file = None  # streaming mode: open handle of the completed-entries file
+		self._streamed_entries = 0
 
 	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
 		profile = self.browser_session.browser_profile
@@ -166,6 +179,17 @@ class HarRecordingWatchdog(BaseWatchdog):
 		self._har_path = Path(str(profile.record_har_path)).expanduser().resolve()
 		self._har_dir = self._har_path.parent
 		self._har_dir.mkdir(parents=True, exist_ok=True)
+		self._streaming = profile.record_har_streaming
+		self._max_body_size = profile.record_har_max_body_size
+		self._body_mime_types = [m.lower() for m in profile.record_har_body_mime_types or []] or None
+		self._body_semaphore = asyncio.Semaphore(profile.record_har_body_concurrency)
+		self._sidecar_dir: Path | None = None
+		if self._content_mode == 'attach':
+			self._sidecar_dir = self._har_dir / f'{self._har_path.stem}_har_parts'
+			self._sidecar_dir.mkdir(parents=True, exist_ok=True)
+		self._entries_path = self._har_path.with_suffix(self._har_path.suffix + '.entries.tmp')
+		if self._streaming and self._entries_file is None:  # keep streamed entries across reconnects
+			self._entries_file = self._entries_path.open('w', encoding='utf-8')
 
 		try:
 			# Enable Network and Page domains for events
@@ -182,12 +206,13 @@ class HarRecordingWatchdog(BaseWatchdog):
 				self._browser_name = 'Chromium'
 				self._browser_version = ''
 
+			# Network events are shared with other watchdogs (downloads, traffic analysis)
+			self.browser_session.on_cdp_event('Network.requestWillBeSent', self._on_request_will_be_sent)
+			self.browser_session.on_cdp_event('Network.responseReceived', self._on_response_received)
+			self.browser_session.on_cdp_event('Network.dataReceived', self._on_data_received)
+			self.browser_session.on_cdp_event('Network.loadingFinished', self._on_loading_finished)
+			self.browser_session.on_cdp_event('Network.loadingFailed', self._on_loading_failed)
 			cdp = self.browser_session.cdp_client.register
-			cdp.Network.requestWillBeSent(self._on_request_will_be_sent)
-			cdp.Network.responseReceived(self._on_response_received)
-			cdp.Network.dataReceived(self._on_data_received)
-			cdp.Network.loadingFinished(self._on_loading_finished)
-			cdp.Network.loadingFailed(self._on_loading_failed)
 			cdp.Page.lifecycleEvent(self._on_lifecycle_event)
 			cdp.Page.frameNavigated(self._on_frame_navigated)
 
@@ -201,6 +226,8 @@ class HarRecordingWatchdog(BaseWatchdog):
 		if not self._enabled:
 			return
 		try:
+			if self._body_tasks:
+				await asyncio.wait(set(self._body_tasks), timeout=10.0)
 			await self._write_har()
 			self.logger.info(f'📊 HAR file saved: {self._har_path}')
 		except Exception as e:
@@ -369,6 +396,9 @@ class HarRecordingWatchdog(BaseWatchdog):
 			request_id = params.get('requestId') if hasattr(params, 'get') else getattr(params, 'requestId', None)
 			if not request_id or request_id not in self._entries:
 				return
+			data_length = params.get('dataLength') if hasattr(params, 'get') else getattr(params, 'dataLength', None)
+			if isinstance(data_length, int):
+				self._entries[request_id].decoded_data_length += data_length
 			data = params.get('data') if hasattr(params, 'get') else getattr(params, 'data', None)
 			if isinstance(data, str):
 				try:
@@ -385,32 +415,6 @@ class HarRecordingWatchdog(BaseWatchdog):
 				return
 			entry = self._entries[request_id]
 			entry.ts_finished = params.get('timestamp')
-			# Fetch response body via CDP as dataReceived may be incomplete
-			import asyncio as _asyncio
-
-			async def _fetch_body(self_ref, req_id, sess_id):
-				try:
-					resp = await self_ref.browser_session.cdp_client.send.Network.getResponseBody(
-						params={'requestId': req_id}, session_id=sess_id
-					)
-					data = resp.get('body', b'')
-					if resp.get('base64Encoded'):
-						import base64 as _b64
-
-						data = _b64.b64decode(data)
-					else:
-						# Ensure data is bytes even if CDP returns a string
-						if isinstance(data, str):
-							data = data.encode('utf-8', errors='replace')
-					# Ensure we always have bytes
-					if not isinstance(data, bytes):
-						data = bytes(data) if data else b''
-					entry.response_body = data
-				except Exception:
-					pass
-
-			# Always schedule the response body fetch task
-			_asyncio.create_task(_fetch_body(self, request_id, session_id))
 
 			encoded_length = (
 				params.get('encodedDataLength') if hasattr(params, 'get') else getattr(params, 'encodedDataLength', None)
@@ -421,6 +425,14 @@ class HarRecordingWatchdog(BaseWatchdog):
 					entry.transfer_size = entry.encoded_data_length
 				except Exception:
 					entry.encoded_data_length = None
+
+			if self._should_fetch_body(entry):
+				# Fetch response body via CDP as dataReceived may be incomplete
+				task = asyncio.create_task(self._fetch_body(entry, session_id))
+				self._body_tasks.add(task)
+				task.add_done_callback(self._body_tasks.discard)
+			else:
+				self._complete_entry(entry)
 		except Exception as e:
 			self.logger.debug(f'loadingFinished handling error: {e}')
 
@@ -429,6 +441,7 @@ class HarRecordingWatchdog(BaseWatchdog):
 			request_id = params.get('requestId') if hasattr(params, 'get') else getattr(params, 'requestId', None)
 			if request_id and request_id in self._entries:
 				self._entries[request_id].failed = True
+				self._complete_entry(self._entries[request_id])
 		except Exception as e:
 			self.logger.debug(f'loadingFailed handling error: {e}')
 
@@ -485,154 +498,227 @@ class HarRecordingWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.debug(f'frameNavigated handling error: {e}')
 
+	# ===================== Body fetching ========================
+	def _should_fetch_body(self, e: _HarEntryBuilder) -> bool:
+		if self._content_mode == 'omit' or e.failed or not self._include_entry(e):
+			return False
+		known_size = e.content_length if e.content_length is not None else e.encoded_data_length
+		if self._max_body_size is not None and known_size is not None and known_size > self._max_body_size:
+			return False
+		if self._body_mime_types is not None:
+			mime_type = (e.mime_type or '').lower()
+			return any(mime_type.startswith(prefix) for prefix in self._body_mime_types)
+		return True
+
+	async def _fetch_body(self, entry: _HarEntryBuilder, session_id: str | None) -> None:
+		try:
+			async with self._body_semaphore:
+				resp = await self.browser_session.cdp_client.send.Network.getResponseBody(
+					params={'requestId': entry.request_id}, session_id=session_id
+				)
+			data = resp.get('body', b'')
+			if resp.get('base64Encoded'):
+				data = base64.b64decode(data)
+			elif isinstance(data, str):
+				# Ensure data is bytes even if CDP returns a string
+				data = data.encode('utf-8', errors='replace')
+			# Ensure we always have bytes
+			if not isinstance(data, bytes):
+				data = bytes(data) if data else b''
+			# Without a Content-Length header the size is only known now
+			if self._max_body_size is None or len(data) <= self._max_body_size:
+				entry.response_body = data
+			else:
+				entry.decoded_data_length = len(data)
+		except Exception:
+			pass
+		finally:
+			self._complete_entry(entry)
+
+	def _complete_entry(self, e: _HarEntryBuilder) -> None:
+		"""Streaming mode: write a finished entry out and forget it."""
+		if not self._streaming or self._entries_file is None or self._entries.get(e.request_id) is not e:
+			return
+		del self._entries[e.request_id]
+		if not self._include_entry(e):
+			return
+		try:
+			entry_json = json.dumps(self._build_entry(e), ensure_ascii=False)
+			self._entries_file.write((',\n' if self._streamed_entries else '') + entry_json)
+			self._streamed_entries += 1
+		except Exception as ex:
+			self.logger.debug(f'Failed to write HAR entry for {e.url}: {ex}')
+
+	def _write_sidecar(self, content: bytes, mime_type: str | None) -> str:
+		"""Write an attach-mode body file named by its content hash, once per distinct content."""
+		filename = _generate_har_filename(content, mime_type)
+		if filename not in self._sidecar_files and self._sidecar_dir is not None:
+			(self._sidecar_dir / filename).write_bytes(content)
+			self._sidecar_files.add(filename)
+		return filename
+
 	# ===================== HAR Writing ==========================
 	async def _write_har(self) -> None:
-		# Filter by mode and HTTPS already respected at collection time
-		entries = [e for e in self._entries.values() if self._include_entry(e)]
+		tmp_path = self._har_path.with_suffix(self._har_path.suffix + '.tmp')
 
-		har_entries = []
-		sidecar_dir: Path | None = None
-		if self._content_mode == 'attach':
-			sidecar_dir = self._har_dir / f'{self._har_path.stem}_har_parts'
-			sidecar_dir.mkdir(parents=True, exist_ok=True)
+		if self._streaming and self._entries_file is not None:
+			# Requests still in flight at shutdown are written as they are
+			for e in list(self._entries.values()):
+				self._complete_entry(e)
+			self._entries_file.close()
+			self._entries_file = None
+
+			har_text = json.dumps(self._build_har([]), ensure_ascii=False)
+			assert har_text.endswith('[]}}')
+			with tmp_path.open('wb') as out:
+				out.write(har_text[:-3].encode('utf-8'))
+				with self._entries_path.open('rb') as entries_file:
+					shutil.copyfileobj(entries_file, out)
+				out.write(har_text[-3:].encode('utf-8'))
+			tmp_path.replace(self._har_path)
+			self._entries_path.unlink(missing_ok=True)
+			return
 
-		for e in entries:
-			content_obj: dict = {'mimeType': e.mime_type or ''}
+		# Filter by mode and HTTPS already respected at collection time
+		har_entries = [self._build_entry(e) for e in self._entries.values() if self._include_entry(e)]
+		har_obj = self._build_har(har_entries)
+		# Write as bytes explicitly to avoid any text/binary mode confusion in different environments
+		tmp_path.write_bytes(json.dumps(har_obj, indent=2, ensure_ascii=False).encode('utf-8'))
+		tmp_path.replace(self._har_path)
 
-			# Get body data, preferring response_body over encoded_data
-			if e.response_body is not None:
-				body_data = e.response_body
-			else:
-				body_data = e.encoded_data
-
-			# Defensive conversion: ensure body_data is always bytes
-			if isinstance(body_data, str):
-				body_bytes = body_data.encode('utf-8', errors='replace')
-			elif isinstance(body_data, bytearray):
-				body_bytes = bytes(body_data)
-			elif isinstance(body_data, bytes):
-				body_bytes = body_data
-			else:
-				# Fallback: try to convert to bytes
-				try:
-					body_bytes = bytes(body_data) if body_data else b''
-				except (TypeError, ValueError):
-					body_bytes = b''
+	def _build_entry(self, e: _HarEntryBuilder) -> dict:
+		content_obj: dict = {'mimeType': e.mime_type or ''}
+
+		# Get body data, preferring response_body over encoded_data
+		if e.response_body is not None:
+			body_data = e.response_body
+		else:
+			body_data = e.encoded_data
+
+		# Defensive conversion: ensure body_data is always bytes
+		if isinstance(body_data, str):
+			body_bytes = body_data.encode('utf-8', errors='replace')
+		elif isinstance(body_data, bytearray):
+			body_bytes = bytes(body_data)
+		elif isinstance(body_data, bytes):
+			body_bytes = body_data
+		else:
+			# Fallback: try to convert to bytes
+			try:
+				body_bytes = bytes(body_data) if body_data else b''
+			except (TypeError, ValueError):
+				body_bytes = b''
 
-			content_size = len(body_bytes)
+		# Bodies that weren't fetched (omit mode, over the size limit, filtered MIME type) still report their size
+		content_size = len(body_bytes) or e.decoded_data_length
 
-			# Calculate compression (bytes saved by compression)
-			compression = 0
-			if e.content_length is not None and e.encoded_data_length is not None:
-				compression = max(0, e.content_length - e.encoded_data_length)
+		# Calculate compression (bytes saved by compression)
+		compression = 0
+		if e.content_length is not None and e.encoded_data_length is not None:
+			compression = max(0, e.content_length - e.encoded_data_length)
 
-			if self._content_mode == 'embed' and content_size > 0:
-				# Prefer plain text; fallback to base64 only if decoding fails
-				try:
-					text_decoded = body_bytes.decode('utf-8')
-					content_obj['text'] = text_decoded
-					content_obj['size'] = content_size
-					content_obj['compression'] = compression
-				except UnicodeDecodeError:
-					content_obj['text'] = base64.b64encode(body_bytes).decode('ascii')
-					content_obj['encoding'] = 'base64'
-					content_obj['size'] = content_size
-					content_obj['compression'] = compression
-			elif self._content_mode == 'attach' and content_size > 0 and sidecar_dir is not None:
-				filename = _generate_har_filename(body_bytes, e.mime_type)
-				(sidecar_dir / filename).write_bytes(body_bytes)
-				content_obj['_file'] = filename
+		if self._content_mode == 'embed' and body_bytes:
+			# Prefer plain text; fallback to base64 only if decoding fails
+			try:
+				text_decoded = body_bytes.decode('utf-8')
+				content_obj['text'] = text_decoded
 				content_obj['size'] = content_size
 				content_obj['compression'] = compression
-			else:
-				# omit or empty
+			except UnicodeDecodeError:
+				content_obj['text'] = base64.b64encode(body_bytes).decode('ascii')
+				content_obj['encoding'] = 'base64'
 				content_obj['size'] = content_size
-				if content_size > 0:
-					content_obj['compression'] = compression
-
-			started_date_time, total_time_ms, timings = self._compute_timings(e)
-			req_headers_list = [{'name': k, 'value': str(v)} for k, v in (e.request_headers or {}).items()]
-			resp_headers_list = [{'name': k, 'value': str(v)} for k, v in (e.response_headers or {}).items()]
-			request_headers_size = self._calc_headers_size(e.method or 'GET', e.url or '', req_headers_list)
-			response_headers_size = self._calc_headers_size(None, None, resp_headers_list)
-			request_body_size = self._calc_request_body_size(e)
-			request_post_data = None
-			if e.post_data and self._content_mode != 'omit':
-				if self._content_mode == 'embed':
-					request_post_data = {'mimeType': e.request_headers.get('content-type', ''), 'text': e.post_data}
-				elif self._content_mode == 'attach' and sidecar_dir is not None:
-					post_data_bytes = e.post_data.encode('utf-8')
-					req_mime_type = e.request_headers.get('content-type', 'text/plain')
-					req_filename = _generate_har_filename(post_data_bytes, req_mime_type)
-					(sidecar_dir / req_filename).write_bytes(post_data_bytes)
-					request_post_data = {
-						'mimeType': req_mime_type,
-						'_file': req_filename,
-					}
+				content_obj['compression'] = compression
+		elif self._content_mode == 'attach' and body_bytes and self._sidecar_dir is not None:
+			content_obj['_file'] = self._write_sidecar(body_bytes, e.mime_type)
+			content_obj['size'] = content_size
+			content_obj['compression'] = compression
+		else:
+			# omit or empty
+			content_obj['size'] = content_size
+			if content_size > 0:
+				content_obj['compression'] = compression
 
-			http_version = e.protocol if e.protocol else 'HTTP/1.1'
-
-			response_body_size = e.transfer_size
-			if response_body_size is None:
-				response_body_size = e.encoded_data_length
-			if response_body_size is None:
-				response_body_size = content_size if content_size > 0 else -1
-
-			entry_dict = {
-				'startedDateTime': started_date_time,
-				'time': total_time_ms,
-				'request': {
-					'method': e.method or 'GET',
-					'url': e.url or '',
-					'httpVersion': http_version,
-					'headers': req_headers_list,
-					'queryString': [],
-					'cookies': [],
-					'headersSize': request_headers_size,
-					'bodySize': request_body_size,
-					'postData': request_post_data,
-				},
-				'response': {
-					'status': e.status or 0,
-					'statusText': e.status_text or '',
-					'httpVersion': http_version,
-					'headers': resp_headers_list,
-					'cookies': [],
-					'content': content_obj,
-					'redirectURL': '',
-					'headersSize': response_headers_size,
-					'bodySize': response_body_size,
-				},
-				'cache': {},
-				'timings': timings,
-				'pageref': self._page_ref_for_entry(e),
-			}
+		started_date_time, total_time_ms, timings = self._compute_timings(e)
+		req_headers_list = [{'name': k, 'value': str(v)} for k, v in (e.request_headers or {}).items()]
+		resp_headers_list = [{'name': k, 'value': str(v)} for k, v in (e.response_headers or {}).items()]
+		request_headers_size = self._calc_headers_size(e.method or 'GET', e.url or '', req_headers_list)
+		response_headers_size = self._calc_headers_size(None, None, resp_headers_list)
+		request_body_size = self._calc_request_body_size(e)
+		request_post_data = None
+		if e.post_data and self._content_mode != 'omit':
+			if self._content_mode == 'embed':
+				request_post_data = {'mimeType': e.request_headers.get('content-type', ''), 'text': e.post_data}
+			elif self._content_mode == 'attach' and self._sidecar_dir is not None:
+				req_mime_type = e.request_headers.get('content-type', 'text/plain')
+				request_post_data = {
+					'mimeType': req_mime_type,
+					'_file': self._write_sidecar(e.post_data.encode('utf-8'), req_mime_type),
+				}
 
-			# Add security/TLS details if available
-			if e.server_ip_address:
-				entry_dict['serverIPAddress'] = e.server_ip_address
-			if e.server_port is not None:
-				entry_dict['_serverPort'] = e.server_port
-			if e.security_details:
-				# Filter to match Playwright's minimal security details set
-				security_filtered = {}
-				if 'protocol' in e.security_details:
-					security_filtered['protocol'] = e.security_details['protocol']
-				if 'subjectName' in e.security_details:
-					security_filtered['subjectName'] = e.security_details['subjectName']
-				if 'issuer' in e.security_details:
-					security_filtered['issuer'] = e.security_details['issuer']
-				if 'validFrom' in e.security_details:
-					security_filtered['validFrom'] = e.security_details['validFrom']
-				if 'validTo' in e.security_details:
-					security_filtered['validTo'] = e.security_details['validTo']
-				if security_filtered:
-					entry_dict['_securityDetails'] = security_filtered
-			if e.transfer_size is not None:
-				entry_dict['response']['_transferSize'] = e.transfer_size
-
-			har_entries.append(entry_dict)
+		http_version = e.protocol if e.protocol else 'HTTP/1.1'
+
+		response_body_size = e.transfer_size
+		if response_body_size is None:
+			response_body_size = e.encoded_data_length
+		if response_body_size is None:
+			response_body_size = content_size if content_size > 0 else -1
+
+		entry_dict = {
+			'startedDateTime': started_date_time,
+			'time': total_time_ms,
+			'request': {
+				'method': e.method or 'GET',
+				'url': e.url or '',
+				'httpVersion': http_version,
+				'headers': req_headers_list,
+				'queryString': [],
+				'cookies': [],
+				'headersSize': request_headers_size,
+				'bodySize': request_body_size,
+				'postData': request_post_data,
+			},
+			'response': {
+				'status': e.status or 0,
+				'statusText': e.status_text or '',
+				'httpVersion': http_version,
+				'headers': resp_headers_list,
+				'cookies': [],
+				'content': content_obj,
+				'redirectURL': '',
+				'headersSize': response_headers_size,
+				'bodySize': response_body_size,
+			},
+			'cache': {},
+			'timings': timings,
+			'pageref': self._page_ref_for_entry(e),
+		}
 
+		# Add security/TLS details if available
+		if e.server_ip_address:
+			entry_dict['serverIPAddress'] = e.server_ip_address
+		if e.server_port is not None:
+			entry_dict['_serverPort'] = e.server_port
+		if e.security_details:
+			# Filter to match Playwright's minimal security details set
+			security_filtered = {}
+			if 'protocol' in e.security_details:
+				security_filtered['protocol'] = e.security_details['protocol']
+			if 'subjectName' in e.security_details:
+				security_filtered['subjectName'] = e.security_details['subjectName']
+			if 'issuer' in e.security_details:
+				security_filtered['issuer'] = e.security_details['issuer']
+			if 'validFrom' in e.security_details:
+				security_filtered['validFrom'] = e.security_details['validFrom']
+			if 'validTo' in e.security_details:
+				security_filtered['validTo'] = e.security_details['validTo']
+			if security_filtered:
+				entry_dict['_securityDetails'] = security_filtered
+		if e.transfer_size is not None:
+			entry_dict['response']['_transferSize'] = e.transfer_size
+		return entry_dict
+
+	def _build_har(self, har_entries: list[dict]) -> dict:
 		# Try to include our library version in creator
 		try:
 			bu_version = importlib_metadata.version('browser-agent')
@@ -640,7 +726,7 @@ class HarRecordingWatchdog(BaseWatchdog):
 			# Fallback when running from source without installed package metadata
 			bu_version = 'dev'
 
-		har_obj = {
+		return {
 			'log': {
 				'version': '1.2',
 				'creator': {'name': 'browser-agent', 'version': bu_version},
@@ -659,15 +745,10 @@ class HarRecordingWatchdog(BaseWatchdog):
 					}
 					for pid, page_info in self._top_level_pages.items()
 				],
-				'entries': har_entries,
+				'entries': har_entries,  # must stay last, streaming mode splices entries in here
 			}
 		}
 
-		tmp_path = self._har_path.with_suffix(self._har_path.suffix + '.tmp')
-		# Write as bytes explicitly to avoid any text/binary mode confusion in different environments
-		tmp_path.write_bytes(json.dumps(har_obj, indent=2, ensure_ascii=False).encode('utf-8'))
-		tmp_path.replace(self._har_path)
-
 	def _format_page_started_datetime(self, timestamp: float | None) -> str:
 		"""Format page startedDateTime from timestamp."""
 		if timestamp is None:
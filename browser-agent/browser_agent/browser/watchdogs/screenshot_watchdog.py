@@ -9,6 +9,7 @@ from browser_agent.browser.events import ScreenshotEvent
 from browser_agent.browser.views import BrowserError
 from browser_agent.browser.watchdog_base import BaseWatchdog
 from browser_agent.observability import observe_debug
+from browser_agent.screenshots.utils import fit_within
 
 if TYPE_CHECKING:
 	pass
@@ -62,7 +63,14 @@ class ScreenshotWatchdog(BaseWatchdog):
 				pass
 
 			# Prepare screenshot parameters
-			params_dict: dict[str, Any] = {'format': 'png', 'captureBeyondViewport': event.full_page}
+			params_dict: dict[str, Any] = {'format': event.format, 'captureBeyondViewport': event.full_page}
+			if event.format != 'png' and event.quality is not None:
+				params_dict['quality'] = event.quality
+			if event.max_size and not event.clip and not event.full_page:
+				# Let the browser render the viewport straight at the target size instead of resizing afterwards
+				clip = await self._get_fitted_viewport_clip(cdp_session, event.max_size)
+				if clip:
+					params_dict['clip'] = clip
 			if event.clip:
 				params_dict['clip'] = {
 					'x': event.clip['x'],
@@ -86,3 +94,32 @@ class ScreenshotWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.error(f'[ScreenshotWatchdog] Screenshot failed: {e}')
 			raise
+
+	async def _get_fitted_viewport_clip(self, cdp_session: Any, max_size: tuple[int, int]) -> dict[str, float] | None:
+		"""Clip covering the visible viewport with a `scale` that renders it at `fit_within(viewport, max_size)`.
+
+		Returns None if the capture already has that size.
+		"""
+		try:
+			metrics = await cdp_session.cdp_client.send.Page.getLayoutMetrics(session_id=cdp_session.session_id)
+		except Exception as e:
+			self.logger.debug(f'[ScreenshotWatchdog] Could not read layout metrics for downscaling: {e}')
+			return None
+		viewport = metrics.get('cssVisualViewport') or {}
+		width, height = viewport.get('clientWidth', 0), viewport.get('clientHeight', 0)
+		if width <= 0 or height <= 0:
+			return None
+		# visualViewport is in device pixels, the output image is (clip size * scale * device pixel ratio)
+		device_width = (metrics.get('visualViewport') or {}).get('clientWidth', 0)
+		device_pixel_ratio = device_width / width if device_width > 0 else 1.0
+		scale = fit_within((width, height), max_size)[0] / width / device_pixel_ratio
+		if abs(scale - 1) < 0.005:
+			return None
+		return {
+			# Clip coordinates are relative to the document, not the viewport
+			'x': viewport.get('pageX', 0),
+			'y': viewport.get('pageY', 0),
+			'width': width,
+			'height': height,
+			'scale': scale,
+		}
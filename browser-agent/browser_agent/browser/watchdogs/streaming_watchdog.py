@@ -1,7 +1,7 @@
 """Streaming Watchdog for live browser preview using CDP screencast."""
 
 import time
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from bubus import BaseEvent
 from cdp_use.cdp.page.events import ScreencastFrameEvent
@@ -12,14 +12,32 @@ from browser_agent.browser.profile import ViewportSize
 from browser_agent.browser.watchdog_base import BaseWatchdog
 from browser_agent.utils import create_task_with_error_handling
 
+# Degradation ladder for adaptive streaming: (quality factor, resolution scale, frame skip multiplier)
+STREAM_LEVELS: list[tuple[float, float, int]] = [
+	(1.0, 1.0, 1),
+	(0.8, 1.0, 1),
+	(0.65, 0.75, 2),
+	(0.5, 0.5, 3),
+]
+MIN_STREAM_QUALITY = 20
+ADAPT_INTERVAL_SECONDS = 3.0
+# A window is congested above these, and healthy (allowed to step back up) below the latter ones
+CONGESTED_DROP_RATIO = 0.2
+CONGESTED_ACK_LATENCY = 0.25
+HEALTHY_ACK_LATENCY = 0.08
+
 
 class StreamingWatchdog(BaseWatchdog):
 	"""
 	Manages live browser preview streaming using CDP screencasting.
 
-	This watchdog captures frames at a configurable FPS and pushes them
-	to the browser session's frame queue for consumption by external clients
+	This watchdog captures frames at a configurable FPS and publishes them
+	to the browser session's frame hub for consumption by external clients
 	(e.g., WebSocket server endpoints).
+
+	With `stream_adaptive` (default) the screencast only runs while the frame hub has
+	subscribers, and quality, resolution and frame skipping are stepped down/up based on
+	how many frames viewers drop and how long CDP takes to acknowledge frames.
 	"""
 
 	LISTENS_TO: ClassVar[list[type[BaseEvent]]] = [BrowserConnectedEvent, BrowserStopEvent, AgentFocusChangedEvent]
@@ -27,7 +45,20 @@ class StreamingWatchdog(BaseWatchdog):
 
 	_current_session_id: str | None = PrivateAttr(default=None)
 	_screencast_active: bool = PrivateAttr(default=False)
+	_screencast_params: dict[str, Any] | None = PrivateAttr(default=None)
+	_base_params: dict[str, Any] | None = PrivateAttr(default=None)
 	_last_frame_time: float = PrivateAttr(default=0.0)
+	_started_at: float = PrivateAttr(default=0.0)  # time.time() of the last (re)start, frames before it may be of another tab
+	_latest_frame: tuple[str, float] | None = PrivateAttr(default=None)  # (base64 JPEG, CDP paint timestamp)
+
+	# Adaptive streaming state
+	_adaptive: bool = PrivateAttr(default=False)
+	_level: int = PrivateAttr(default=0)
+	_ack_latency: float = PrivateAttr(default=0.0)  # EMA, seconds
+	_window_started: float = PrivateAttr(default=0.0)
+	_window_published: int = PrivateAttr(default=0)
+	_window_dropped: int = PrivateAttr(default=0)
+	_subscriber_listener: Any = PrivateAttr(default=None)
 
 	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
 		"""
@@ -47,15 +78,30 @@ class StreamingWatchdog(BaseWatchdog):
 
 		self.browser_session.cdp_client.register.Page.screencastFrame(self.on_screencastFrame)
 
-		self._screencast_params = {
+		self._base_params = {
 			'format': 'jpeg',
 			'quality': getattr(profile, 'stream_quality', 85),
 			'maxWidth': size['width'],
 			'maxHeight': size['height'],
 			'everyNthFrame': max(1, int(30 / stream_fps)),
 		}
+		self._level = 0
+		self._screencast_params = self._params_for_level(0)
+		self._adaptive = getattr(profile, 'stream_adaptive', True)
+
+		if not self._adaptive:
+			await self._start_screencast()
+			return
 
-		await self._start_screencast()
+		hub = self.browser_session.frame_hub
+		if self._subscriber_listener is not None:
+			hub.remove_listener(self._subscriber_listener)
+		self._subscriber_listener = self._on_subscribers_changed
+		hub.add_listener(self._subscriber_listener)
+		if hub.subscriber_count > 0:
+			await self._start_screencast()
+		else:
+			self.logger.debug('[StreamingWatchdog] No viewers yet, screencast paused until one subscribes')
 
 	async def on_AgentFocusChangedEvent(self, event: AgentFocusChangedEvent) -> None:
 		"""
@@ -65,7 +111,24 @@ class StreamingWatchdog(BaseWatchdog):
 			self.logger.debug(f'[StreamingWatchdog] Agent focus changed to {event.target_id}, switching screencast...')
 			await self._start_screencast()
 
-	async def _start_screencast(self) -> None:
+	def _on_subscribers_changed(self, count: int) -> None:
+		"""Frame hub listener: pause the screencast when the last viewer leaves, resume on the first."""
+		if not self._screencast_params or self.browser_session._streaming_watchdog is not self:
+			return  # stale listener left behind by a session reset
+		if count > 0 and not self._screencast_active:
+			coro = self._start_screencast()
+		elif count == 0 and self._screencast_active:
+			coro = self._stop_screencast()
+		else:
+			return
+		create_task_with_error_handling(
+			coro,
+			name='toggle_screencast_streaming',
+			logger_instance=self.logger,
+			suppress_exceptions=True,
+		)
+
+	async def _start_screencast(self, restart: bool = False) -> None:
 		"""Starts screencast on the currently focused tab."""
 		if not self._screencast_params:
 			return
@@ -73,7 +136,7 @@ class StreamingWatchdog(BaseWatchdog):
 		try:
 			cdp_session = await self.browser_session.get_or_create_cdp_session()
 
-			if self._current_session_id == cdp_session.session_id and self._screencast_active:
+			if self._current_session_id == cdp_session.session_id and self._screencast_active and not restart:
 				return
 
 			if self._current_session_id:
@@ -89,6 +152,8 @@ class StreamingWatchdog(BaseWatchdog):
 				session_id=cdp_session.session_id,
 			)
 			self._screencast_active = True
+			self._started_at = time.time()
+			self._reset_window()
 			self.logger.info(f'[StreamingWatchdog] Started streaming on target {cdp_session.target_id}')
 
 		except Exception as e:
@@ -96,6 +161,85 @@ class StreamingWatchdog(BaseWatchdog):
 			self._screencast_active = False
 			self._current_session_id = None
 
+	async def _stop_screencast(self) -> None:
+		"""Stops the screencast but keeps its parameters so it can be resumed."""
+		session_id = self._current_session_id
+		self._screencast_active = False
+		self._current_session_id = None
+		if not session_id:
+			return
+		try:
+			await self.browser_session.cdp_client.send.Page.stopScreencast(session_id=session_id)
+			self.logger.debug('[StreamingWatchdog] Paused streaming, no viewers left')
+		except Exception as e:
+			self.logger.debug(f'[StreamingWatchdog] Failed to stop screencast: {e}')
+
+	def latest_frame(self, session_id: str, since: float, max_age: float) -> str | None:
+		"""
+		Latest frame streamed from `session_id` (base64 JPEG) if it was painted after `since` and at most `max_age` seconds ago.
+
+		Frames are only sent on repaint, so the latest one shows the page as it currently looks unless it predates
+		`since` (e.g. the last action). Paint times come from the frame metadata, not from when the frame arrived.
+		Returns None while paused, streaming another target, at a reduced resolution or when frames are skipped
+		(`everyNthFrame` > 1), since the last paint may then never have been sent.
+		"""
+		if not self._screencast_active or session_id != self._current_session_id:
+			return None
+		params = self._screencast_params or {}
+		if STREAM_LEVELS[self._level][1] != 1.0 or params.get('everyNthFrame', 1) != 1:
+			return None
+		if self._latest_frame is None:
+			return None
+		frame_b64, painted_at = self._latest_frame
+		if painted_at <= max(since, self._started_at) or time.time() - painted_at > max_age:
+			return None
+		return frame_b64
+
+	def _params_for_level(self, level: int) -> dict[str, Any]:
+		assert self._base_params is not None
+		quality_factor, scale, skip = STREAM_LEVELS[level]
+		return {
+			**self._base_params,
+			'quality': max(MIN_STREAM_QUALITY, int(self._base_params['quality'] * quality_factor)),
+			'maxWidth': int(self._base_params['maxWidth'] * scale),
+			'maxHeight': int(self._base_params['maxHeight'] * scale),
+			'everyNthFrame': self._base_params['everyNthFrame'] * skip,
+		}
+
+	def _reset_window(self) -> None:
+		hub = self.browser_session.frame_hub
+		self._window_started = time.monotonic()
+		self._window_published = hub.published
+		self._window_dropped = hub.dropped
+
+	async def _maybe_adapt(self) -> None:
+		"""Once per window, step the stream level down when viewers fall behind and back up when they keep up."""
+		if not self._adaptive or not self._screencast_active:
+			return
+		if time.monotonic() - self._window_started < ADAPT_INTERVAL_SECONDS:
+			return
+
+		hub = self.browser_session.frame_hub
+		delivered = (hub.published - self._window_published) * max(1, hub.subscriber_count)
+		drop_ratio = (hub.dropped - self._window_dropped) / max(1, delivered)
+		self._reset_window()
+
+		level = self._level
+		if drop_ratio > CONGESTED_DROP_RATIO or self._ack_latency > CONGESTED_ACK_LATENCY:
+			level = min(level + 1, len(STREAM_LEVELS) - 1)
+		elif drop_ratio == 0 and self._ack_latency < HEALTHY_ACK_LATENCY:
+			level = max(level - 1, 0)
+		if level == self._level:
+			return
+
+		self.logger.debug(
+			f'[StreamingWatchdog] Stream level {self._level} -> {level} '
+			f'(drop_ratio={drop_ratio:.2f}, ack_latency={self._ack_latency * 1000:.0f}ms)'
+		)
+		self._level = level
+		self._screencast_params = self._params_for_level(level)
+		await self._start_screencast(restart=True)
+
 	async def _get_current_viewport_size(self) -> ViewportSize | None:
 		"""Gets the current viewport size directly from the browser via CDP."""
 		try:
@@ -117,7 +261,7 @@ class StreamingWatchdog(BaseWatchdog):
 		"""
 		Synchronous handler for incoming screencast frames.
 
-		Pushes frames to the browser session's frame queue.
+		Publishes frames to the browser session's frame hub.
 		"""
 		if self._current_session_id and session_id != self._current_session_id:
 			return
@@ -131,6 +275,8 @@ class StreamingWatchdog(BaseWatchdog):
 
 		self.browser_session.push_streaming_frame(frame_data)
 		self._last_frame_time = time.time()
+		painted_at = event.get('metadata', {}).get('timestamp')
+		self._latest_frame = (frame_data, painted_at) if painted_at else None
 
 		create_task_with_error_handling(
 			self._ack_screencast_frame(event, session_id),
@@ -141,8 +287,9 @@ class StreamingWatchdog(BaseWatchdog):
 
 	async def _ack_screencast_frame(self, event: ScreencastFrameEvent, session_id: str | None) -> None:
 		"""
-		Asynchronously acknowledges a screencast frame.
+		Asynchronously acknowledges a screencast frame, tracking ack latency for adaptation.
 		"""
+		started = time.monotonic()
 		try:
 			await self.browser_session.cdp_client.send.Page.screencastFrameAck(
 				params={'sessionId': event['sessionId']},
@@ -150,13 +297,19 @@ class StreamingWatchdog(BaseWatchdog):
 			)
 		except Exception as e:
 			self.logger.debug(f'[StreamingWatchdog] Failed to acknowledge screencast frame: {e}')
+			return
+		self._ack_latency = 0.8 * self._ack_latency + 0.2 * (time.monotonic() - started)
+		await self._maybe_adapt()
 
 	async def on_BrowserStopEvent(self, event: BrowserStopEvent) -> None:
 		"""
 		Stops the streaming session.
 		"""
+		if self._subscriber_listener is not None:
+			self.browser_session.frame_hub.remove_listener(self._subscriber_listener)
+			self._subscriber_listener = None
 		if self._screencast_active:
 			self.logger.debug('[StreamingWatchdog] Stopping streaming...')
-			self._screencast_active = False
-			self._current_session_id = None
-			self._screencast_params = None
+		self._screencast_active = False
+		self._current_session_id = None
+		self._screencast_params = None
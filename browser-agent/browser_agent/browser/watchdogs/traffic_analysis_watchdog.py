@@ -0,0 +1,249 @@
+"""Passive per-origin index of response headers and cookies seen in the browser's own traffic.
+
+Security checks used to re-request the current page from page JS to read its headers, which costs
+an extra request, never sees `Set-Cookie` (or HttpOnly cookies at all) and ignores every other
+response the browser already received. This watchdog listens to `Network.responseReceived` and
+`Network.responseReceivedExtraInfo` (raw headers, including `Set-Cookie`) for all tabs and keeps
+the document headers per document URL and frame and the cookies set per origin, so those checks
+are answered from memory with zero extra requests.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar
+from urllib.parse import urlparse
+
+from bubus import BaseEvent
+from cdp_use.cdp.network.events import ResponseReceivedEvent, ResponseReceivedExtraInfoEvent
+from pydantic import PrivateAttr
+
+from browser_agent.browser.events import BrowserConnectedEvent, TabCreatedEvent
+from browser_agent.browser.watchdog_base import BaseWatchdog
+
+# requestId bookkeeping needed to pair the two response events; oldest entries are dropped beyond this
+MAX_TRACKED_REQUESTS = 2000
+# Document responses kept per origin, oldest first out
+MAX_DOCUMENTS_PER_ORIGIN = 50
+
+
+@dataclass
+class ObservedCookie:
+	"""A cookie as set by a `Set-Cookie` response header."""
+
+	name: str
+	set_by: str  # URL of the response that set it
+	secure: bool = False
+	http_only: bool = False
+	same_site: str | None = None
+	domain: str | None = None
+	path: str | None = None
+	persistent: bool = False  # has Max-Age/Expires, i.e. survives the browser session
+
+	def to_dict(self) -> dict[str, Any]:
+		return asdict(self)
+
+	@property
+	def key(self) -> tuple[str, str, str]:
+		"""(name, domain, path) identifying the cookie, with the defaults the browser applies when attributes are missing."""
+		parsed = urlparse(self.set_by)
+		if self.path and self.path.startswith('/'):
+			path = self.path
+		else:
+			# Default-path: the request path up to, but not including, its last '/'
+			path = parsed.path[: parsed.path.rfind('/')] if parsed.path.count('/') > 1 else '/'
+		return cookie_key(self.name, self.domain or parsed.hostname or '', path)
+
+
+@dataclass
+class ObservedDocument:
+	"""A document response received for a frame."""
+
+	url: str
+	frame_id: str | None
+	status: int | None
+	headers: dict[str, str]  # lower-cased names
+
+
+@dataclass
+class OriginTraffic:
+	"""What the browser has received from one origin so far."""
+
+	origin: str
+	responses: int = 0
+	document_url: str | None = None
+	document_status: int | None = None
+	document_headers: dict[str, str] = field(default_factory=dict)  # latest document response, lower-cased names
+	documents: dict[tuple[str, str | None], ObservedDocument] = field(default_factory=dict)  # (URL, frame id) -> latest
+	cookies: dict[tuple[str, str, str], ObservedCookie] = field(
+		default_factory=dict
+	)  # latest Set-Cookie per (name, domain, path)
+
+
+def origin_of(url: str | None) -> str:
+	if not url:
+		return ''
+	parsed = urlparse(url)
+	if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+		return ''
+	return f'{parsed.scheme}://{parsed.netloc.lower()}'
+
+
+def document_key(url: str) -> str:
+	"""Document URL without its fragment, which never reaches the server."""
+	return url.split('#', 1)[0]
+
+
+def cookie_key(name: str, domain: str, path: str) -> tuple[str, str, str]:
+	return name, domain.lstrip('.').lower(), path or '/'
+
+
+def parse_set_cookie(header_value: str, set_by: str) -> list[ObservedCookie]:
+	"""Parse a raw `Set-Cookie` header value; CDP joins multiple cookies with newlines."""
+	cookies = []
+	for line in header_value.split('\n'):
+		parts = [part.strip() for part in line.split(';')]
+		name = parts[0].split('=', 1)[0].strip() if parts and '=' in parts[0] else ''
+		if not name:
+			continue
+		cookie = ObservedCookie(name=name, set_by=set_by)
+		for attribute in parts[1:]:
+			key, _, value = attribute.partition('=')
+			key = key.strip().lower()
+			if key == 'secure':
+				cookie.secure = True
+			elif key == 'httponly':
+				cookie.http_only = True
+			elif key == 'samesite':
+				cookie.same_site = value.strip() or None
+			elif key == 'domain':
+				cookie.domain = value.strip() or None
+			elif key == 'path':
+				cookie.path = value.strip() or None
+			elif key in ('max-age', 'expires'):
+				cookie.persistent = True
+		cookies.append(cookie)
+	return cookies
+
+
+class TrafficAnalysisWatchdog(BaseWatchdog):
+	"""Indexes response headers and cookies per origin as traffic flows."""
+
+	LISTENS_TO: ClassVar[list[type[BaseEvent]]] = [BrowserConnectedEvent, TabCreatedEvent]
+	EMITS: ClassVar[list[type[BaseEvent]]] = []
+
+	_origins: dict[str, OriginTraffic] = PrivateAttr(default_factory=dict)
+	_request_urls: dict[str, str] = PrivateAttr(default_factory=dict)  # requestId -> response URL
+	# requestId -> Set-Cookie that arrived before its responseReceived
+	_pending_set_cookies: dict[str, str] = PrivateAttr(default_factory=dict)
+	_network_enabled_targets: set[str] = PrivateAttr(default_factory=set)
+
+	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
+		self._network_enabled_targets.clear()
+		self.browser_session.on_cdp_event('Network.responseReceived', self._on_response_received)
+		self.browser_session.on_cdp_event('Network.responseReceivedExtraInfo', self._on_response_received_extra_info)
+		try:
+			cdp_session = await self.browser_session.get_or_create_cdp_session()
+			await self._enable_network(cdp_session.target_id, cdp_session.session_id)
+		except Exception as e:
+			self.logger.debug(f'[TrafficAnalysisWatchdog] Failed to enable network events: {e}')
+
+	async def on_TabCreatedEvent(self, event: TabCreatedEvent) -> None:
+		if not event.target_id or event.target_id in self._network_enabled_targets:
+			return
+		try:
+			cdp_session = await self.browser_session.get_or_create_cdp_session(event.target_id, focus=False)
+			await self._enable_network(event.target_id, cdp_session.session_id)
+		except Exception as e:
+			self.logger.debug(f'[TrafficAnalysisWatchdog] Failed to enable network events for {event.target_id[-4:]}: {e}')
+
+	async def _enable_network(self, target_id: str, session_id: str | None) -> None:
+		# Network.enable is idempotent, other watchdogs may already have enabled it for this target
+		await self.browser_session.cdp_client.send.Network.enable(session_id=session_id)
+		self._network_enabled_targets.add(target_id)
+
+	# =============== Queries ==================
+
+	def get_origin(self, url: str) -> OriginTraffic | None:
+		return self._origins.get(origin_of(url))
+
+	def document_headers(self, url: str, frame_id: str | None = None) -> tuple[str, dict[str, str]] | None:
+		"""(document URL, headers) of the document response for `url`, if one was seen.
+
+		Prefers the response loaded into `frame_id`, then the latest one for `url` in any frame, and only
+		falls back to the latest document response from `url`'s origin when `url` itself was never loaded.
+		"""
+		traffic = self.get_origin(url)
+		if traffic is None or traffic.document_url is None:
+			return None
+		key = document_key(url)
+		document = traffic.documents.get((key, frame_id)) if frame_id else None
+		if document is None:
+			document = next((doc for (doc_url, _), doc in reversed(traffic.documents.items()) if doc_url == key), None)
+		if document is not None:
+			return document.url, document.headers
+		return traffic.document_url, traffic.document_headers
+
+	def cookies(self, url: str) -> list[ObservedCookie]:
+		"""Cookies set by responses from `url`'s origin."""
+		traffic = self.get_origin(url)
+		return list(traffic.cookies.values()) if traffic else []
+
+	# =============== CDP Event Handlers (sync) ==================
+
+	def _on_response_received(self, event: ResponseReceivedEvent, session_id: str | None) -> None:
+		response = event.get('response') or {}
+		url = response.get('url', '')
+		origin = origin_of(url)
+		if not origin:
+			return
+		traffic = self._origins.get(origin)
+		if traffic is None:
+			traffic = self._origins[origin] = OriginTraffic(origin=origin)
+		traffic.responses += 1
+
+		if event.get('type') == 'Document':
+			traffic.document_url = url
+			traffic.document_status = response.get('status')
+			traffic.document_headers = {name.lower(): str(value) for name, value in (response.get('headers') or {}).items()}
+			key = (document_key(url), event.get('frameId'))
+			traffic.documents.pop(key, None)  # re-insert so iteration order stays oldest to newest
+			traffic.documents[key] = ObservedDocument(
+				url=url, frame_id=key[1], status=traffic.document_status, headers=traffic.document_headers
+			)
+			if len(traffic.documents) > MAX_DOCUMENTS_PER_ORIGIN:
+				traffic.documents.pop(next(iter(traffic.documents)))
+
+		request_id = event.get('requestId')
+		if not request_id:
+			return
+		pending = self._pending_set_cookies.pop(request_id, None)
+		if pending is not None:
+			self._record_cookies(traffic, pending, url)
+		else:
+			self._remember(self._request_urls, request_id, url)
+
+	def _on_response_received_extra_info(self, event: ResponseReceivedExtraInfoEvent, session_id: str | None) -> None:
+		headers = event.get('headers') or {}
+		set_cookie = next((str(value) for name, value in headers.items() if name.lower() == 'set-cookie'), None)
+		if not set_cookie:
+			return
+		request_id = event.get('requestId', '')
+		url = self._request_urls.pop(request_id, None)
+		if url is None:
+			# ExtraInfo may arrive before responseReceived; pair them up when it does
+			self._remember(self._pending_set_cookies, request_id, set_cookie)
+			return
+		traffic = self._origins.get(origin_of(url))
+		if traffic is not None:
+			self._record_cookies(traffic, set_cookie, url)
+
+	def _record_cookies(self, traffic: OriginTraffic, set_cookie: str, url: str) -> None:
+		for cookie in parse_set_cookie(set_cookie, set_by=url):
+			traffic.cookies[cookie.key] = cookie
+
+	@staticmethod
+	def _remember(mapping: dict[str, str], request_id: str, value: str) -> None:
+		mapping[request_id] = value
+		if len(mapping) > MAX_TRACKED_REQUESTS:
+			mapping.pop(next(iter(mapping)))
@@ -1,15 +1,19 @@
 """
 Enhanced snapshot processing for browser-agent DOM tree extraction.
 
-This module provides stateless functions for parsing Chrome DevTools Protocol (CDP) DOMSnapshot data
-to extract visibility, clickability, cursor styles, and other layout information.
+This module parses Chrome DevTools Protocol (CDP) DOMSnapshot data to extract visibility, clickability,
+cursor styles, and other layout information. The data stays in per-document columns and is only turned
+into `EnhancedSnapshotNode` fields for the nodes and fields that are actually read.
 """
 
+from array import array
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
 from cdp_use.cdp.domsnapshot.commands import CaptureSnapshotReturns
 from cdp_use.cdp.domsnapshot.types import (
 	LayoutTreeSnapshot,
 	NodeTreeSnapshot,
-	RareBooleanData,
 )
 
 from browser_agent.dom.views import DOMRect, EnhancedSnapshotNode
@@ -30,11 +34,6 @@ REQUIRED_COMPUTED_STYLES = [
 ]
 
 
-def _parse_rare_boolean_data(rare_data: RareBooleanData, index: int) -> bool | None:
-	"""Parse rare boolean data from snapshot - returns True if index is in the rare data."""
-	return index in rare_data['index']
-
-
 def _parse_computed_styles(strings: list[str], style_indices: list[int]) -> dict[str, str]:
 	"""Parse computed styles from layout tree using string indices."""
 	styles = {}
@@ -44,15 +43,196 @@ def _parse_computed_styles(strings: list[str], style_indices: list[int]) -> dict
 	return styles
 
 
+class _DocumentColumns:
+	"""Column store for one snapshot document, indexed by snapshot node index.
+
+	Keeps the struct-of-arrays layout of `DOMSnapshot.captureSnapshot` instead of exploding it
+	into per-node objects: rect columns are referenced as parsed, paint orders are packed into an
+	`array`, clickable flags become a set, and each distinct computed-style row is parsed once.
+	"""
+
+	__slots__ = (
+		'strings',
+		'device_pixel_ratio',
+		'layout_rows',
+		'clickable',
+		'bounds',
+		'client_rects',
+		'scroll_rects',
+		'styles',
+		'paint_orders',
+		'stacking_contexts',
+		'style_cache',
+	)
+
+	def __init__(
+		self,
+		nodes: NodeTreeSnapshot,
+		layout: LayoutTreeSnapshot,
+		strings: list[str],
+		device_pixel_ratio: float,
+		style_cache: dict[tuple[int, ...], dict[str, str]],
+	):
+		self.strings = strings
+		self.device_pixel_ratio = device_pixel_ratio
+		# Snapshot node index -> layout index. Built from the reversed column so the FIRST occurrence wins
+		node_index = layout.get('nodeIndex', []) if layout else []
+		self.layout_rows: dict[int, int] = dict(zip(reversed(node_index), range(len(node_index) - 1, -1, -1)))
+		self.clickable: frozenset[int] | None = frozenset(nodes['isClickable']['index']) if 'isClickable' in nodes else None
+		self.bounds = layout.get('bounds', []) if layout else []
+		self.client_rects = layout.get('clientRects', []) if layout else []
+		self.scroll_rects = layout.get('scrollRects', []) if layout else []
+		self.styles = layout.get('styles', []) if layout else []
+		self.paint_orders = array('l', layout.get('paintOrders', [])) if layout else array('l')
+		self.stacking_contexts = layout.get('stackingContexts', {}) if layout else {}
+		self.style_cache = style_cache
+
+	def is_clickable(self, row: int) -> bool | None:
+		return row in self.clickable if self.clickable is not None else None
+
+	def bounds_rect(self, row: int) -> DOMRect | None:
+		layout_idx = self.layout_rows.get(row)
+		if layout_idx is None or layout_idx >= len(self.bounds):
+			return None
+		bounds = self.bounds[layout_idx]
+		if len(bounds) < 4:
+			return None
+		# IMPORTANT: CDP coordinates are in device pixels, convert to CSS pixels by dividing by the device pixel ratio
+		ratio = self.device_pixel_ratio
+		return DOMRect(x=bounds[0] / ratio, y=bounds[1] / ratio, width=bounds[2] / ratio, height=bounds[3] / ratio)
+
+	def _rect(self, column: list[list[float]], row: int) -> DOMRect | None:
+		layout_idx = self.layout_rows.get(row)
+		if layout_idx is None or layout_idx >= len(self.bounds) or layout_idx >= len(column):
+			return None
+		rect = column[layout_idx]
+		if not rect or len(rect) < 4:
+			return None
+		return DOMRect(x=rect[0], y=rect[1], width=rect[2], height=rect[3])
+
+	def client_rect(self, row: int) -> DOMRect | None:
+		return self._rect(self.client_rects, row)
+
+	def scroll_rect(self, row: int) -> DOMRect | None:
+		return self._rect(self.scroll_rects, row)
+
+	def computed_styles(self, row: int) -> dict[str, str] | None:
+		layout_idx = self.layout_rows.get(row)
+		if layout_idx is None or layout_idx >= len(self.bounds) or layout_idx >= len(self.styles):
+			return None
+		key = tuple(self.styles[layout_idx])
+		styles = self.style_cache.get(key)
+		if styles is None:
+			# Shared by every node with the same style row; consumers only read it
+			styles = self.style_cache[key] = _parse_computed_styles(self.strings, self.styles[layout_idx])
+		return styles or None
+
+	def cursor_style(self, row: int) -> str | None:
+		styles = self.computed_styles(row)
+		return styles.get('cursor') if styles else None
+
+	def paint_order(self, row: int) -> int | None:
+		layout_idx = self.layout_rows.get(row)
+		if layout_idx is None or layout_idx >= len(self.bounds) or layout_idx >= len(self.paint_orders):
+			return None
+		return self.paint_orders[layout_idx]
+
+	def stacking_context(self, row: int) -> int | None:
+		layout_idx = self.layout_rows.get(row)
+		if layout_idx is None or layout_idx >= len(self.bounds) or layout_idx >= len(self.stacking_contexts):
+			return None
+		return self.stacking_contexts.get('index', [])[layout_idx]
+
+
+# EnhancedSnapshotNode field -> _DocumentColumns accessor
+_LAZY_FIELDS: dict[str, Callable[[_DocumentColumns, int], Any]] = {
+	'is_clickable': _DocumentColumns.is_clickable,
+	'cursor_style': _DocumentColumns.cursor_style,
+	'bounds': _DocumentColumns.bounds_rect,
+	'clientRects': _DocumentColumns.client_rect,
+	'scrollRects': _DocumentColumns.scroll_rect,
+	'computed_styles': _DocumentColumns.computed_styles,
+	'paint_order': _DocumentColumns.paint_order,
+	'stacking_contexts': _DocumentColumns.stacking_context,
+}
+
+
+class _LazySnapshotNode(EnhancedSnapshotNode):
+	"""`EnhancedSnapshotNode` whose fields are read from the columns on first access.
+
+	Unset slots raise AttributeError, which falls through to `__getattr__`; the computed value is
+	then stored in the slot, so every field is materialized at most once.
+	"""
+
+	__slots__ = ('_columns', '_row')
+
+	def __init__(self, columns: _DocumentColumns, row: int):
+		self._columns = columns
+		self._row = row
+
+	def __getattr__(self, name: str) -> Any:
+		accessor = _LAZY_FIELDS.get(name)
+		if accessor is None:
+			raise AttributeError(name)
+		value = accessor(self._columns, self._row)
+		setattr(self, name, value)
+		return value
+
+	def __eq__(self, other: object) -> bool:
+		# The dataclass __eq__ requires the exact same class, so compare the materialized fields instead
+		if not isinstance(other, EnhancedSnapshotNode):
+			return NotImplemented
+		return all(getattr(self, name) == getattr(other, name) for name in _LAZY_FIELDS)
+
+	__hash__ = None  # type: ignore[assignment]  # mutable like EnhancedSnapshotNode
+
+
+class SnapshotLookup(Mapping[int, EnhancedSnapshotNode]):
+	"""Backend node id -> `EnhancedSnapshotNode`, materialized lazily from per-document columns."""
+
+	def __init__(self):
+		self._documents: list[_DocumentColumns] = []
+		self._rows: dict[int, int] = {}  # backend node id -> document index * _ROW_STRIDE + snapshot index
+		self._nodes: dict[int, EnhancedSnapshotNode] = {}
+
+	def add_document(self, columns: _DocumentColumns, backend_node_ids: list[int]) -> None:
+		base = len(self._documents) * _ROW_STRIDE
+		self._documents.append(columns)
+		self._rows.update(zip(backend_node_ids, range(base, base + len(backend_node_ids))))
+
+	@property
+	def laid_out_count(self) -> int:
+		return sum(len(document.layout_rows) for document in self._documents)
+
+	def __getitem__(self, backend_node_id: int) -> EnhancedSnapshotNode:
+		node = self._nodes.get(backend_node_id)
+		if node is None:
+			document_idx, row = divmod(self._rows[backend_node_id], _ROW_STRIDE)
+			node = self._nodes[backend_node_id] = _LazySnapshotNode(self._documents[document_idx], row)
+		return node
+
+	def __contains__(self, backend_node_id: object) -> bool:
+		return backend_node_id in self._rows
+
+	def __iter__(self) -> Iterator[int]:
+		return iter(self._rows)
+
+	def __len__(self) -> int:
+		return len(self._rows)
+
+
+_ROW_STRIDE = 1 << 32
+
+
 def build_snapshot_lookup(
 	snapshot: CaptureSnapshotReturns,
 	device_pixel_ratio: float = 1.0,
-) -> dict[int, EnhancedSnapshotNode]:
-	"""Build a lookup table of backend node ID to enhanced snapshot data with everything calculated upfront."""
+) -> SnapshotLookup:
+	"""Build a lookup table of backend node ID to enhanced snapshot data, materialized on access."""
 	import logging
 
 	logger = logging.getLogger('browser_agent.dom.enhanced_snapshot')
-	snapshot_lookup: dict[int, EnhancedSnapshotNode] = {}
+	snapshot_lookup = SnapshotLookup()
 
 	if not snapshot['documents']:
 		return snapshot_lookup
@@ -60,116 +240,23 @@ def build_snapshot_lookup(
 	strings = snapshot['strings']
 	logger.debug(f'🔍 SNAPSHOT: Processing {len(snapshot["documents"])} documents with {len(strings)} strings')
 
+	style_cache: dict[tuple[int, ...], dict[str, str]] = {}
 	for doc_idx, document in enumerate(snapshot['documents']):
 		nodes: NodeTreeSnapshot = document['nodes']
 		layout: LayoutTreeSnapshot = document['layout']
-
-		# Build backend node id to snapshot index lookup
-		backend_node_to_snapshot_index = {}
-		if 'backendNodeId' in nodes:
-			for i, backend_node_id in enumerate(nodes['backendNodeId']):
-				backend_node_to_snapshot_index[backend_node_id] = i
+		backend_node_ids = nodes.get('backendNodeId', [])
 
 		# Log document info
 		doc_url = strings[document.get('documentURL', 0)] if document.get('documentURL', 0) < len(strings) else 'N/A'
 		logger.debug(
-			f'🔍 SNAPSHOT doc[{doc_idx}]: url={doc_url[:80]}... has {len(backend_node_to_snapshot_index)} nodes, '
+			f'🔍 SNAPSHOT doc[{doc_idx}]: url={doc_url[:80]}... has {len(backend_node_ids)} nodes, '
 			f'layout has {len(layout.get("nodeIndex", []))} entries'
 		)
 
-		# PERFORMANCE: Pre-build layout index map to eliminate O(n²) double lookups
-		# Preserve original behavior: use FIRST occurrence for duplicates
-		layout_index_map = {}
-		if layout and 'nodeIndex' in layout:
-			for layout_idx, node_index in enumerate(layout['nodeIndex']):
-				if node_index not in layout_index_map:  # Only store first occurrence
-					layout_index_map[node_index] = layout_idx
-
-		# Build snapshot lookup for each backend node id
-		for backend_node_id, snapshot_index in backend_node_to_snapshot_index.items():
-			is_clickable = None
-			if 'isClickable' in nodes:
-				is_clickable = _parse_rare_boolean_data(nodes['isClickable'], snapshot_index)
-
-			# Find corresponding layout node
-			cursor_style = None
-			is_visible = None
-			bounding_box = None
-			computed_styles = {}
-
-			# Look for layout tree node that corresponds to this snapshot node
-			paint_order = None
-			client_rects = None
-			scroll_rects = None
-			stacking_contexts = None
-			if snapshot_index in layout_index_map:
-				layout_idx = layout_index_map[snapshot_index]
-				if layout_idx < len(layout.get('bounds', [])):
-					# Parse bounding box
-					bounds = layout['bounds'][layout_idx]
-					if len(bounds) >= 4:
-						# IMPORTANT: CDP coordinates are in device pixels, convert to CSS pixels
-						# by dividing by the device pixel ratio
-						raw_x, raw_y, raw_width, raw_height = bounds[0], bounds[1], bounds[2], bounds[3]
-
-						# Apply device pixel ratio scaling to convert device pixels to CSS pixels
-						bounding_box = DOMRect(
-							x=raw_x / device_pixel_ratio,
-							y=raw_y / device_pixel_ratio,
-							width=raw_width / device_pixel_ratio,
-							height=raw_height / device_pixel_ratio,
-						)
-
-					# Parse computed styles for this layout node
-					if layout_idx < len(layout.get('styles', [])):
-						style_indices = layout['styles'][layout_idx]
-						computed_styles = _parse_computed_styles(strings, style_indices)
-						cursor_style = computed_styles.get('cursor')
-
-					# Extract paint order if available
-					if layout_idx < len(layout.get('paintOrders', [])):
-						paint_order = layout.get('paintOrders', [])[layout_idx]
-
-					# Extract client rects if available
-					client_rects_data = layout.get('clientRects', [])
-					if layout_idx < len(client_rects_data):
-						client_rect_data = client_rects_data[layout_idx]
-						if client_rect_data and len(client_rect_data) >= 4:
-							client_rects = DOMRect(
-								x=client_rect_data[0],
-								y=client_rect_data[1],
-								width=client_rect_data[2],
-								height=client_rect_data[3],
-							)
-
-					# Extract scroll rects if available
-					scroll_rects_data = layout.get('scrollRects', [])
-					if layout_idx < len(scroll_rects_data):
-						scroll_rect_data = scroll_rects_data[layout_idx]
-						if scroll_rect_data and len(scroll_rect_data) >= 4:
-							scroll_rects = DOMRect(
-								x=scroll_rect_data[0],
-								y=scroll_rect_data[1],
-								width=scroll_rect_data[2],
-								height=scroll_rect_data[3],
-							)
-
-					# Extract stacking contexts if available
-					if layout_idx < len(layout.get('stackingContexts', [])):
-						stacking_contexts = layout.get('stackingContexts', {}).get('index', [])[layout_idx]
-
-			snapshot_lookup[backend_node_id] = EnhancedSnapshotNode(
-				is_clickable=is_clickable,
-				cursor_style=cursor_style,
-				bounds=bounding_box,
-				clientRects=client_rects,
-				scrollRects=scroll_rects,
-				computed_styles=computed_styles if computed_styles else None,
-				paint_order=paint_order,
-				stacking_contexts=stacking_contexts,
-			)
-
-	# Count how many have bounds (are actually visible/laid out)
-	with_bounds = sum(1 for n in snapshot_lookup.values() if n.bounds)
-	logger.debug(f'🔍 SNAPSHOT: Built lookup with {len(snapshot_lookup)} total entries, {with_bounds} have bounds')
+		columns = _DocumentColumns(nodes, layout, strings, device_pixel_ratio, style_cache)
+		snapshot_lookup.add_document(columns, backend_node_ids)
+
+	logger.debug(
+		f'🔍 SNAPSHOT: Built lookup with {len(snapshot_lookup)} total entries, {snapshot_lookup.laid_out_count} are laid out'
+	)
 	return snapshot_lookup
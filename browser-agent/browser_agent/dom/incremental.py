@@ -0,0 +1,266 @@
+"""
+Incremental DOM tree mirroring for browser-agent DOM tree extraction.
+
+A full `DOM.getDocument(depth=-1, pierce=True)` on a large SPA costs hundreds of milliseconds
+and a multi-megabyte payload, although most agent actions only change a handful of nodes.
+`DOMTreeMirror` keeps the raw CDP `Node` tree from the last full fetch and patches it from
+`DOM.*` mutation events instead. Events are only queued while they arrive (cheap on the hot
+path) and applied in `refresh()` right before the next DOM build, so the tree never changes
+underneath an in-progress `EnhancedDOMTreeNode` construction. Subtrees whose children the
+events don't describe are re-requested with `DOM.requestChildNodes`.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from cdp_use.cdp.dom.types import Node
+
+if TYPE_CHECKING:
+	from cdp_use import CDPClient
+
+logger = logging.getLogger(__name__)
+
+# Above this many queued events a full refetch is cheaper than replaying them
+MAX_PENDING_EVENTS = 5000
+# Above this many dirty subtrees a full refetch is cheaper than requesting each one
+MAX_DIRTY_SUBTREES = 200
+
+MIRRORED_DOM_EVENTS = (
+	'setChildNodes',
+	'childNodeInserted',
+	'childNodeRemoved',
+	'childNodeCountUpdated',
+	'attributeModified',
+	'attributeRemoved',
+	'characterDataModified',
+	'shadowRootPushed',
+	'shadowRootPopped',
+	'scrollableFlagUpdated',
+	'documentUpdated',
+)
+
+FRAME_OWNER_NAMES = ('IFRAME', 'FRAME')
+
+
+class DOMTreeMirror:
+	"""Live copy of one CDP session's `DOM.getDocument` tree, kept current from mutation events."""
+
+	def __init__(self, session_id: str):
+		self.session_id = session_id
+		self.root: Node | None = None
+		self.valid = True
+		self.mutation_count = 0
+		self._nodes: dict[int, Node] = {}
+		self._dirty: set[int] = set()  # node ids whose children must be re-requested
+		self._pending: list[tuple[str, Any]] = []
+
+	def seed(self, root: Node) -> None:
+		"""Adopt the result of a full `DOM.getDocument`.
+
+		The mirror is registered for events *before* that call is sent, so mutations that race
+		with the response are queued rather than lost; ones that predate the document reference
+		node ids the new tree doesn't contain and are ignored when applied.
+		"""
+		self.root = root
+		self._index(root)
+
+	def queue_event(self, method: str, event: Any) -> None:
+		"""Record a `DOM.<method>` event; applied lazily by `refresh()`."""
+		if not self.valid:
+			return
+		if method == 'documentUpdated' or len(self._pending) >= MAX_PENDING_EVENTS:
+			self.invalidate()
+			return
+		self._pending.append((method, event))
+
+	def invalidate(self) -> None:
+		self.valid = False
+		self._pending.clear()
+		self._dirty.clear()
+
+	async def refresh(self, cdp_client: 'CDPClient') -> bool:
+		"""Bring the mirror up to date. Returns False if the caller must fall back to a full `getDocument`."""
+		if not self.valid or self.root is None:
+			return False
+
+		self._apply_pending()
+
+		# Any other DOM.getDocument on this session silently discards our node ids; detect that cheaply
+		try:
+			described = await cdp_client.send.DOM.describeNode(
+				params={'nodeId': self.root['nodeId'], 'depth': 0}, session_id=self.session_id
+			)
+		except Exception:
+			self.invalidate()
+			return False
+		if described.get('node', {}).get('backendNodeId') != self.root['backendNodeId']:
+			self.invalidate()
+			return False
+
+		if self._dirty:
+			if len(self._dirty) > MAX_DIRTY_SUBTREES:
+				self.invalidate()
+				return False
+			dirty, self._dirty = self._dirty, set()
+			# Children arrive as DOM.setChildNodes events, dispatched before each command's response
+			results = await asyncio.gather(
+				*(
+					cdp_client.send.DOM.requestChildNodes(
+						params={'nodeId': node_id, 'depth': -1, 'pierce': True}, session_id=self.session_id
+					)
+					for node_id in dirty
+					if node_id in self._nodes
+				),
+				return_exceptions=True,
+			)
+			if any(isinstance(result, Exception) for result in results):
+				self.invalidate()
+				return False
+			self._apply_pending()
+
+		return self.valid
+
+	# --- Tree bookkeeping ---
+
+	def _index(self, node: Node) -> None:
+		self._nodes[node['nodeId']] = node
+		for child in node.get('children') or []:
+			self._index(child)
+		for shadow_root in node.get('shadowRoots') or []:
+			self._index(shadow_root)
+		if content_document := node.get('contentDocument'):
+			self._index(content_document)
+		if node.get('childNodeCount') and 'children' not in node:
+			self._dirty.add(node['nodeId'])
+
+	def _unindex(self, node: Node) -> None:
+		self._nodes.pop(node['nodeId'], None)
+		self._dirty.discard(node['nodeId'])
+		for child in node.get('children') or []:
+			self._unindex(child)
+		for shadow_root in node.get('shadowRoots') or []:
+			self._unindex(shadow_root)
+		if content_document := node.get('contentDocument'):
+			self._unindex(content_document)
+
+	def _apply_pending(self) -> None:
+		pending, self._pending = self._pending, []
+		for method, event in pending:
+			try:
+				getattr(self, f'_on_{method}')(event)
+			except Exception as e:
+				logger.debug(f'Failed to apply DOM.{method} to mirror, falling back to full refetch: {e}')
+				self.invalidate()
+				return
+			self.mutation_count += 1
+
+	def _on_setChildNodes(self, event: Any) -> None:
+		parent = self._nodes.get(event['parentId'])
+		if parent is None:
+			return
+		for existing in parent.get('children') or []:
+			self._unindex(existing)
+		children = event['nodes']
+		# requestChildNodes(pierce=True) on a frame owner reports its document as the only child
+		if parent['nodeName'].upper() in FRAME_OWNER_NAMES and all(child['nodeType'] == 9 for child in children):
+			if content_document := parent.get('contentDocument'):
+				self._unindex(content_document)
+			parent['contentDocument'] = children[0] if children else None  # type: ignore[typeddict-item]
+			if children:
+				self._index(children[0])
+			return
+		for child in children:
+			child.setdefault('parentId', parent['nodeId'])
+			self._index(child)
+		parent['children'] = children
+		parent['childNodeCount'] = len(children)
+		self._dirty.discard(parent['nodeId'])
+
+	def _on_childNodeInserted(self, event: Any) -> None:
+		parent = self._nodes.get(event['parentNodeId'])
+		if parent is None:
+			return
+		if 'children' not in parent:
+			self._dirty.add(parent['nodeId'])
+			return
+		node: Node = event['node']
+		node.setdefault('parentId', parent['nodeId'])
+		children = parent['children']
+		position = 0
+		previous_id = event.get('previousNodeId')
+		if previous_id:
+			for i, sibling in enumerate(children):
+				if sibling['nodeId'] == previous_id:
+					position = i + 1
+					break
+		children.insert(position, node)
+		parent['childNodeCount'] = len(children)
+		self._index(node)
+		if node['nodeName'].upper() in FRAME_OWNER_NAMES and not node.get('contentDocument'):
+			self._dirty.add(node['nodeId'])
+
+	def _on_childNodeRemoved(self, event: Any) -> None:
+		parent = self._nodes.get(event['parentNodeId'])
+		if parent is None or 'children' not in parent:
+			return
+		node_id = event['nodeId']
+		for i, child in enumerate(parent['children']):
+			if child['nodeId'] == node_id:
+				self._unindex(parent['children'].pop(i))
+				break
+		parent['childNodeCount'] = len(parent['children'])
+
+	def _on_childNodeCountUpdated(self, event: Any) -> None:
+		node = self._nodes.get(event['nodeId'])
+		if node is not None:
+			node['childNodeCount'] = event['childNodeCount']
+			self._dirty.add(node['nodeId'])
+
+	def _on_attributeModified(self, event: Any) -> None:
+		node = self._nodes.get(event['nodeId'])
+		if node is None:
+			return
+		attributes = node.setdefault('attributes', [])
+		for i in range(0, len(attributes), 2):
+			if attributes[i] == event['name']:
+				attributes[i + 1] = event['value']
+				return
+		attributes.extend((event['name'], event['value']))
+
+	def _on_attributeRemoved(self, event: Any) -> None:
+		node = self._nodes.get(event['nodeId'])
+		attributes = node.get('attributes') if node is not None else None
+		if not attributes:
+			return
+		for i in range(0, len(attributes), 2):
+			if attributes[i] == event['name']:
+				del attributes[i : i + 2]
+				return
+
+	def _on_characterDataModified(self, event: Any) -> None:
+		node = self._nodes.get(event['nodeId'])
+		if node is not None:
+			node['nodeValue'] = event['characterData']
+
+	def _on_shadowRootPushed(self, event: Any) -> None:
+		host = self._nodes.get(event['hostId'])
+		if host is None:
+			return
+		host.setdefault('shadowRoots', []).append(event['root'])
+		self._index(event['root'])
+
+	def _on_shadowRootPopped(self, event: Any) -> None:
+		host = self._nodes.get(event['hostId'])
+		shadow_roots = host.get('shadowRoots') if host is not None else None
+		if not shadow_roots:
+			return
+		for i, shadow_root in enumerate(shadow_roots):
+			if shadow_root['nodeId'] == event['rootId']:
+				self._unindex(shadow_roots.pop(i))
+				return
+
+	def _on_scrollableFlagUpdated(self, event: Any) -> None:
+		node = self._nodes.get(event['nodeId'])
+		if node is not None:
+			node['isScrollable'] = event['isScrollable']
@@ -5,14 +5,17 @@ This module provides a unified interface for extracting clean markdown from brow
 used by both the tools service and page actor.
 """
 
+import asyncio
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import TYPE_CHECKING, Any
 
 from browser_agent.dom.serializer.html_serializer import HTMLSerializer
 from browser_agent.dom.service import DomService
-from browser_agent.dom.views import MarkdownChunk
+from browser_agent.dom.views import EnhancedDOMTreeNode, MarkdownChunk
 
 if TYPE_CHECKING:
 	from browser_agent.browser.session import BrowserSession
@@ -29,7 +32,8 @@ async def extract_clean_markdown(
 	"""Extract clean markdown from browser content using enhanced DOM tree.
 
 	This unified function can extract markdown using either a browser session (for tools service)
-	or a DOM service with target ID (for page actor).
+	or a DOM service with target ID (for page actor). On the browser session path the result is
+	cached per target until the page's DOM changes.
 
 	Args:
 	    browser_session: Browser session to extract content from (tools service path)
@@ -49,24 +53,78 @@ async def extract_clean_markdown(
 		if dom_service is not None or target_id is not None:
 			raise ValueError('Cannot specify both browser_session and dom_service/target_id')
 		# Browser session path (tools service)
-		enhanced_dom_tree = await _get_enhanced_dom_tree_from_browser_session(browser_session)
-		current_url = await browser_session.get_current_page_url()
-		method = 'enhanced_dom_tree'
+		entry = await _get_markdown_entry(browser_session, extract_links, extract_images)
+		return entry.content, dict(entry.stats)
 	elif dom_service is not None and target_id is not None:
 		# DOM service path (page actor)
 		# Lazy fetch all_frames inside get_dom_tree if needed (for cross-origin iframes)
 		enhanced_dom_tree, _ = await dom_service.get_dom_tree(target_id=target_id, all_frames=None)
-		current_url = None  # Not available via DOM service
-		method = 'dom_service'
+		# current_url is not available via DOM service
+		return await _dom_tree_to_markdown(enhanced_dom_tree, 'dom_service', None, extract_links, extract_images)
 	else:
 		raise ValueError('Must provide either browser_session or both dom_service and target_id')
 
+
+async def extract_markdown_chunks(
+	browser_session: 'BrowserSession',
+	extract_links: bool = False,
+	extract_images: bool = False,
+	max_chunk_chars: int = 100_000,
+	start_from_char: int = 0,
+) -> tuple[list[MarkdownChunk], dict[str, Any]]:
+	"""`chunk_markdown_by_structure` over `extract_clean_markdown`, cached per DOM version.
+
+	Paging through a long page with `start_from_char` then reuses both the markdown and its chunks.
+
+	Returns:
+	    tuple: (chunks starting at start_from_char, content_statistics)
+	"""
+	entry = await _get_markdown_entry(browser_session, extract_links, extract_images)
+	chunks = entry.chunks.get(max_chunk_chars)
+	if chunks is None:
+		chunks = await asyncio.to_thread(chunk_markdown_by_structure, entry.content, max_chunk_chars)
+		entry.chunks[max_chunk_chars] = chunks
+	if entry.content and start_from_char >= len(entry.content):
+		return [], dict(entry.stats)
+	return _chunks_from_char(chunks, start_from_char), dict(entry.stats)
+
+
+async def _dom_tree_to_markdown(
+	enhanced_dom_tree: EnhancedDOMTreeNode,
+	method: str,
+	current_url: str | None,
+	extract_links: bool,
+	extract_images: bool,
+) -> tuple[str, dict[str, Any]]:
 	# Use the HTML serializer with the enhanced DOM tree
 	html_serializer = HTMLSerializer(extract_links=extract_links)
 	page_html = html_serializer.serialize(enhanced_dom_tree)
 
 	original_html_length = len(page_html)
 
+	# markdownify takes seconds on huge pages, keep the event loop responsive meanwhile
+	content, initial_markdown_length, chars_filtered = await asyncio.to_thread(_html_to_markdown, page_html, extract_images)
+
+	final_filtered_length = len(content)
+
+	# Content statistics
+	stats = {
+		'method': method,
+		'original_html_chars': original_html_length,
+		'initial_markdown_chars': initial_markdown_length,
+		'filtered_chars_removed': chars_filtered,
+		'final_filtered_chars': final_filtered_length,
+	}
+
+	# Add URL to stats if available
+	if current_url:
+		stats['url'] = current_url
+
+	return content, stats
+
+
+def _html_to_markdown(page_html: str, extract_images: bool) -> tuple[str, int, int]:
+	"""Returns (clean_markdown, initial_markdown_length, chars_filtered). Runs in a worker thread."""
 	# Use markdownify for clean markdown conversion
 	from markdownify import markdownify as md
 
@@ -94,23 +152,7 @@ async def extract_clean_markdown(
 
 	# Apply light preprocessing to clean up excessive whitespace
 	content, chars_filtered = _preprocess_markdown_content(content)
-
-	final_filtered_length = len(content)
-
-	# Content statistics
-	stats = {
-		'method': method,
-		'original_html_chars': original_html_length,
-		'initial_markdown_chars': initial_markdown_length,
-		'filtered_chars_removed': chars_filtered,
-		'final_filtered_chars': final_filtered_length,
-	}
-
-	# Add URL to stats if available
-	if current_url:
-		stats['url'] = current_url
-
-	return content, stats
+	return content, initial_markdown_length, chars_filtered
 
 
 async def _get_enhanced_dom_tree_from_browser_session(browser_session: 'BrowserSession'):
@@ -132,6 +174,123 @@ async def _get_enhanced_dom_tree_from_browser_session(browser_session: 'BrowserS
 	return enhanced_dom_tree
 
 
+# ---------------------------------------------------------------------------
+# Markdown cache
+# ---------------------------------------------------------------------------
+
+# Counts DOM mutations (open shadow roots and same-origin iframe documents included) and form input; the random
+# token changes with every new document. Cross-origin frames are not reachable from here, see `_get_dom_version`.
+_DOM_VERSION_JS = """(() => {
+	let v = window.__browserUseDomVersion;
+	if (!v) {
+		const bump = () => { v.count++; };
+		v = window.__browserUseDomVersion = {token: Math.random().toString(36).slice(2), count: 0, roots: new WeakSet(), bump};
+		v.observer = new MutationObserver(bump);
+	}
+	// Mutations (and non-composed change events) inside a shadow root or an iframe document never reach the document
+	const watch = root => {
+		if (!v.roots.has(root)) {
+			v.roots.add(root);
+			v.count++;
+			v.observer.observe(root, {subtree: true, childList: true, attributes: true, characterData: true});
+			// Typed text and checked boxes change the extracted content without any DOM mutation
+			for (const type of ['input', 'change']) root.addEventListener(type, v.bump, true);
+		}
+		for (const el of root.querySelectorAll('*')) {
+			if (el.shadowRoot) watch(el.shadowRoot);
+			// A frame that navigated has a new document, which counts as a change when it is first watched
+			if ((el.tagName === 'IFRAME' || el.tagName === 'FRAME') && el.contentDocument) watch(el.contentDocument);
+		}
+	};
+	watch(document);
+	return location.href + '#' + v.token + ':' + v.count;
+})()"""
+
+
+@dataclass
+class _MarkdownCacheEntry:
+	content: str
+	stats: dict[str, Any]
+	chunks: dict[int, list[MarkdownChunk]] = field(default_factory=dict)  # max_chunk_chars -> chunks from char 0
+
+
+class MarkdownCache:
+	"""LRU cache of clean markdown (and its chunks) per (target, DOM version, extraction options)."""
+
+	def __init__(self, max_entries: int = 8, max_chars: int = 10_000_000):
+		self.max_entries = max_entries
+		self.max_chars = max_chars
+		self._entries: OrderedDict[Hashable, _MarkdownCacheEntry] = OrderedDict()
+		self._chars = 0
+
+	def get(self, key: Hashable) -> _MarkdownCacheEntry | None:
+		entry = self._entries.get(key)
+		if entry is not None:
+			self._entries.move_to_end(key)
+		return entry
+
+	def put(self, key: Hashable, entry: _MarkdownCacheEntry) -> None:
+		# Chunks roughly double the footprint of the markdown itself
+		if 2 * len(entry.content) > self.max_chars:
+			return
+		if key in self._entries:
+			self._chars -= 2 * len(self._entries.pop(key).content)
+		self._entries[key] = entry
+		self._chars += 2 * len(entry.content)
+		while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+			_, evicted = self._entries.popitem(last=False)
+			self._chars -= 2 * len(evicted.content)
+
+	def clear(self) -> None:
+		self._entries.clear()
+		self._chars = 0
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+async def _get_dom_version(browser_session: 'BrowserSession') -> str | None:
+	"""Version of the focused page's content, or None if it can't be determined (no caching then)."""
+	try:
+		cdp_session = await browser_session.get_or_create_cdp_session()
+		result, (frames, _) = await asyncio.gather(
+			cdp_session.cdp_client.send.Runtime.evaluate(
+				params={'expression': _DOM_VERSION_JS, 'returnByValue': True}, session_id=cdp_session.session_id
+			),
+			browser_session.get_all_frames(),
+		)
+		dom_version = result.get('result', {}).get('value')
+	except Exception:
+		return None
+	if not dom_version:
+		return None
+	# Every navigation of a frame (cross-origin ones included) gets a new loader id
+	loaders = sorted(f'{frame_id}:{frame.get("loaderId")}' for frame_id, frame in frames.items())
+	return dom_version + '|' + ','.join(loaders)
+
+
+async def _get_markdown_entry(
+	browser_session: 'BrowserSession', extract_links: bool, extract_images: bool
+) -> _MarkdownCacheEntry:
+	dom_watchdog: DOMWatchdog | None = browser_session._dom_watchdog
+	assert dom_watchdog is not None, 'DOMWatchdog not available'
+
+	dom_version = await _get_dom_version(browser_session)
+	key = (browser_session.agent_focus_target_id, dom_version, extract_links, extract_images) if dom_version else None
+	if key is not None and (entry := dom_watchdog.markdown_cache.get(key)) is not None:
+		return entry
+
+	enhanced_dom_tree = await _get_enhanced_dom_tree_from_browser_session(browser_session)
+	current_url = await browser_session.get_current_page_url()
+	content, stats = await _dom_tree_to_markdown(
+		enhanced_dom_tree, 'enhanced_dom_tree', current_url, extract_links, extract_images
+	)
+	entry = _MarkdownCacheEntry(content=content, stats=stats)
+	if key is not None:
+		dom_watchdog.markdown_cache.put(key, entry)
+	return entry
+
+
 # Legacy aliases removed - all code now uses the unified extract_clean_markdown function
 
 
@@ -524,7 +683,11 @@ def chunk_markdown_by_structure(
 			)
 		)
 
-	# Apply start_from_char filter: return chunks from the one containing that offset
+	return _chunks_from_char(chunks, start_from_char)
+
+
+def _chunks_from_char(chunks: list[MarkdownChunk], start_from_char: int) -> list[MarkdownChunk]:
+	"""Return chunks from the one containing the `start_from_char` offset."""
 	if start_from_char > 0:
 		for i, chunk in enumerate(chunks):
 			if chunk.char_offset_end > start_from_char:
@@ -0,0 +1,104 @@
+"""
+Benchmark paint-order occlusion on synthetic pages.
+
+Generates page-like layouts (full-width section backgrounds, cards in a grid, rows of inline
+elements, a few overlays) with 10k-100k rectangles, runs the same layer loop as
+`PaintOrderRemover.calculate_paint_order` against `RectUnionIndexed` and, for sizes where it
+finishes in reasonable time, the reference `RectUnionPure`, and checks both agree.
+
+Usage: python -m browser_agent.dom.playground.paint_order_benchmark [--sizes 10000 50000 100000]
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from browser_agent.dom.serializer.paint_order import NUMPY_AVAILABLE, Rect, RectUnionIndexed, RectUnionPure
+
+PAGE_WIDTH = 1280.0
+
+
+def generate_page(n_rects: int, seed: int = 0) -> list[tuple[int, Rect, bool]]:
+	"""Return (paint_order, rect, opaque) triples for a synthetic page with ~n_rects elements."""
+	rng = random.Random(seed)
+	items: list[tuple[int, Rect, bool]] = []
+	y = 0.0
+	paint_order = 0
+	while len(items) < n_rects:
+		section_height = rng.uniform(300, 1200)
+		items.append((paint_order, Rect(0, y, PAGE_WIDTH, y + section_height), rng.random() < 0.5))
+		paint_order += 1
+
+		# Cards in a grid, each with a handful of text/button children painted above it
+		columns = rng.choice((2, 3, 4))
+		card_width = PAGE_WIDTH / columns
+		card_y = y + 20
+		while card_y + 150 < y + section_height and len(items) < n_rects:
+			for column in range(columns):
+				x1 = column * card_width + 10
+				card = Rect(x1, card_y, x1 + card_width - 20, card_y + 140)
+				items.append((paint_order, card, rng.random() < 0.7))
+				paint_order += 1
+				for line in range(rng.randint(2, 6)):
+					ly = card_y + 10 + line * 20
+					lx = x1 + 10 + rng.uniform(0, 20)
+					items.append((paint_order, Rect(lx, ly, lx + rng.uniform(40, card_width - 60), ly + 16), rng.random() < 0.2))
+					paint_order += 1
+			card_y += 160
+
+		# Occasional sticky header / modal overlay painted over what's below it
+		if rng.random() < 0.1:
+			items.append((paint_order + 10_000_000, Rect(0, y, PAGE_WIDTH, y + 80), True))
+		y += section_height
+
+	return items[:n_rects]
+
+
+def run_layers(union: RectUnionPure, items: list[tuple[int, Rect, bool]]) -> list[bool]:
+	"""Mirror of the `calculate_paint_order` layer loop; returns the covered flag per item."""
+	layers: defaultdict[int, list[int]] = defaultdict(list)
+	for i, (paint_order, _, _) in enumerate(items):
+		layers[paint_order].append(i)
+
+	covered = [False] * len(items)
+	for _, indices in sorted(layers.items(), key=lambda x: -x[0]):
+		rects = [items[i][1] for i in indices]
+		if isinstance(union, RectUnionIndexed):
+			flags = union.contains_batch(rects)
+		else:
+			flags = [union.contains(r) for r in rects]
+		for i, flag in zip(indices, flags):
+			covered[i] = flag
+		for i in indices:
+			if items[i][2]:
+				union.add(items[i][1])
+	return covered
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 25_000, 50_000, 100_000])
+	parser.add_argument('--pure-limit', type=int, default=25_000, help='largest size to also run RectUnionPure on')
+	args = parser.parse_args()
+
+	print(f'numpy batch path: {"enabled" if NUMPY_AVAILABLE else "disabled (numpy not installed)"}')
+	for size in args.sizes:
+		items = generate_page(size)
+
+		start = time.perf_counter()
+		indexed = run_layers(RectUnionIndexed(), items)
+		indexed_s = time.perf_counter() - start
+		line = f'{size:>7} rects: indexed {indexed_s * 1000:8.1f}ms, {sum(indexed):>6} covered'
+
+		if size <= args.pure_limit:
+			start = time.perf_counter()
+			pure = run_layers(RectUnionPure(), items)
+			pure_s = time.perf_counter() - start
+			assert pure == indexed, 'RectUnionIndexed disagrees with RectUnionPure'
+			line += f' | pure {pure_s * 1000:9.1f}ms ({pure_s / indexed_s:.0f}x slower, results identical)'
+		print(line)
+
+
+if __name__ == '__main__':
+	main()
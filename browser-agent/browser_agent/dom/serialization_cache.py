@@ -0,0 +1,352 @@
+"""
+Content-addressed cache of DOM serialization results.
+
+Scans keep visiting the same pages (landing pages, login forms, static docs), and every visit ran the
+full `DOMTreeSerializer.serialize_accessible_elements` pipeline (simplified tree, clickable detection,
+paint order, tree optimization, bbox filtering) again. Entries are keyed by a hash of everything the
+serializer reads from the enhanced DOM tree plus the serializer settings, so an identical page hits
+the cache no matter which browser, tab or run produced it.
+
+Node and backend node IDs differ between browsers, so they are left out of the key and the cached
+result does not refer to them: it stores the simplified tree as a skeleton of node *positions* in a
+pre-order walk of the enhanced tree. On a hit the skeleton is bound to the new tree's nodes and the
+selector map (and `is_new` markers, which depend on the previous step) are rebuilt in one pass;
+`llm_representation` is then rendered from that tree as usual, with this browser's IDs.
+
+The memory tier is an LRU per process. The optional disk tier (`configure(directory=...)`) stores
+one JSON file per entry and is shared by every process pointed at the same directory.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from browser_agent.dom.views import (
+	DOMRect,
+	DOMSelectorMap,
+	EnhancedDOMTreeNode,
+	SerializedDOMState,
+	SimplifiedNode,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the serializer's output for the same input changes, so stale disk entries are ignored
+SERIALIZATION_CACHE_VERSION = 1
+
+# Skeleton node flags
+_SHOULD_DISPLAY = 1
+_IS_INTERACTIVE = 2
+_IGNORED_BY_PAINT_ORDER = 4
+_EXCLUDED_BY_PARENT = 8
+_IS_SHADOW_HOST = 16
+_IS_COMPOUND_COMPONENT = 32
+
+# A skeleton node is [position, flags, [children...]]
+Skeleton = list[Any]
+
+
+def _walk(root: EnhancedDOMTreeNode) -> list[EnhancedDOMTreeNode]:
+	"""All nodes reachable by the serializer, in a deterministic pre-order."""
+	nodes: list[EnhancedDOMTreeNode] = []
+	stack = [root]
+	while stack:
+		node = stack.pop()
+		nodes.append(node)
+		children = list(node.children_and_shadow_roots)
+		if node.content_document is not None:
+			children.insert(0, node.content_document)
+		stack.extend(reversed(children))
+	return nodes
+
+
+def _rect(rect: DOMRect | None) -> tuple[float, float, float, float] | None:
+	return (rect.x, rect.y, rect.width, rect.height) if rect is not None else None
+
+
+def _node_signature(node: EnhancedDOMTreeNode, session_id: str | None) -> tuple:
+	"""Everything the serializer reads from a node, without browser-specific IDs."""
+	attributes = node.attributes or {}
+	if session_id and f'data-browser-agent-exclude-{session_id}' in attributes:
+		attributes = {
+			key.replace(session_id, '{session}') if key.startswith('data-browser-agent-exclude-') else key: value
+			for key, value in attributes.items()
+		}
+	snapshot = node.snapshot_node
+	ax = node.ax_node
+	return (
+		node.node_type.value,
+		node.node_name,
+		node.node_value,
+		tuple(attributes.items()),
+		node.is_scrollable,
+		node.is_visible,
+		_rect(node.absolute_position),
+		node.shadow_root_type,
+		node.has_js_click_listener,
+		node.has_hidden_content,
+		repr(node.hidden_elements_info) if node.hidden_elements_info else None,
+		(
+			snapshot.is_clickable,
+			snapshot.cursor_style,
+			_rect(snapshot.bounds),
+			_rect(snapshot.clientRects),
+			_rect(snapshot.scrollRects),
+			tuple(snapshot.computed_styles.items()) if snapshot.computed_styles else None,
+			snapshot.paint_order,
+			snapshot.stacking_contexts,
+		)
+		if snapshot is not None
+		else None,
+		(
+			ax.ignored,
+			ax.role,
+			ax.name,
+			ax.description,
+			tuple((prop.name, prop.value) for prop in ax.properties) if ax.properties else None,
+			bool(ax.child_ids),
+		)
+		if ax is not None
+		else None,
+		# Tree shape
+		node.content_document is not None,
+		len(node.shadow_roots or ()),
+		len(node.children_nodes or ()),
+	)
+
+
+def dom_fingerprint(nodes: list[EnhancedDOMTreeNode], settings: tuple[Any, ...], session_id: str | None = None) -> str:
+	"""Hash of the serializer's input (`nodes` as returned by the pre-order walk) and settings."""
+	signatures = [_node_signature(node, session_id) for node in nodes]
+	# marshal format 2 is binary (much faster than repr() on floats) and has no identity-dependent back-references
+	payload = marshal.dumps((SERIALIZATION_CACHE_VERSION, settings, signatures), 2)
+	return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+def _to_skeleton(node: SimplifiedNode, positions: dict[int, int]) -> Skeleton | None:
+	position = positions.get(id(node.original_node))
+	if position is None:
+		return None
+	flags = (
+		(_SHOULD_DISPLAY if node.should_display else 0)
+		| (_IS_INTERACTIVE if node.is_interactive else 0)
+		| (_IGNORED_BY_PAINT_ORDER if node.ignored_by_paint_order else 0)
+		| (_EXCLUDED_BY_PARENT if node.excluded_by_parent else 0)
+		| (_IS_SHADOW_HOST if node.is_shadow_host else 0)
+		| (_IS_COMPOUND_COMPONENT if node.is_compound_component else 0)
+	)
+	children = []
+	for child in node.children:
+		child_skeleton = _to_skeleton(child, positions)
+		if child_skeleton is None:
+			return None
+		children.append(child_skeleton)
+	return [position, flags, children]
+
+
+def _from_skeleton(
+	skeleton: Skeleton,
+	nodes: list[EnhancedDOMTreeNode],
+	selector_map: DOMSelectorMap,
+	previous_backend_node_ids: set[int] | None,
+) -> SimplifiedNode:
+	position, flags, children = skeleton
+	original_node = nodes[position]
+	node = SimplifiedNode(
+		original_node=original_node,
+		children=[],
+		should_display=bool(flags & _SHOULD_DISPLAY),
+		is_interactive=bool(flags & _IS_INTERACTIVE),
+		ignored_by_paint_order=bool(flags & _IGNORED_BY_PAINT_ORDER),
+		excluded_by_parent=bool(flags & _EXCLUDED_BY_PARENT),
+		is_shadow_host=bool(flags & _IS_SHADOW_HOST),
+		is_compound_component=bool(flags & _IS_COMPOUND_COMPONENT),
+	)
+	# Same pre-order as DOMTreeSerializer._assign_interactive_indices_and_mark_new_nodes
+	if node.is_interactive:
+		selector_map[original_node.backend_node_id] = original_node
+		if node.is_compound_component:
+			node.is_new = True
+		elif previous_backend_node_ids and original_node.backend_node_id not in previous_backend_node_ids:
+			node.is_new = True
+	node.children = [_from_skeleton(child, nodes, selector_map, previous_backend_node_ids) for child in children]
+	return node
+
+
+class DOMSerializationCache:
+	"""Memory LRU of serialization skeletons with an optional on-disk tier shared across runs."""
+
+	def __init__(self, max_entries: int = 128, directory: str | Path | None = None, max_disk_entries: int = 5000):
+		self.max_entries = max_entries
+		self.directory = Path(directory).expanduser() if directory else None
+		self.max_disk_entries = max_disk_entries
+		self.hits = 0
+		self.misses = 0
+		# key -> {'node_count': int, 'root': skeleton | None, 'compound_children': {position: [...]}}
+		self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+		self._disk_writes = 0
+
+	def configure(
+		self,
+		max_entries: int | None = None,
+		directory: str | Path | None = None,
+		max_disk_entries: int | None = None,
+	) -> None:
+		"""Change cache limits; `directory=''` turns the disk tier off."""
+		if max_entries is not None:
+			self.max_entries = max_entries
+		if directory is not None:
+			self.directory = Path(directory).expanduser() if directory else None
+		if max_disk_entries is not None:
+			self.max_disk_entries = max_disk_entries
+
+	def get(self, key: str) -> dict[str, Any] | None:
+		entry = self._entries.get(key)
+		if entry is not None:
+			self._entries.move_to_end(key)
+			return entry
+		entry = self._read_disk(key)
+		if entry is not None:
+			self._remember(key, entry)
+		return entry
+
+	def put(self, key: str, entry: dict[str, Any]) -> None:
+		self._remember(key, entry)
+		self._write_disk(key, entry)
+
+	def clear(self) -> None:
+		"""Clear the memory tier; disk entries are left for other processes."""
+		self._entries.clear()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def _remember(self, key: str, entry: dict[str, Any]) -> None:
+		self._entries[key] = entry
+		self._entries.move_to_end(key)
+		while len(self._entries) > self.max_entries:
+			self._entries.popitem(last=False)
+
+	# =============== Disk tier ==================
+
+	def _path(self, key: str) -> Path:
+		assert self.directory is not None
+		return self.directory / key[:2] / f'{key}.json'
+
+	def _read_disk(self, key: str) -> dict[str, Any] | None:
+		if self.directory is None:
+			return None
+		try:
+			with open(self._path(key), encoding='utf-8') as f:
+				entry = json.load(f)
+		except FileNotFoundError:
+			return None
+		except (OSError, ValueError) as e:
+			logger.debug(f'Ignoring unreadable DOM serialization cache entry {key}: {e}')
+			return None
+		if entry.get('version') != SERIALIZATION_CACHE_VERSION:
+			return None
+		entry['compound_children'] = {int(position): value for position, value in entry['compound_children'].items()}
+		return entry
+
+	def _write_disk(self, key: str, entry: dict[str, Any]) -> None:
+		if self.directory is None:
+			return
+		path = self._path(key)
+		try:
+			path.parent.mkdir(parents=True, exist_ok=True)
+			# Write-then-rename so concurrent readers in other processes never see a partial file
+			tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+			with open(tmp_path, 'w', encoding='utf-8') as f:
+				json.dump({**entry, 'version': SERIALIZATION_CACHE_VERSION}, f, separators=(',', ':'))
+			os.replace(tmp_path, path)
+		except (OSError, TypeError, ValueError) as e:
+			logger.debug(f'Failed to write DOM serialization cache entry {key}: {e}')
+			return
+		self._disk_writes += 1
+		if self._disk_writes % 100 == 0:
+			self._prune_disk()
+
+	def _prune_disk(self) -> None:
+		"""Drop the least recently written entries beyond `max_disk_entries`."""
+		assert self.directory is not None
+		try:
+			files = [(path.stat().st_mtime, path) for path in self.directory.glob('*/*.json')]
+		except OSError:
+			return
+		if len(files) <= self.max_disk_entries:
+			return
+		files.sort()
+		for _, path in files[: len(files) - self.max_disk_entries]:
+			try:
+				path.unlink()
+			except OSError:
+				pass
+
+
+dom_serialization_cache = DOMSerializationCache()
+
+
+def serialize_accessible_elements_cached(
+	root_node: EnhancedDOMTreeNode,
+	previous_cached_state: SerializedDOMState | None = None,
+	paint_order_filtering: bool = True,
+	session_id: str | None = None,
+	cache: DOMSerializationCache | None = None,
+) -> tuple[SerializedDOMState, dict[str, float]]:
+	"""`DOMTreeSerializer(...).serialize_accessible_elements()` backed by a content-addressed cache."""
+	from browser_agent.dom.serializer.serializer import DOMTreeSerializer
+
+	cache = cache if cache is not None else dom_serialization_cache
+	serializer = DOMTreeSerializer(
+		root_node, previous_cached_state, paint_order_filtering=paint_order_filtering, session_id=session_id
+	)
+
+	start = time.time()
+	nodes = _walk(root_node)
+	settings = (paint_order_filtering, serializer.enable_bbox_filtering, serializer.containment_threshold)
+	key = dom_fingerprint(nodes, settings, session_id)
+	fingerprint_s = time.time() - start
+
+	entry = cache.get(key)
+	if entry is not None and entry['node_count'] == len(nodes):
+		cache.hits += 1
+		start = time.time()
+		for node in nodes:
+			node._compound_children = []
+		for position, compound_children in entry['compound_children'].items():
+			nodes[position]._compound_children = [dict(child) for child in compound_children]
+		selector_map: DOMSelectorMap = {}
+		previous_backend_node_ids = (
+			{node.backend_node_id for node in previous_cached_state.selector_map.values()} if previous_cached_state else None
+		)
+		root = _from_skeleton(entry['root'], nodes, selector_map, previous_backend_node_ids) if entry['root'] else None
+		timing = {'dom_fingerprint': fingerprint_s, 'serialization_cache_restore': time.time() - start}
+		return SerializedDOMState(_root=root, selector_map=selector_map), timing
+
+	cache.misses += 1
+	serialized_dom_state, timing = serializer.serialize_accessible_elements()
+	timing['dom_fingerprint'] = fingerprint_s
+
+	positions = {id(node): position for position, node in enumerate(nodes)}
+	skeleton = _to_skeleton(serialized_dom_state._root, positions) if serialized_dom_state._root else None
+	if serialized_dom_state._root is None or skeleton is not None:
+		cache.put(
+			key,
+			{
+				'node_count': len(nodes),
+				'root': skeleton,
+				'compound_children': {
+					position: [dict(child) for child in node._compound_children]
+					for position, node in enumerate(nodes)
+					if node._compound_children
+				},
+			},
+		)
+	return serialized_dom_state, timing
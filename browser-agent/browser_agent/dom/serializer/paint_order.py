@@ -1,7 +1,15 @@
+import math
 from collections import defaultdict
 from dataclasses import dataclass
 
-from browser_agent.dom.views import SimplifiedNode
+from browser_agent.dom.views import EnhancedSnapshotNode, SimplifiedNode
+
+try:
+	import numpy as np  # type: ignore[import-not-found]
+
+	NUMPY_AVAILABLE = True
+except ImportError:
+	NUMPY_AVAILABLE = False
 
 """
 Helper class for maintaining a union of rectangles (used for order of elements calculation)
@@ -128,6 +136,137 @@ class RectUnionPure:
 		return True
 
 
+class RectUnionIndexed(RectUnionPure):
+	"""
+	`RectUnionPure` with a uniform grid index over its disjoint rectangles.
+
+	`contains`/`add` only walk the rectangles that share a grid cell with the query (in insertion
+	order, so results and fragments are identical to `RectUnionPure`): rectangles that don't touch
+	the query's closed bounds can neither contain nor split any piece of it. Rectangles spanning
+	more than `max_cells` cells live in a small list that is always checked, and queries that big
+	fall back to the full scan.
+
+	With NumPy installed, `contains_batch` first marks every query fully inside a single union
+	rectangle in one vectorized pass, and only runs the exact fragmenting check for the rest.
+	"""
+
+	__slots__ = ('cell_size', 'max_cells', '_cells', '_big', '_np_rects', '_np_count')
+
+	def __init__(self, cell_size: float = 256.0, max_cells: int = 64):
+		super().__init__()
+		self.cell_size = cell_size
+		self.max_cells = max_cells
+		self._cells: dict[tuple[int, int], list[int]] = {}
+		self._big: list[int] = []
+		self._np_rects = None  # (capacity, 4) float64 buffer mirroring _rects, grown by doubling
+		self._np_count = 0
+
+	def _cell_range(self, r: Rect) -> tuple[int, int, int, int]:
+		size = self.cell_size
+		return math.floor(r.x1 / size), math.floor(r.x2 / size), math.floor(r.y1 / size), math.floor(r.y2 / size)
+
+	def _candidates(self, r: Rect) -> list[int] | range:
+		"""Indices (ascending) of rectangles that may touch r."""
+		cx1, cx2, cy1, cy2 = self._cell_range(r)
+		if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > self.max_cells:
+			return range(len(self._rects))
+		found = set(self._big)
+		cells = self._cells
+		for cx in range(cx1, cx2 + 1):
+			for cy in range(cy1, cy2 + 1):
+				bucket = cells.get((cx, cy))
+				if bucket:
+					found.update(bucket)
+		return sorted(found)
+
+	def _index(self, i: int) -> None:
+		r = self._rects[i]
+		cx1, cx2, cy1, cy2 = self._cell_range(r)
+		if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > self.max_cells:
+			self._big.append(i)
+		else:
+			cells = self._cells
+			for cx in range(cx1, cx2 + 1):
+				for cy in range(cy1, cy2 + 1):
+					cells.setdefault((cx, cy), []).append(i)
+		if self._np_rects is not None:
+			if self._np_count == len(self._np_rects):
+				grown = np.empty((max(64, 2 * len(self._np_rects)), 4))
+				grown[: self._np_count] = self._np_rects[: self._np_count]
+				self._np_rects = grown
+			self._np_rects[self._np_count] = (r.x1, r.y1, r.x2, r.y2)
+			self._np_count += 1
+
+	def _covered(self, r: Rect, candidates: list[int] | range) -> bool:
+		rects = self._rects
+		for i in candidates:
+			if rects[i].contains(r):
+				return True  # r lies inside one rectangle, no need to fragment it
+
+		stack = [r]
+		for i in candidates:
+			s = rects[i]
+			new_stack = []
+			for piece in stack:
+				if s.contains(piece):
+					continue
+				if piece.intersects(s):
+					new_stack.extend(self._split_diff(piece, s))
+				else:
+					new_stack.append(piece)
+			if not new_stack:
+				return True
+			stack = new_stack
+		return False
+
+	def contains(self, r: Rect) -> bool:
+		if not self._rects:
+			return False
+		return self._covered(r, self._candidates(r))
+
+	def add(self, r: Rect) -> bool:
+		candidates = self._candidates(r)
+		if self._rects and self._covered(r, candidates):
+			return False
+
+		pending = [r]
+		rects = self._rects
+		for i in candidates:
+			s = rects[i]
+			new_pending = []
+			for piece in pending:
+				if piece.intersects(s):
+					new_pending.extend(self._split_diff(piece, s))
+				else:
+					new_pending.append(piece)
+			pending = new_pending
+
+		for piece in pending:
+			rects.append(piece)
+			self._index(len(rects) - 1)
+		return True
+
+	def contains_batch(self, queries: list[Rect], max_pairs: int = 4_000_000) -> list[bool]:
+		"""`[self.contains(r) for r in queries]`, with a vectorized single-rectangle containment pre-pass."""
+		if not self._rects:
+			return [False] * len(queries)
+		if not NUMPY_AVAILABLE or len(queries) < 32 or len(queries) * len(self._rects) > max_pairs:
+			return [self.contains(r) for r in queries]
+
+		if self._np_rects is None:
+			self._np_rects = np.array([(s.x1, s.y1, s.x2, s.y2) for s in self._rects], dtype=np.float64).reshape(-1, 4)
+			self._np_count = len(self._rects)
+		union = self._np_rects[: self._np_count]
+		q = np.array([(r.x1, r.y1, r.x2, r.y2) for r in queries], dtype=np.float64)
+		inside_one = (
+			(union[None, :, 0] <= q[:, None, 0])
+			& (union[None, :, 1] <= q[:, None, 1])
+			& (union[None, :, 2] >= q[:, None, 2])
+			& (union[None, :, 3] >= q[:, None, 3])
+		).any(axis=1)
+		return [True if covered else self.contains(r) for r, covered in zip(queries, inside_one.tolist())]
+
+
 class PaintOrderRemover:
 	"""
 	Calculates which elements should be removed based on the paint order parameter.
@@ -158,34 +297,33 @@ class PaintOrderRemover:
 			if node.original_node.snapshot_node and node.original_node.snapshot_node.paint_order is not None:
 				grouped_by_paint_order[node.original_node.snapshot_node.paint_order].append(node)
 
-		rect_union = RectUnionPure()
+		rect_union = RectUnionIndexed()
 
 		for paint_order, nodes in sorted(grouped_by_paint_order.items(), key=lambda x: -x[0]):
-			rects_to_add = []
+			layer_nodes: list[tuple[SimplifiedNode, EnhancedSnapshotNode]] = []
+			layer_rects: list[Rect] = []
 
 			for node in nodes:
-				if not node.original_node.snapshot_node or not node.original_node.snapshot_node.bounds:
+				snapshot_node = node.original_node.snapshot_node
+				if not snapshot_node or not snapshot_node.bounds:
 					continue  # shouldn't happen by how we filter them out in the first place
 
-				rect = Rect(
-					x1=node.original_node.snapshot_node.bounds.x,
-					y1=node.original_node.snapshot_node.bounds.y,
-					x2=node.original_node.snapshot_node.bounds.x + node.original_node.snapshot_node.bounds.width,
-					y2=node.original_node.snapshot_node.bounds.y + node.original_node.snapshot_node.bounds.height,
-				)
+				bounds = snapshot_node.bounds
+				layer_nodes.append((node, snapshot_node))
+				layer_rects.append(Rect(x1=bounds.x, y1=bounds.y, x2=bounds.x + bounds.width, y2=bounds.y + bounds.height))
+
+			# Every node of a layer is checked against the union of the layers above it
+			covered = rect_union.contains_batch(layer_rects)
+			rects_to_add = []
 
-				if rect_union.contains(rect):
+			for (node, snapshot_node), rect, is_covered in zip(layer_nodes, layer_rects, covered):
+				if is_covered:
 					node.ignored_by_paint_order = True
 
 				# don't add to the nodes if opacity is less then 0.95 or background-color is transparent
-				if (
-					node.original_node.snapshot_node.computed_styles
-					and node.original_node.snapshot_node.computed_styles.get('background-color', 'rgba(0, 0, 0, 0)')
-					== 'rgba(0, 0, 0, 0)'
-				) or (
-					node.original_node.snapshot_node.computed_styles
-					and float(node.original_node.snapshot_node.computed_styles.get('opacity', '1'))
-					< 0.8  # this is highly vibes based number
+				computed_styles = snapshot_node.computed_styles
+				if (computed_styles and computed_styles.get('background-color', 'rgba(0, 0, 0, 0)') == 'rgba(0, 0, 0, 0)') or (
+					computed_styles and float(computed_styles.get('opacity', '1')) < 0.8  # this is highly vibes based number
 				):
 					continue
 
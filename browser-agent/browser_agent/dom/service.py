@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any
 
 from cdp_use.cdp.accessibility.commands import GetFullAXTreeReturns
 from cdp_use.cdp.accessibility.types import AXNode
+from cdp_use.cdp.dom.commands import GetDocumentReturns
 from cdp_use.cdp.dom.types import Node
 from cdp_use.cdp.target import TargetID
 
@@ -12,6 +13,8 @@ from browser_agent.dom.enhanced_snapshot import (
 	REQUIRED_COMPUTED_STYLES,
 	build_snapshot_lookup,
 )
+from browser_agent.dom.incremental import MIRRORED_DOM_EVENTS, DOMTreeMirror
+from browser_agent.dom.serialization_cache import serialize_accessible_elements_cached
 from browser_agent.dom.serializer.clickable_elements import ClickableElementDetector
 from browser_agent.dom.serializer.serializer import DOMTreeSerializer
 from browser_agent.dom.views import (
@@ -27,10 +30,69 @@ from browser_agent.observability import observe_debug
 from browser_agent.utils import create_task_with_error_handling
 
 if TYPE_CHECKING:
-	from browser_agent.browser.session import BrowserSession
+	from browser_agent.browser.session import BrowserSession, CDPSession
 
 # Note: iframe limits are now configurable via BrowserProfile.max_iframes and BrowserProfile.max_iframe_depth
 
+# Finds elements with click-like listeners, returning each as its path of element-child indices from
+# `document`. A MutationObserver (elements and attributes) marks the result stale, so unchanged pages skip the
+# full scan. Listeners added with addEventListener cause no mutation, so a result also goes stale after
+# JS_CLICK_LISTENER_SCAN_MAX_AGE_MS; a navigation starts over with a new window.
+JS_CLICK_LISTENER_SCAN_MAX_AGE_MS = 5000
+JS_CLICK_LISTENER_SCAN = """
+(() => {
+	// getEventListeners is only available in DevTools context via includeCommandLineAPI
+	if (typeof getEventListeners !== 'function') {
+		return null;
+	}
+
+	const key = Symbol.for('browser_agent.click_listener_scan');
+	let state = window[key];
+	if (state && !state.dirty && !__FORCE__ && Date.now() - state.scannedAt < __MAX_AGE_MS__) {
+		return {token: state.token, unchanged: true};
+	}
+	if (!state) {
+		state = {token: '', dirty: false, scannedAt: 0};
+		new MutationObserver(() => { state.dirty = true; }).observe(document, {childList: true, subtree: true, attributes: true});
+		window[key] = state;
+	}
+
+	const indexOf = new Map();
+	const indexInParent = (el) => {
+		if (!indexOf.has(el)) {
+			const siblings = el.parentNode.children;
+			for (let i = 0; i < siblings.length; i++) indexOf.set(siblings[i], i);
+		}
+		return indexOf.get(el);
+	};
+
+	const paths = [];
+	for (const el of document.querySelectorAll('*')) {
+		try {
+			const listeners = getEventListeners(el);
+			// Check for click-related event listeners
+			if (!(listeners.click || listeners.mousedown || listeners.mouseup || listeners.pointerdown || listeners.pointerup)) {
+				continue;
+			}
+		} catch (e) {
+			continue;  // Ignore errors for individual elements (e.g., cross-origin)
+		}
+		const path = [];
+		let node = el;
+		while (node !== document && node.parentNode) {
+			path.push(indexInParent(node));
+			node = node.parentNode;
+		}
+		if (node === document) paths.push(path.reverse());
+	}
+
+	state.token = Math.random().toString(36).slice(2);
+	state.dirty = false;
+	state.scannedAt = Date.now();
+	return {token: state.token, paths};
+})()
+""".replace('__MAX_AGE_MS__', str(JS_CLICK_LISTENER_SCAN_MAX_AGE_MS))
+
 
 class DomService:
 	"""
@@ -52,6 +114,8 @@ class DomService:
 		max_iframes: int = 100,
 		max_iframe_depth: int = 5,
 		viewport_threshold: int | None = 1000,
+		incremental: bool = False,
+		serialization_cache: bool = False,
 	):
 		self.browser_session = browser_session
 		self.logger = logger or browser_session.logger
@@ -60,6 +124,17 @@ class DomService:
 		self.max_iframes = max_iframes
 		self.max_iframe_depth = max_iframe_depth
 		self.viewport_threshold = viewport_threshold
+		self.incremental = incremental
+		# Reuse serializations of identical DOMs, see dom/serialization_cache.py
+		self.serialization_cache = serialization_cache
+
+		# Incremental mode: raw DOM trees kept live from DOM mutation events, per target
+		self._dom_mirrors: dict[TargetID, DOMTreeMirror] = {}
+		self._dom_mirrors_by_session: dict[str, DOMTreeMirror] = {}
+		self._mirror_events_client: Any = None
+
+		# Click-listener scan results per target: (in-page scan token, backend node ids)
+		self._js_listener_cache: dict[TargetID, tuple[str, set[int]]] = {}
 
 	async def __aenter__(self):
 		return self
@@ -373,6 +448,67 @@ class DomService:
 
 		return {'nodes': merged_nodes}
 
+	async def _scan_js_click_listeners(
+		self, target_id: TargetID, cdp_session: 'CDPSession'
+	) -> set[int] | tuple[str, list[list[int]]] | None:
+		"""Find elements with JS click listeners in a single `Runtime.evaluate`.
+
+		Instead of returning element references (one `DOM.describeNode` round trip each), the page
+		returns every match as its path of element-child indices from `document`, which
+		`_resolve_element_paths` maps onto the DOM tree fetched in the same step. An in-page
+		MutationObserver marks the scan stale; while the DOM hasn't changed (and the scan is younger than
+		`JS_CLICK_LISTENER_SCAN_MAX_AGE_MS`) the cached backend node ids are returned directly.
+
+		Returns:
+			Cached backend node ids, a fresh `(token, paths)` scan, or None if detection is unavailable
+		"""
+		cached = self._js_listener_cache.get(target_id)
+		try:
+			for force in (False, True):
+				result = await cdp_session.cdp_client.send.Runtime.evaluate(
+					params={
+						'expression': JS_CLICK_LISTENER_SCAN.replace('__FORCE__', 'true' if force else 'false'),
+						'includeCommandLineAPI': True,  # enables getEventListeners()
+						'returnByValue': True,
+					},
+					session_id=cdp_session.session_id,
+				)
+				value = result.get('result', {}).get('value')
+				if not isinstance(value, dict):
+					return None
+				if not value.get('unchanged'):
+					return value['token'], value.get('paths', [])
+				if cached is not None and cached[0] == value['token']:
+					return cached[1]
+				# The page still has a scan we have no results for (e.g. new DomService), rescan
+		except Exception as e:
+			self.logger.debug(f'Failed to detect JS event listeners: {e}')
+		return None
+
+	@staticmethod
+	def _resolve_element_paths(root: Node, paths: list[list[int]]) -> set[int]:
+		"""Map element-child index paths (from the document node) to backend node ids."""
+		element_children: dict[int, list[Node]] = {}
+		backend_ids: set[int] = set()
+		for path in paths:
+			node: Node | None = root
+			for index in path:
+				children = element_children.get(node['nodeId'])  # type: ignore[index]
+				if children is None:
+					children = [
+						child
+						for child in node.get('children') or []
+						if child['nodeType'] == NodeType.ELEMENT_NODE.value  # type: ignore[union-attr]
+					]
+					element_children[node['nodeId']] = children  # type: ignore[index]
+				if index >= len(children):
+					node = None
+					break
+				node = children[index]
+			if node is not None and node is not root:
+				backend_ids.add(node['backendNodeId'])
+		return backend_ids
+
 	async def _get_all_trees(self, target_id: TargetID) -> TargetAllTrees:
 		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
 
@@ -428,92 +564,7 @@ class DomService:
 
 		# Detect elements with JavaScript click event listeners (without mutating DOM)
 		start_js_listener_detection = time.time()
-		js_click_listener_backend_ids: set[int] = set()
-		try:
-			# Step 1: Run JS to find elements with click listeners and return them by reference
-			js_listener_result = await cdp_session.cdp_client.send.Runtime.evaluate(
-				params={
-					'expression': """
-					(() => {
-						// getEventListeners is only available in DevTools context via includeCommandLineAPI
-						if (typeof getEventListeners !== 'function') {
-							return null;
-						}
-
-						const elementsWithListeners = [];
-						const allElements = document.querySelectorAll('*');
-
-						for (const el of allElements) {
-							try {
-								const listeners = getEventListeners(el);
-								// Check for click-related event listeners
-								if (listeners.click || listeners.mousedown || listeners.mouseup || listeners.pointerdown || listeners.pointerup) {
-									elementsWithListeners.push(el);
-								}
-							} catch (e) {
-								// Ignore errors for individual elements (e.g., cross-origin)
-							}
-						}
-
-						return elementsWithListeners;
-					})()
-					""",
-					'includeCommandLineAPI': True,  # enables getEventListeners()
-					'returnByValue': False,  # Return object references, not values
-				},
-				session_id=cdp_session.session_id,
-			)
-
-			result_object_id = js_listener_result.get('result', {}).get('objectId')
-			if result_object_id:
-				# Step 2: Get array properties to access each element
-				array_props = await cdp_session.cdp_client.send.Runtime.getProperties(
-					params={
-						'objectId': result_object_id,
-						'ownProperties': True,
-					},
-					session_id=cdp_session.session_id,
-				)
-
-				# Step 3: For each element, get its backend node ID via DOM.describeNode
-				element_object_ids: list[str] = []
-				for prop in array_props.get('result', []):
-					# Array indices are numeric property names
-					prop_name = prop.get('name', '') if isinstance(prop, dict) else ''
-					if isinstance(prop_name, str) and prop_name.isdigit():
-						prop_value = prop.get('value', {}) if isinstance(prop, dict) else {}
-						if isinstance(prop_value, dict):
-							object_id = prop_value.get('objectId')
-							if object_id and isinstance(object_id, str):
-								element_object_ids.append(object_id)
-
-				# Batch resolve backend node IDs (run in parallel)
-				async def get_backend_node_id(object_id: str) -> int | None:
-					try:
-						node_info = await cdp_session.cdp_client.send.DOM.describeNode(
-							params={'objectId': object_id},
-							session_id=cdp_session.session_id,
-						)
-						return node_info.get('node', {}).get('backendNodeId')
-					except Exception:
-						return None
-
-				# Resolve all element object IDs to backend node IDs in parallel
-				backend_ids = await asyncio.gather(*[get_backend_node_id(oid) for oid in element_object_ids])
-				js_click_listener_backend_ids = {bid for bid in backend_ids if bid is not None}
-
-				# Release the array object to avoid memory leaks
-				try:
-					await cdp_session.cdp_client.send.Runtime.releaseObject(
-						params={'objectId': result_object_id},
-						session_id=cdp_session.session_id,
-					)
-				except Exception:
-					pass  # Best effort cleanup
-
-				self.logger.debug(f'Detected {len(js_click_listener_backend_ids)} elements with JS click listeners')
-		except Exception as e:
-			self.logger.debug(f'Failed to detect JS event listeners: {e}')
+		js_listener_scan = await self._scan_js_click_listeners(target_id, cdp_session)
 		js_listener_detection_ms = (time.time() - start_js_listener_detection) * 1000
 
 		# Define CDP request factories to avoid duplication
@@ -530,6 +581,8 @@ class DomService:
 			)
 
 		def create_dom_tree_request():
+			if self.incremental:
+				return self._get_incremental_dom_tree(target_id, cdp_session.session_id)
 			return cdp_session.cdp_client.send.DOM.getDocument(
 				params={'depth': -1, 'pierce': True}, session_id=cdp_session.session_id
 			)
@@ -601,6 +654,18 @@ class DomService:
 		end_cdp_calls = time.time()
 		cdp_calls_ms = (end_cdp_calls - start_cdp_calls) * 1000
 
+		# Resolve listener element paths against the DOM tree we just fetched (no per-element CDP calls)
+		start_js_listener_resolve = time.time()
+		js_click_listener_backend_ids: set[int] = set()
+		if isinstance(js_listener_scan, set):
+			js_click_listener_backend_ids = js_listener_scan
+		elif js_listener_scan is not None:
+			token, paths = js_listener_scan
+			js_click_listener_backend_ids = self._resolve_element_paths(dom_tree['root'], paths)
+			self._js_listener_cache[target_id] = (token, js_click_listener_backend_ids)
+			self.logger.debug(f'Detected {len(js_click_listener_backend_ids)} elements with JS click listeners')
+		js_listener_resolve_ms = (time.time() - start_js_listener_resolve) * 1000
+
 		# Calculate total time for _get_all_trees and overhead
 		start_snapshot_processing = time.time()
 
@@ -634,12 +699,54 @@ class DomService:
 			cdp_timing={
 				'iframe_scroll_detection_ms': iframe_scroll_ms,
 				'js_listener_detection_ms': js_listener_detection_ms,
+				'js_listener_resolve_ms': js_listener_resolve_ms,
 				'cdp_parallel_calls_ms': cdp_calls_ms,
 				'snapshot_processing_ms': snapshot_processing_ms,
 			},
 			js_click_listener_backend_ids=js_click_listener_backend_ids if js_click_listener_backend_ids else None,
 		)
 
+	async def _get_incremental_dom_tree(self, target_id: TargetID, session_id: str) -> GetDocumentReturns:
+		"""Return the target's DOM tree from its live mirror, falling back to (and re-seeding from) a full getDocument."""
+		cdp_client = self.browser_session.cdp_client
+		self._ensure_mirror_listeners()
+
+		mirror = self._dom_mirrors.get(target_id)
+		if mirror is not None and mirror.session_id == session_id and await mirror.refresh(cdp_client):
+			assert mirror.root is not None  # refresh() only succeeds on a seeded mirror
+			self.logger.debug(f'Reused mirrored DOM tree for target {target_id[-4:]} ({mirror.mutation_count} mutations applied)')
+			return {'root': mirror.root}
+
+		if mirror is not None:
+			self._dom_mirrors_by_session.pop(mirror.session_id, None)
+		mirror = DOMTreeMirror(session_id)
+		self._dom_mirrors[target_id] = mirror
+		self._dom_mirrors_by_session[session_id] = mirror
+		dom_tree = await cdp_client.send.DOM.getDocument(params={'depth': -1, 'pierce': True}, session_id=session_id)
+		mirror.seed(dom_tree['root'])
+		return dom_tree
+
+	def _ensure_mirror_listeners(self) -> None:
+		"""Route DOM mutation events from the (root) CDP client to the mirror of the session they belong to."""
+		cdp_client = self.browser_session.cdp_client
+		if self._mirror_events_client is cdp_client:
+			return
+		# A new root client (reconnect) means all node ids we hold are meaningless
+		self._dom_mirrors.clear()
+		self._dom_mirrors_by_session.clear()
+		self._mirror_events_client = cdp_client
+
+		def make_handler(method: str):
+			def handler(event: Any, session_id: str | None) -> None:
+				mirror = self._dom_mirrors_by_session.get(session_id or '')
+				if mirror is not None:
+					mirror.queue_event(method, event)
+
+			return handler
+
+		for method in MIRRORED_DOM_EVENTS:
+			getattr(cdp_client.register.DOM, method)(make_handler(method))
+
 	@observe_debug(ignore_input=True, ignore_output=True, name='get_dom_tree')
 	async def get_dom_tree(
 		self,
@@ -1002,6 +1109,11 @@ class DomService:
 		# Count hidden elements per iframe for LLM hints
 		self._count_hidden_elements_in_iframes(enhanced_dom_tree_node)
 
+		# Branch paths (and the element hashes derived from them) are cached on the nodes; fill them top-down
+		# once the whole tree, including cross-origin iframe documents, has been linked together
+		if iframe_depth == 0:
+			enhanced_dom_tree_node.precompute_branch_paths()
+
 		# Calculate total time for get_dom_tree
 		total_get_dom_tree_ms = (time.time() - timing_start_total) * 1000
 		timing_info['get_dom_tree_total_ms'] = total_get_dom_tree_ms
@@ -1049,9 +1161,14 @@ class DomService:
 		# Serialize DOM tree for LLM
 		start_serialize = time.time()
 
-		serialized_dom_state, serializer_timing = DOMTreeSerializer(
-			enhanced_dom_tree, previous_cached_state, paint_order_filtering=self.paint_order_filtering, session_id=session_id
-		).serialize_accessible_elements()
+		if self.serialization_cache:
+			serialized_dom_state, serializer_timing = serialize_accessible_elements_cached(
+				enhanced_dom_tree, previous_cached_state, paint_order_filtering=self.paint_order_filtering, session_id=session_id
+			)
+		else:
+			serialized_dom_state, serializer_timing = DOMTreeSerializer(
+				enhanced_dom_tree, previous_cached_state, paint_order_filtering=self.paint_order_filtering, session_id=session_id
+			).serialize_accessible_elements()
 		total_serialization_ms = (time.time() - start_serialize) * 1000
 
 		# Add serializer sub-timings (convert to ms)
@@ -0,0 +1,153 @@
+"""Equivalence tests for the DOM serialization cache: a cache hit must serialize exactly like a fresh run."""
+
+from browser_agent.dom.serialization_cache import DOMSerializationCache, _walk, serialize_accessible_elements_cached
+from browser_agent.dom.serializer.serializer import DOMTreeSerializer
+from browser_agent.dom.views import (
+	DOMRect,
+	EnhancedAXNode,
+	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
+	NodeType,
+	SerializedDOMState,
+	SimplifiedNode,
+)
+
+
+def _page(id_offset: int = 0, button_label: str = 'Sign in') -> EnhancedDOMTreeNode:
+	"""A small login page; `id_offset` shifts every node and backend node id, as another browser would."""
+	next_id = id_offset
+
+	def node(
+		name: str,
+		attributes: dict[str, str] | None = None,
+		children: list[EnhancedDOMTreeNode] | None = None,
+		role: str | None = None,
+	) -> EnhancedDOMTreeNode:
+		nonlocal next_id
+		next_id += 1
+		node_type = {'#document': NodeType.DOCUMENT_NODE, '#text': NodeType.TEXT_NODE}.get(name, NodeType.ELEMENT_NODE)
+		rect = DOMRect(x=0, y=(next_id - id_offset) * 20, width=200, height=20)
+		result = EnhancedDOMTreeNode(
+			node_id=next_id,
+			backend_node_id=next_id * 10,
+			node_type=node_type,
+			node_name=name,
+			node_value=(attributes or {}).get('text', '') if node_type == NodeType.TEXT_NODE else '',
+			attributes={} if node_type == NodeType.TEXT_NODE else attributes or {},
+			is_scrollable=False,
+			is_visible=True,
+			absolute_position=rect,
+			target_id='target',
+			frame_id=None,
+			session_id=None,
+			content_document=None,
+			shadow_root_type=None,
+			shadow_roots=None,
+			parent_node=None,
+			children_nodes=children or [],
+			ax_node=EnhancedAXNode(
+				ax_node_id=str(next_id), ignored=False, role=role, name=None, description=None, properties=None, child_ids=None
+			)
+			if role
+			else None,
+			snapshot_node=EnhancedSnapshotNode(
+				is_clickable=None,
+				cursor_style='pointer' if role else None,
+				bounds=rect,
+				clientRects=rect,
+				scrollRects=None,
+				computed_styles={'display': 'block', 'visibility': 'visible', 'opacity': '1'},
+				paint_order=1,
+				stacking_contexts=None,
+			),
+		)
+		for child in result.children_nodes or []:
+			child.parent_node = result
+		return result
+
+	def text(value: str) -> EnhancedDOMTreeNode:
+		return node('#text', {'text': value})
+
+	body = node(
+		'BODY',
+		children=[
+			node('H1', children=[text('Welcome')]),
+			node('BUTTON', children=[text(button_label)], role='button'),
+			node('A', {'href': '/docs'}, children=[text('Docs')], role='link'),
+			node('INPUT', {'type': 'email', 'placeholder': 'Email'}, role='textbox'),
+			node(
+				'SELECT',
+				{'name': 'lang'},
+				children=[
+					node('OPTION', {'value': 'en'}, children=[text('English')]),
+					node('OPTION', {'value': 'de'}, children=[text('Deutsch')]),
+				],
+				role='combobox',
+			),
+		],
+	)
+	return node('#document', children=[node('HTML', children=[body])])
+
+
+def _new_markers(state: SerializedDOMState) -> list[tuple[int, bool]]:
+	markers = []
+	stack: list[SimplifiedNode] = [state._root] if state._root else []
+	while stack:
+		simplified = stack.pop()
+		if simplified.is_interactive:
+			markers.append((simplified.original_node.backend_node_id, simplified.is_new))
+		stack.extend(reversed(simplified.children))
+	return markers
+
+
+def test_hit_on_a_page_with_other_ids_matches_a_fresh_serialization():
+	cache = DOMSerializationCache()
+	serialize_accessible_elements_cached(_page(), cache=cache)
+	page = _page(id_offset=1000)
+
+	cached, _ = serialize_accessible_elements_cached(page, cache=cache)
+	expected, _ = DOMTreeSerializer(_page(id_offset=1000)).serialize_accessible_elements()
+
+	assert (cache.hits, cache.misses) == (1, 1)
+	assert cached.llm_representation() == expected.llm_representation()
+	assert list(cached.selector_map) == list(expected.selector_map)
+	# The selector map points at this page's own nodes, not at the tree the entry was built from
+	page_nodes = {id(node) for node in _walk(page)}
+	assert all(id(node) in page_nodes for node in cached.selector_map.values())
+
+
+def test_hit_marks_new_elements_against_the_previous_state():
+	cache = DOMSerializationCache()
+	previous, _ = serialize_accessible_elements_cached(_page(), cache=cache)
+	# Half of the page keeps its ids from the previous step, the rest is new
+	previous.selector_map = dict(list(previous.selector_map.items())[:3])
+
+	cached, _ = serialize_accessible_elements_cached(_page(), previous, cache=cache)
+	expected, _ = DOMTreeSerializer(_page(), previous).serialize_accessible_elements()
+
+	assert cache.hits == 1
+	assert _new_markers(cached) == _new_markers(expected)
+	assert any(is_new for _, is_new in _new_markers(cached))
+	assert cached.llm_representation() == expected.llm_representation()
+
+
+def test_changed_content_misses():
+	cache = DOMSerializationCache()
+	serialize_accessible_elements_cached(_page(), cache=cache)
+
+	state, _ = serialize_accessible_elements_cached(_page(button_label='Log in'), cache=cache)
+
+	assert (cache.hits, cache.misses) == (0, 2)
+	assert 'Log in' in state.llm_representation()
+
+
+def test_disk_entries_are_shared_between_caches(tmp_path):
+	serialize_accessible_elements_cached(_page(), cache=DOMSerializationCache(directory=tmp_path))
+	cache = DOMSerializationCache(directory=tmp_path)
+
+	cached, _ = serialize_accessible_elements_cached(_page(id_offset=1000), cache=cache)
+	expected, _ = DOMTreeSerializer(_page(id_offset=1000)).serialize_accessible_elements()
+
+	assert cache.hits == 1
+	assert cached.llm_representation() == expected.llm_representation()
+	assert list(cached.selector_map) == list(expected.selector_map)
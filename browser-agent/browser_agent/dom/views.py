@@ -1,4 +1,5 @@
 import hashlib
+import sys
 from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import Any
@@ -463,6 +464,12 @@ class EnhancedDOMTreeNode:
 
 	uuid: str = field(default_factory=uuid7str)
 
+	# Identity caches, filled top-down by `precompute_branch_paths()` once the tree is built (or lazily on first use)
+	_branch_path: str | None = field(default=None, repr=False, compare=False)
+	_element_hash: int | None = field(default=None, repr=False, compare=False)
+	_stable_hash: int | None = field(default=None, repr=False, compare=False)
+	_branch_hash: int | None = field(default=None, repr=False, compare=False)
+
 	@property
 	def parent(self) -> 'EnhancedDOMTreeNode | None':
 		return self.parent_node
@@ -831,29 +838,21 @@ class EnhancedDOMTreeNode:
 		More stable across sessions than element_hash since it excludes
 		transient CSS state classes like focus, hover, animation, etc.
 		"""
-		parent_branch_path = self._get_parent_branch_path()
-		parent_branch_path_string = '/'.join(parent_branch_path)
-
-		# Filter dynamic classes before building attributes string
-		filtered_attrs: dict[str, str] = {}
-		for k, v in self.attributes.items():
-			if k not in STATIC_ATTRIBUTES:
-				continue
-			if k == 'class':
-				v = filter_dynamic_classes(v)
-				if not v:  # Skip empty class after filtering
+		if self._stable_hash is None:
+			# Filter dynamic classes before building attributes string
+			filtered_attrs: dict[str, str] = {}
+			for k, v in self.attributes.items():
+				if k not in STATIC_ATTRIBUTES:
 					continue
-			filtered_attrs[k] = v
+				if k == 'class':
+					v = filter_dynamic_classes(v)
+					if not v:  # Skip empty class after filtering
+						continue
+				filtered_attrs[k] = v
 
-		attributes_string = ''.join(f'{k}={v}' for k, v in sorted(filtered_attrs.items()))
-
-		ax_name = ''
-		if self.ax_node and self.ax_node.name:
-			ax_name = f'|ax_name={self.ax_node.name}'
-
-		combined_string = f'{parent_branch_path_string}|{attributes_string}{ax_name}'
-		hash_hex = hashlib.sha256(combined_string.encode()).hexdigest()
-		return int(hash_hex[:16], 16)
+			attributes_string = ''.join(f'{k}={v}' for k, v in sorted(filtered_attrs.items()))
+			self._stable_hash = _sha256_int(f'{self._get_branch_path_string()}|{attributes_string}{self._ax_name_suffix()}')
+		return self._stable_hash
 
 	def __str__(self) -> str:
 		return f'[<{self.tag_name}>#{self.frame_id[-4:] if self.frame_id else "?"}:{self.backend_node_id}]'
@@ -864,50 +863,80 @@ class EnhancedDOMTreeNode:
 
 		TODO: migrate this to use only backendNodeId + current SessionId
 		"""
-
-		# Get parent branch path
-		parent_branch_path = self._get_parent_branch_path()
-		parent_branch_path_string = '/'.join(parent_branch_path)
-
-		attributes_string = ''.join(
-			f'{k}={v}' for k, v in sorted((k, v) for k, v in self.attributes.items() if k in STATIC_ATTRIBUTES)
-		)
-
-		# Include accessibility name (ax_name) if available - this helps distinguish
-		# elements that have identical structure and attributes but different visible text
-		ax_name = ''
-		if self.ax_node and self.ax_node.name:
-			ax_name = f'|ax_name={self.ax_node.name}'
-
-		# Combine all for final hash
-		combined_string = f'{parent_branch_path_string}|{attributes_string}{ax_name}'
-		element_hash = hashlib.sha256(combined_string.encode()).hexdigest()
-
-		# Convert to int for __hash__ return type - use first 16 chars and convert from hex to int
-		return int(element_hash[:16], 16)
+		if self._element_hash is None:
+			attributes_string = ''.join(
+				f'{k}={v}' for k, v in sorted((k, v) for k, v in self.attributes.items() if k in STATIC_ATTRIBUTES)
+			)
+			# Include accessibility name (ax_name) if available - this helps distinguish
+			# elements that have identical structure and attributes but different visible text
+			self._element_hash = _sha256_int(f'{self._get_branch_path_string()}|{attributes_string}{self._ax_name_suffix()}')
+		return self._element_hash
 
 	def parent_branch_hash(self) -> int:
 		"""
 		Hash the element based on its parent branch path and attributes.
 		"""
-		parent_branch_path = self._get_parent_branch_path()
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		element_hash = hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		if self._branch_hash is None:
+			self._branch_hash = _sha256_int(self._get_branch_path_string())
+		return self._branch_hash
 
-		return int(element_hash[:16], 16)
+	def precompute_branch_paths(self) -> None:
+		"""
+		Fill the branch path cache for this node and everything below it, dropping cached hashes.
+
+		Walks the finished tree top-down so each node extends its parent's path instead of walking
+		back to the root; the hashes are then derived from it lazily, once per node. Call after the
+		tree is assembled: anything cached while parents were still being linked (e.g. for iframe
+		content documents) is overwritten.
+		"""
+		stack: list[EnhancedDOMTreeNode] = [self]
+		while stack:
+			node = stack.pop()
+			parent = node.parent_node
+			node._branch_path = node._extend_branch_path(parent._get_branch_path_string() if parent else '')
+			node._element_hash = None
+			node._stable_hash = None
+			node._branch_hash = None
+			stack.extend(node.children_and_shadow_roots)
+			if node.content_document:
+				stack.append(node.content_document)
+
+	def _get_branch_path_string(self) -> str:
+		"""'/'-joined tag names of the element ancestors from the root down to (and including) this node."""
+		if self._branch_path is not None:
+			return self._branch_path
+
+		uncached: list[EnhancedDOMTreeNode] = []
+		current: EnhancedDOMTreeNode | None = self
+		while current is not None and current._branch_path is None:
+			uncached.append(current)
+			current = current.parent_node
+
+		path = (current._branch_path or '') if current is not None else ''
+		for node in reversed(uncached):
+			path = node._branch_path = node._extend_branch_path(path)
+		return path
+
+	def _extend_branch_path(self, parent_path: str) -> str:
+		if self.node_type != NodeType.ELEMENT_NODE:
+			return parent_path
+		# Interned so siblings (and repeated subtrees) share one string instead of one copy per node
+		return sys.intern(f'{parent_path}/{self.tag_name}' if parent_path else self.tag_name)
+
+	def _ax_name_suffix(self) -> str:
+		if self.ax_node and self.ax_node.name:
+			return f'|ax_name={self.ax_node.name}'
+		return ''
 
 	def _get_parent_branch_path(self) -> list[str]:
 		"""Get the parent branch path as a list of tag names from root to current element."""
-		parents: list['EnhancedDOMTreeNode'] = []
-		current_element: 'EnhancedDOMTreeNode | None' = self
+		path = self._get_branch_path_string()
+		return path.split('/') if path else []
 
-		while current_element is not None:
-			if current_element.node_type == NodeType.ELEMENT_NODE:
-				parents.append(current_element)
-			current_element = current_element.parent_node
 
-		parents.reverse()
-		return [parent.tag_name for parent in parents]
+def _sha256_int(value: str) -> int:
+	# Use the first 16 hex chars of the SHA-256 as the int hash
+	return int(hashlib.sha256(value.encode()).hexdigest()[:16], 16)
 
 
 DOMSelectorMap = dict[int, EnhancedDOMTreeNode]
@@ -926,6 +955,71 @@ class MarkdownChunk:
 	has_more: bool
 
 
+# Attributes that usually identify an element, tried in this order by ATTRIBUTE matching
+MATCH_ATTRIBUTES = ('name', 'id', 'aria-label')
+
+
+class ElementMatchIndex:
+	"""
+	Lookup tables from element identifiers to selector_map indices, for finding recorded elements on a fresh page.
+
+	Each table is built on first use with one pass over the selector map, so a replay only pays for the match
+	levels it actually reaches (e.g. stable hashes are never computed when every element matches EXACT).
+	Like a linear scan, the first element in selector_map order wins when several share an identifier.
+	"""
+
+	def __init__(self, selector_map: DOMSelectorMap):
+		self.selector_map = selector_map
+		self._tables: dict[MatchLevel, dict[Any, int]] = {}
+
+	def _keys(self, level: MatchLevel, node: EnhancedDOMTreeNode) -> list[Any]:
+		if level == MatchLevel.EXACT:
+			return [node.element_hash]
+		if level == MatchLevel.STABLE:
+			return [node.compute_stable_hash()]
+		if level == MatchLevel.XPATH:
+			return [node.xpath]
+		node_name = node.node_name.lower()
+		if level == MatchLevel.AX_NAME:
+			return [(node_name, node.ax_node.name)] if node.ax_node and node.ax_node.name else []
+		attributes = node.attributes or {}
+		return [(node_name, key, attributes[key]) for key in MATCH_ATTRIBUTES if attributes.get(key)]
+
+	def _table(self, level: MatchLevel) -> dict[Any, int]:
+		table = self._tables.get(level)
+		if table is None:
+			table = self._tables[level] = {}
+			for index, node in self.selector_map.items():
+				for key in self._keys(level, node):
+					table.setdefault(key, index)
+		return table
+
+	def lookup(self, level: MatchLevel, key: Any) -> int | None:
+		"""Index of the first element whose identifier at `level` equals `key`, see `_keys` for the key shapes."""
+		return self._table(level).get(key)
+
+	def match(self, element: 'DOMInteractedElement') -> tuple[int, MatchLevel] | None:
+		"""Find a recorded element, trying each `MatchLevel` from strictest to loosest."""
+		node_name = element.node_name.lower()
+		candidates: list[tuple[MatchLevel, Any]] = [(MatchLevel.EXACT, element.element_hash)]
+		if element.stable_hash is not None:
+			candidates.append((MatchLevel.STABLE, element.stable_hash))
+		if element.x_path:
+			candidates.append((MatchLevel.XPATH, element.x_path))
+		if element.ax_name:
+			candidates.append((MatchLevel.AX_NAME, (node_name, element.ax_name)))
+		attributes = element.attributes or {}
+		candidates.extend(
+			(MatchLevel.ATTRIBUTE, (node_name, key, attributes[key])) for key in MATCH_ATTRIBUTES if attributes.get(key)
+		)
+
+		for level, key in candidates:
+			index = self.lookup(level, key)
+			if index is not None:
+				return index, level
+		return None
+
+
 @dataclass
 class SerializedDOMState:
 	_root: SimplifiedNode | None
@@ -933,6 +1027,15 @@ class SerializedDOMState:
 
 	selector_map: DOMSelectorMap
 
+	_match_index: ElementMatchIndex | None = field(default=None, init=False, repr=False, compare=False)
+
+	@property
+	def match_index(self) -> ElementMatchIndex:
+		"""Identifier lookup tables for the selector map, used to find recorded elements when replaying history."""
+		if self._match_index is None:
+			self._match_index = ElementMatchIndex(self.selector_map)
+		return self._match_index
+
 	@observe_debug(ignore_input=True, ignore_output=True, name='llm_representation')
 	def llm_representation(
 		self,
@@ -21,6 +21,7 @@ from pydantic import BaseModel
 
 from browser_agent.llm.anthropic.serializer import AnthropicMessageSerializer
 from browser_agent.llm.base import BaseChatModel
+from browser_agent.llm.client_pool import llm_client_pool
 from browser_agent.llm.exceptions import ModelProviderError, ModelRateLimitError
 from browser_agent.llm.messages import BaseMessage
 from browser_agent.llm.schema import SchemaOptimizer
@@ -100,13 +101,12 @@ class ChatAnthropic(BaseChatModel):
 
 	def get_client(self) -> AsyncAnthropic:
 		"""
-		Returns an AsyncAnthropic client.
+		Returns an AsyncAnthropic client, shared with every other model using the same endpoint and credentials.
 
 		Returns:
-			AsyncAnthropic: An instance of the AsyncAnthropic client.
+			AsyncAnthropic: A pooled instance of the AsyncAnthropic client.
 		"""
-		client_params = self._get_client_params()
-		return AsyncAnthropic(**client_params)
+		return llm_client_pool.get_client(self.provider, self._get_client_params(), lambda params: AsyncAnthropic(**params))
 
 	@property
 	def name(self) -> str:
@@ -177,11 +177,9 @@ class ChatAnthropic(BaseChatModel):
 				# Use tool calling for structured output
 				# Create a tool that represents the output format
 				tool_name = output_format.__name__
-				schema = SchemaOptimizer.create_optimized_json_schema(output_format)
-
-				# Remove title from schema if present (Anthropic doesn't like it in parameters)
-				if 'title' in schema:
-					del schema['title']
+				# Remove title from schema if present (Anthropic doesn't like it in parameters).
+				# The optimized schema is cached and shared, so copy the top level instead of deleting in place.
+				schema = {k: v for k, v in SchemaOptimizer.create_optimized_json_schema(output_format).items() if k != 'title'}
 
 				tool = ToolParam(
 					name=tool_name,
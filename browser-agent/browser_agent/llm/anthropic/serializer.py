@@ -20,9 +20,12 @@ from browser_agent.llm.messages import (
 	SystemMessage,
 	UserMessage,
 )
+from browser_agent.llm.serialized_cache import SerializedMessageCache
 
 NonSystemMessage = UserMessage | AssistantMessage
 
+_serialized_cache = SerializedMessageCache()
+
 
 class AnthropicMessageSerializer:
 	"""Serializer for converting between custom message types and Anthropic message param types."""
@@ -159,26 +162,30 @@ class AnthropicMessageSerializer:
 	# region - Serialize overloads
 	@overload
 	@staticmethod
-	def serialize(message: UserMessage) -> MessageParam: ...
+	def serialize(message: UserMessage, use_cache: bool | None = None) -> MessageParam: ...
 
 	@overload
 	@staticmethod
-	def serialize(message: SystemMessage) -> SystemMessage: ...
+	def serialize(message: SystemMessage, use_cache: bool | None = None) -> SystemMessage: ...
 
 	@overload
 	@staticmethod
-	def serialize(message: AssistantMessage) -> MessageParam: ...
+	def serialize(message: AssistantMessage, use_cache: bool | None = None) -> MessageParam: ...
 
 	@staticmethod
-	def serialize(message: BaseMessage) -> MessageParam | SystemMessage:
+	def serialize(message: BaseMessage, use_cache: bool | None = None) -> MessageParam | SystemMessage:
 		"""Serialize a custom message to an Anthropic MessageParam.
 
+		`use_cache` overrides `message.cache` without touching the message.
+
 		Note: Anthropic doesn't have a 'system' role. System messages should be
 		handled separately as the system parameter in the API call, not as a message.
 		If a SystemMessage is passed here, it will be converted to a user message.
 		"""
+		cache = message.cache if use_cache is None else use_cache
+
 		if isinstance(message, UserMessage):
-			content = AnthropicMessageSerializer._serialize_content(message.content, use_cache=message.cache)
+			content = AnthropicMessageSerializer._serialize_content(message.content, use_cache=cache)
 			return MessageParam(role='user', content=content)
 
 		elif isinstance(message, SystemMessage):
@@ -198,9 +205,7 @@ class AnthropicMessageSerializer:
 						TextBlockParam(
 							text=message.content,
 							type='text',
-							cache_control=AnthropicMessageSerializer._serialize_cache_control(
-								message.cache and not message.tool_calls
-							),
+							cache_control=AnthropicMessageSerializer._serialize_cache_control(cache and not message.tool_calls),
 						)
 					)
 				else:
@@ -210,9 +215,7 @@ class AnthropicMessageSerializer:
 						is_last_content = (i == len(message.content) - 1) and not message.tool_calls
 						if part.type == 'text':
 							blocks.append(
-								AnthropicMessageSerializer._serialize_content_part_text(
-									part, use_cache=message.cache and is_last_content
-								)
+								AnthropicMessageSerializer._serialize_content_part_text(part, use_cache=cache and is_last_content)
 							)
 							# # Note: Anthropic doesn't have a specific refusal block type,
 							# # so we convert refusals to text blocks
@@ -221,23 +224,19 @@ class AnthropicMessageSerializer:
 
 			# Add tool use blocks if present
 			if message.tool_calls:
-				tool_blocks = AnthropicMessageSerializer._serialize_tool_calls_to_content(
-					message.tool_calls, use_cache=message.cache
-				)
+				tool_blocks = AnthropicMessageSerializer._serialize_tool_calls_to_content(message.tool_calls, use_cache=cache)
 				blocks.extend(tool_blocks)
 
 			# If no content or tool calls, add empty text block
 			# (Anthropic requires at least one content block)
 			if not blocks:
 				blocks.append(
-					TextBlockParam(
-						text='', type='text', cache_control=AnthropicMessageSerializer._serialize_cache_control(message.cache)
-					)
+					TextBlockParam(text='', type='text', cache_control=AnthropicMessageSerializer._serialize_cache_control(cache))
 				)
 
 			# If caching is enabled or we have multiple blocks, return blocks as-is
 			# Otherwise, simplify single text blocks to plain string
-			if message.cache or len(blocks) > 1:
+			if cache or len(blocks) > 1:
 				content = blocks
 			else:
 				# Only simplify when no caching and single block
@@ -256,50 +255,28 @@ class AnthropicMessageSerializer:
 			raise ValueError(f'Unknown message type: {type(message)}')
 
 	@staticmethod
-	def _clean_cache_messages(messages: list[NonSystemMessage]) -> list[NonSystemMessage]:
-		"""Clean cache settings so only the last cache=True message remains cached.
+	def _last_cache_index(messages: list[NonSystemMessage]) -> int:
+		"""Index of the only message that keeps cache=True, or -1.
 
-		Because of how Claude caching works, only the last cache message matters.
-		This method automatically removes cache=True from all messages except the last one.
-
-		Args:
-			messages: List of non-system messages to clean
-
-		Returns:
-			List of messages with cleaned cache settings
+		Because of how Claude caching works, only the last cache message matters, so the flag is
+		resolved here and passed to `serialize` instead of copying and mutating the messages.
 		"""
-		if not messages:
-			return messages
-
-		# Create a copy to avoid modifying the original
-		cleaned_messages = [msg.model_copy(deep=True) for msg in messages]
-
-		# Find the last message with cache=True
-		last_cache_index = -1
-		for i in range(len(cleaned_messages) - 1, -1, -1):
-			if cleaned_messages[i].cache:
-				last_cache_index = i
-				break
-
-		# If we found a cached message, disable cache for all others
-		if last_cache_index != -1:
-			for i, msg in enumerate(cleaned_messages):
-				if i != last_cache_index and msg.cache:
-					# Set cache to False for all messages except the last cached one
-					msg.cache = False
-
-		return cleaned_messages
+		for i in range(len(messages) - 1, -1, -1):
+			if messages[i].cache:
+				return i
+		return -1
 
 	@staticmethod
 	def serialize_messages(messages: list[BaseMessage]) -> tuple[list[MessageParam], list[TextBlockParam] | str | None]:
 		"""Serialize a list of messages, extracting any system message.
 
+		Messages are never copied or modified: image data is shared by reference and the serialized
+		form of each message is memoized, so unchanged history costs nothing on later steps.
+
 		Returns:
 		    A tuple of (messages, system_message) where system_message is extracted
 		    from any SystemMessage in the list.
 		"""
-		messages = [m.model_copy(deep=True) for m in messages]
-
 		# Separate system messages from normal messages
 		normal_messages: list[NonSystemMessage] = []
 		system_message: SystemMessage | None = None
@@ -310,19 +287,30 @@ class AnthropicMessageSerializer:
 			else:
 				normal_messages.append(message)
 
-		# Clean cache messages so only the last cache=True message remains cached
-		normal_messages = AnthropicMessageSerializer._clean_cache_messages(normal_messages)
+		# Only the last cache=True message remains cached
+		last_cache_index = AnthropicMessageSerializer._last_cache_index(normal_messages)
 
 		# Serialize normal messages
 		serialized_messages: list[MessageParam] = []
-		for message in normal_messages:
-			serialized_messages.append(AnthropicMessageSerializer.serialize(message))
+		for i, message in enumerate(normal_messages):
+			use_cache = message.cache and i == last_cache_index
+			serialized_messages.append(
+				_serialized_cache.get_or_serialize(
+					message,
+					use_cache,
+					lambda message=message, use_cache=use_cache: AnthropicMessageSerializer.serialize(message, use_cache),
+				)
+			)
 
 		# Serialize system message
 		serialized_system_message: list[TextBlockParam] | str | None = None
 		if system_message:
-			serialized_system_message = AnthropicMessageSerializer._serialize_content_to_str(
-				system_message.content, use_cache=system_message.cache
+			serialized_system_message = _serialized_cache.get_or_serialize(
+				system_message,
+				'system',
+				lambda message=system_message: AnthropicMessageSerializer._serialize_content_to_str(
+					message.content, use_cache=message.cache
+				),
 			)
 
 		return serialized_messages, serialized_system_message
@@ -0,0 +1,219 @@
+"""
+Process-wide pool of long-lived LLM provider clients.
+
+Building a new SDK client per `ainvoke` throws away its connection pool, so every agent step
+(and every judge, extraction and compaction call) paid for a fresh TCP + TLS handshake. The
+pool hands out one SDK client per (provider, base_url, credentials, client options) and one
+shared `httpx.AsyncClient` per (provider, base_url, credentials), so keep-alive connections are
+reused across steps, models and concurrently running agents.
+
+httpx connections belong to the event loop that opened them, so clients are pooled per loop and
+dropped together with it. Once no agent on a loop holds the pool anymore, its connections are kept
+for `idle_timeout` seconds so the next run (e.g. the next request of a server) reuses them; call
+`aclose()` on shutdown. Credentials only enter the pool keys as a SHA-256 fingerprint.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import httpx
+
+# The optional h2 package enables HTTP/2 in httpx
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+logger = logging.getLogger(__name__)
+
+ClientT = TypeVar('ClientT')
+
+# Client options that identify who is calling; only ever stored hashed
+CREDENTIAL_PARAMS = ('api_key', 'auth_token', 'organization', 'project', 'credentials')
+
+
+@dataclass
+class _LoopClients:
+	http_clients: dict[tuple[str, str, str], httpx.AsyncClient] = field(default_factory=dict)
+	sdk_clients: dict[tuple[str, str], Any] = field(default_factory=dict)
+	users: int = 0
+	idle_handle: asyncio.TimerHandle | None = None  # scheduled close once `users` dropped to 0
+
+
+class LLMClientPool:
+	"""Shares SDK clients and HTTP connection pools between all LLM calls on an event loop."""
+
+	def __init__(
+		self,
+		max_connections: int = 200,
+		max_keepalive_connections: int = 50,
+		keepalive_expiry: float = 60.0,
+		http2: bool = True,
+		idle_timeout: float = 300.0,
+	):
+		self.max_connections = max_connections
+		self.max_keepalive_connections = max_keepalive_connections
+		self.keepalive_expiry = keepalive_expiry
+		self.http2 = http2
+		self.idle_timeout = idle_timeout
+		self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients] = weakref.WeakKeyDictionary()
+		self._closing: set[asyncio.Task[None]] = set()
+
+	def configure(
+		self,
+		max_connections: int | None = None,
+		max_keepalive_connections: int | None = None,
+		keepalive_expiry: float | None = None,
+		http2: bool | None = None,
+		idle_timeout: float | None = None,
+	) -> None:
+		"""Change pool limits. Applies to HTTP clients created (and pools released) afterwards."""
+		if max_connections is not None:
+			self.max_connections = max_connections
+		if max_keepalive_connections is not None:
+			self.max_keepalive_connections = max_keepalive_connections
+		if keepalive_expiry is not None:
+			self.keepalive_expiry = keepalive_expiry
+		if http2 is not None:
+			self.http2 = http2
+		if idle_timeout is not None:
+			self.idle_timeout = idle_timeout
+
+	@property
+	def limits(self) -> httpx.Limits:
+		return httpx.Limits(
+			max_connections=self.max_connections,
+			max_keepalive_connections=self.max_keepalive_connections,
+			keepalive_expiry=self.keepalive_expiry,
+		)
+
+	@property
+	def use_http2(self) -> bool:
+		return self.http2 and HTTP2_AVAILABLE
+
+	def get_http_client(self, provider: str, base_url: Any = None, credentials: Any = None) -> httpx.AsyncClient | None:
+		"""Shared `httpx.AsyncClient` for this endpoint and credentials, or None outside a running event loop."""
+		clients = self._current_loop_clients()
+		if clients is None:
+			return None
+		key = (provider, str(base_url or ''), _fingerprint(credentials))
+		client = clients.http_clients.get(key)
+		if client is None or client.is_closed:
+			client = httpx.AsyncClient(
+				limits=self.limits,
+				http2=self.use_http2,
+				follow_redirects=True,
+				# The SDKs pass their own per-request timeout, this only covers requests that don't
+				timeout=httpx.Timeout(600.0, connect=10.0),
+			)
+			clients.http_clients[key] = client
+		return client
+
+	def get_client(
+		self,
+		provider: str,
+		client_params: dict[str, Any],
+		factory: Callable[[dict[str, Any]], ClientT],
+		http_client_param: str | None = 'http_client',
+	) -> ClientT:
+		"""Return the pooled SDK client built by `factory(client_params)`, creating it on first use.
+
+		Unless the caller brought its own, the shared HTTP client for the endpoint is injected as
+		`client_params[http_client_param]`. Outside a running event loop nothing is pooled.
+		"""
+		clients = self._current_loop_clients()
+		if clients is None:
+			return factory(client_params)
+
+		key = (provider, _fingerprint(sorted(client_params.items(), key=lambda item: item[0])))
+		client = clients.sdk_clients.get(key)
+		if client is not None and not _is_closed(client):
+			return client
+
+		params = dict(client_params)
+		if http_client_param and params.get(http_client_param) is None:
+			credentials = {k: v for k, v in client_params.items() if k in CREDENTIAL_PARAMS}
+			params[http_client_param] = self.get_http_client(provider, client_params.get('base_url'), credentials)
+		client = factory(params)
+		clients.sdk_clients[key] = client
+		return client
+
+	def retain(self) -> None:
+		"""Mark the current loop's clients as in use, e.g. for the duration of an agent run."""
+		clients = self._current_loop_clients()
+		if clients is not None:
+			clients.users += 1
+			if clients.idle_handle is not None:
+				clients.idle_handle.cancel()
+				clients.idle_handle = None
+
+	async def release(self) -> None:
+		"""Undo one `retain()`; once nothing on this loop held the pool for `idle_timeout` seconds, it is closed."""
+		clients = self._current_loop_clients()
+		if clients is None:
+			return
+		clients.users = max(0, clients.users - 1)
+		if clients.users > 0 or clients.idle_handle is not None:
+			return
+		if self.idle_timeout <= 0:
+			await self.aclose()
+			return
+		clients.idle_handle = asyncio.get_running_loop().call_later(self.idle_timeout, self._close_idle, clients)
+
+	async def aclose(self) -> None:
+		"""Close every HTTP client the pool created on the current event loop and forget its SDK clients.
+
+		SDK clients are not closed: they may wrap an `http_client` their caller passed in and still uses.
+		"""
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			return
+		clients = self._loops.pop(loop, None)
+		if clients is None:
+			return
+		if clients.idle_handle is not None:
+			clients.idle_handle.cancel()
+			clients.idle_handle = None
+		for http_client in clients.http_clients.values():
+			try:
+				await http_client.aclose()
+			except Exception as e:
+				logger.debug(f'Failed to close pooled LLM HTTP client: {e}')
+		clients.http_clients.clear()
+		clients.sdk_clients.clear()
+
+	def _close_idle(self, clients: _LoopClients) -> None:
+		clients.idle_handle = None
+		if clients.users > 0 or self._loops.get(asyncio.get_running_loop()) is not clients:
+			return
+		task = asyncio.get_running_loop().create_task(self.aclose())
+		self._closing.add(task)
+		task.add_done_callback(self._closing.discard)
+
+	def _current_loop_clients(self) -> _LoopClients | None:
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			return None
+		clients = self._loops.get(loop)
+		if clients is None:
+			clients = self._loops[loop] = _LoopClients()
+		return clients
+
+
+def _fingerprint(value: Any) -> str:
+	if not value:
+		return ''
+	return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def _is_closed(client: Any) -> bool:
+	is_closed = getattr(client, 'is_closed', None)
+	return bool(is_closed()) if callable(is_closed) else False
+
+
+llm_client_pool = LLMClientPool()
@@ -1,4 +1,5 @@
 import asyncio
+import copy
 import json
 import logging
 import random
@@ -13,6 +14,7 @@ from google.genai.types import MediaModality
 from pydantic import BaseModel
 
 from browser_agent.llm.base import BaseChatModel
+from browser_agent.llm.client_pool import llm_client_pool
 from browser_agent.llm.exceptions import ModelProviderError
 from browser_agent.llm.google.serializer import GoogleMessageSerializer
 from browser_agent.llm.messages import BaseMessage
@@ -109,9 +111,6 @@ class ChatGoogle(BaseChatModel):
 	location: str | None = None
 	http_options: types.HttpOptions | types.HttpOptionsDict | None = None
 
-	# Internal client cache to prevent connection issues
-	_client: genai.Client | None = None
-
 	# Static
 	@property
 	def provider(self) -> str:
@@ -146,12 +145,10 @@ class ChatGoogle(BaseChatModel):
 		Returns:
 			genai.Client: An instance of the Google genai client.
 		"""
-		if self._client is not None:
-			return self._client
-
-		client_params = self._get_client_params()
-		self._client = genai.Client(**client_params)
-		return self._client
+		# genai manages its own HTTP stack; pooling the client keeps its connections alive across calls
+		return llm_client_pool.get_client(
+			self.provider, self._get_client_params(), lambda params: genai.Client(**params), http_client_param=None
+		)
 
 	@property
 	def name(self) -> str:
@@ -398,13 +395,15 @@ class ChatGoogle(BaseChatModel):
 					else:
 						# Fallback: Request JSON in the prompt for models without native JSON mode
 						self.logger.debug(f'🔄 Using fallback JSON mode for {output_format.__name__}')
-						# Create a copy of messages to modify
-						modified_messages = [m.model_copy(deep=True) for m in messages]
+						# Only the last message changes; copy just that one
+						modified_messages = list(messages)
 
 						# Add JSON instruction to the last message
 						if modified_messages and isinstance(modified_messages[-1].content, str):
 							json_instruction = f'\n\nPlease respond with a valid JSON object that matches this schema: {SchemaOptimizer.create_optimized_json_schema(output_format)}'
-							modified_messages[-1].content += json_instruction
+							modified_messages[-1] = modified_messages[-1].model_copy(
+								update={'content': modified_messages[-1].content + json_instruction}
+							)
 
 						# Re-serialize with modified messages
 						fallback_contents, fallback_system = GoogleMessageSerializer.serialize_messages(
@@ -536,6 +535,8 @@ class ChatGoogle(BaseChatModel):
 
 		# Handle $defs and $ref resolution
 		if '$defs' in schema:
+			# Work on a copy: the input is usually the shared, cached output of SchemaOptimizer
+			schema = copy.deepcopy(schema)
 			defs = schema.pop('$defs')
 
 			def resolve_refs(obj: Any) -> Any:
@@ -8,6 +8,9 @@ from browser_agent.llm.messages import (
 	SystemMessage,
 	UserMessage,
 )
+from browser_agent.llm.serialized_cache import SerializedMessageCache
+
+_serialized_cache = SerializedMessageCache()
 
 
 class GoogleMessageSerializer:
@@ -32,9 +35,10 @@ class GoogleMessageSerializer:
 		    A tuple of (formatted_messages, system_message) where:
 		    - formatted_messages: List of Content objects for the conversation
 		    - system_message: System instruction string or None
-		"""
 
-		messages = [m.model_copy(deep=True) for m in messages]
+		Messages are not copied; each message's Content (including decoded image bytes) is memoized
+		and reused on later calls while the message is unchanged.
+		"""
 
 		formatted_messages: ContentListUnion = []
 		system_message: str | None = None
@@ -73,51 +77,57 @@ class GoogleMessageSerializer:
 				# Default to user for any unknown message types
 				role = 'user'
 
-			# Initialize message parts
-			message_parts: list[Part] = []
-
 			# If this is the first user message and we have system parts, prepend them
 			if include_system_in_user and system_parts and role == 'user' and not formatted_messages:
 				system_text = '\n\n'.join(system_parts)
+				message_parts: list[Part] = []
 				if isinstance(message.content, str):
 					message_parts.append(Part.from_text(text=f'{system_text}\n\n{message.content}'))
 				else:
 					# Add system text as the first part
 					message_parts.append(Part.from_text(text=system_text))
 				system_parts = []  # Clear after using
+				final_message = Content(role=role, parts=message_parts)
 			else:
-				# Extract content and create parts normally
-				if isinstance(message.content, str):
-					# Regular text content
-					message_parts = [Part.from_text(text=message.content)]
-				elif message.content is not None:
-					# Handle Iterable of content parts
-					for part in message.content:
-						if part.type == 'text':
-							message_parts.append(Part.from_text(text=part.text))
-						elif part.type == 'refusal':
-							message_parts.append(Part.from_text(text=f'[Refusal] {part.refusal}'))
-						elif part.type == 'image_url':
-							# Handle images
-							url = part.image_url.url
-
-							# Format: data:image/jpeg;base64,<data>
-							header, data = url.split(',', 1)
-							# Decode base64 to bytes
-							image_bytes = base64.b64decode(data)
-
-							# Use the media_type from ImageURL, which correctly identifies the image format
-							mime_type = part.image_url.media_type
-
-							# Add image part
-							image_part = Part.from_bytes(data=image_bytes, mime_type=mime_type)
+				final_message = _serialized_cache.get_or_serialize(
+					message, role, lambda message=message, role=role: GoogleMessageSerializer._serialize_content(message, role)
+				)
 
-							message_parts.append(image_part)
-
-			# Create the Content object
-			if message_parts:
-				final_message = Content(role=role, parts=message_parts)
+			if final_message.parts:
 				# for some reason, the type checker is not able to infer the type of formatted_messages
 				formatted_messages.append(final_message)  # type: ignore
 
 		return formatted_messages, system_message
+
+	@staticmethod
+	def _serialize_content(message: BaseMessage, role: str) -> Content:
+		"""Convert one message's content parts to a Google Content object."""
+		message_parts: list[Part] = []
+		if isinstance(message.content, str):
+			# Regular text content
+			message_parts = [Part.from_text(text=message.content)]
+		elif message.content is not None:
+			# Handle Iterable of content parts
+			for part in message.content:
+				if part.type == 'text':
+					message_parts.append(Part.from_text(text=part.text))
+				elif part.type == 'refusal':
+					message_parts.append(Part.from_text(text=f'[Refusal] {part.refusal}'))
+				elif part.type == 'image_url':
+					# Handle images
+					url = part.image_url.url
+
+					# Format: data:image/jpeg;base64,<data>
+					header, data = url.split(',', 1)
+					# Decode base64 to bytes
+					image_bytes = base64.b64decode(data)
+
+					# Use the media_type from ImageURL, which correctly identifies the image format
+					mime_type = part.image_url.media_type
+
+					# Add image part
+					image_part = Part.from_bytes(data=image_bytes, mime_type=mime_type)
+
+					message_parts.append(image_part)
+
+		return Content(role=role, parts=message_parts)
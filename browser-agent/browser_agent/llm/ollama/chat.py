@@ -8,6 +8,7 @@ from ollama import Options
 from pydantic import BaseModel
 
 from browser_agent.llm.base import BaseChatModel
+from browser_agent.llm.client_pool import llm_client_pool
 from browser_agent.llm.exceptions import ModelProviderError
 from browser_agent.llm.messages import BaseMessage
 from browser_agent.llm.ollama.serializer import OllamaMessageSerializer
@@ -49,9 +50,15 @@ class ChatOllama(BaseChatModel):
 
 	def get_client(self) -> OllamaAsyncClient:
 		"""
-		Returns an OllamaAsyncClient client.
+		Returns a pooled OllamaAsyncClient client.
 		"""
-		return OllamaAsyncClient(host=self.host, timeout=self.timeout, **self.client_params or {})
+		return llm_client_pool.get_client(self.provider, self._get_client_params(), self._create_client, http_client_param=None)
+
+	def _create_client(self, params: dict[str, Any]) -> OllamaAsyncClient:
+		# Ollama builds its own httpx client from the kwargs, so hand it the pool limits instead of a client
+		kwargs: dict[str, Any] = {'limits': llm_client_pool.limits, 'http2': llm_client_pool.use_http2}
+		kwargs.update(params['client_params'] or {})
+		return OllamaAsyncClient(host=params['host'], timeout=params['timeout'], **kwargs)
 
 	@property
 	def name(self) -> str:
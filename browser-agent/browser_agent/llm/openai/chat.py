@@ -12,6 +12,7 @@ from openai.types.shared_params.response_format_json_schema import JSONSchema, R
 from pydantic import BaseModel
 
 from browser_agent.llm.base import BaseChatModel
+from browser_agent.llm.client_pool import llm_client_pool
 from browser_agent.llm.exceptions import ModelProviderError, ModelRateLimitError
 from browser_agent.llm.messages import BaseMessage
 from browser_agent.llm.openai.serializer import OpenAIMessageSerializer
@@ -108,13 +109,12 @@ class ChatOpenAI(BaseChatModel):
 
 	def get_client(self) -> AsyncOpenAI:
 		"""
-		Returns an AsyncOpenAI client.
+		Returns an AsyncOpenAI client, shared with every other model using the same endpoint and credentials.
 
 		Returns:
-			AsyncOpenAI: An instance of the AsyncOpenAI client.
+			AsyncOpenAI: A pooled instance of the AsyncOpenAI client.
 		"""
-		client_params = self._get_client_params()
-		return AsyncOpenAI(**client_params)
+		return llm_client_pool.get_client(self.provider, self._get_client_params(), lambda params: AsyncOpenAI(**params))
 
 	@property
 	def name(self) -> str:
@@ -235,12 +235,15 @@ class ChatOpenAI(BaseChatModel):
 				# Add JSON schema to system prompt if requested
 				if self.add_schema_to_system_prompt and openai_messages and openai_messages[0]['role'] == 'system':
 					schema_text = f'\n<json_schema>\n{response_format}\n</json_schema>'
-					if isinstance(openai_messages[0]['content'], str):
-						openai_messages[0]['content'] += schema_text
-					elif isinstance(openai_messages[0]['content'], Iterable):
-						openai_messages[0]['content'] = list(openai_messages[0]['content']) + [
-							ChatCompletionContentPartTextParam(text=schema_text, type='text')
-						]
+					# Serialized messages are shared with the serializer's memo, so replace rather than mutate
+					system_content = openai_messages[0].get('content')
+					if isinstance(system_content, str):
+						openai_messages[0] = {**openai_messages[0], 'content': system_content + schema_text}  # type: ignore[misc]
+					elif isinstance(system_content, Iterable):
+						openai_messages[0] = {  # type: ignore[misc]
+							**openai_messages[0],
+							'content': list(system_content) + [ChatCompletionContentPartTextParam(text=schema_text, type='text')],
+						}
 
 				if self.dont_force_structured_output:
 					response = await self.get_client().chat.completions.create(
@@ -23,6 +23,9 @@ from browser_agent.llm.messages import (
 	ToolCall,
 	UserMessage,
 )
+from browser_agent.llm.serialized_cache import SerializedMessageCache
+
+_serialized_cache = SerializedMessageCache()
 
 
 class OpenAIMessageSerializer:
@@ -162,4 +165,5 @@ class OpenAIMessageSerializer:
 
 	@staticmethod
 	def serialize_messages(messages: list[BaseMessage]) -> list[ChatCompletionMessageParam]:
-		return [OpenAIMessageSerializer.serialize(m) for m in messages]
+		"""Serialize messages, reusing the memoized form of messages that haven't changed since the last call."""
+		return [_serialized_cache.get_or_serialize(m, None, lambda m=m: OpenAIMessageSerializer.serialize(m)) for m in messages]
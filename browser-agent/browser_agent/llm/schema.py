@@ -2,10 +2,16 @@
 Utilities for creating optimized Pydantic schemas for LLM usage.
 """
 
+import weakref
 from typing import Any
 
 from pydantic import BaseModel
 
+# model -> {(remove_min_items, remove_defaults): optimized schema}
+_optimized_schema_cache: weakref.WeakKeyDictionary[type[BaseModel], dict[tuple[bool, bool], dict[str, Any]]] = (
+	weakref.WeakKeyDictionary()
+)
+
 
 class SchemaOptimizer:
 	@staticmethod
@@ -25,8 +31,24 @@ class SchemaOptimizer:
 			remove_defaults: If True, remove default values from the schema
 
 		Returns:
-			Optimized schema with all $refs resolved and strict mode compatibility
+			Optimized schema with all $refs resolved and strict mode compatibility.
+			The result is cached per model and shared between callers, so treat it as read-only.
 		"""
+		model_cache = _optimized_schema_cache.setdefault(model, {})
+		flags = (remove_min_items, remove_defaults)
+		if flags not in model_cache:
+			model_cache[flags] = SchemaOptimizer._build_optimized_json_schema(
+				model, remove_min_items=remove_min_items, remove_defaults=remove_defaults
+			)
+		return model_cache[flags]
+
+	@staticmethod
+	def _build_optimized_json_schema(
+		model: type[BaseModel],
+		*,
+		remove_min_items: bool,
+		remove_defaults: bool,
+	) -> dict[str, Any]:
 		# Generate original schema
 		original_schema = model.model_json_schema()
 
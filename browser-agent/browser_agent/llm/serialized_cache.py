@@ -0,0 +1,79 @@
+"""
+Memoization of provider-serialized messages.
+
+The system prompt and context messages are sent unchanged on every step, and screenshots make
+messages hundreds of KB large, so serializers reuse the provider form of a message as long as the
+message object is alive and its content hasn't changed. Entries are keyed by message identity and
+validated with a cheap fingerprint: Python caches `str` hashes, so hashing even a large base64
+image URL is O(1) after the first call, while any reassigned field (e.g. `cache`) is noticed.
+
+Serialized values are shared between calls and must be treated as read-only by callers.
+"""
+
+import weakref
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+from browser_agent.llm.messages import BaseMessage
+
+T = TypeVar('T')
+
+
+def _part_fingerprint(part: Any) -> Hashable:
+	if part.type == 'text':
+		return ('text', hash(part.text))
+	if part.type == 'image_url':
+		return ('image_url', hash(part.image_url.url), part.image_url.detail, part.image_url.media_type)
+	if part.type == 'refusal':
+		return ('refusal', hash(part.refusal))
+	return (part.type, id(part))
+
+
+def message_fingerprint(message: BaseMessage) -> Hashable:
+	"""Cheap value that changes whenever a field relevant to serialization changes."""
+	content = message.content
+	if content is None or isinstance(content, str):
+		content_fingerprint: Hashable = hash(content)
+	else:
+		content_fingerprint = tuple(_part_fingerprint(part) for part in content)
+	tool_calls = getattr(message, 'tool_calls', None) or ()
+	return (
+		type(message),
+		message.cache,
+		message.name,
+		getattr(message, 'refusal', None),
+		content_fingerprint,
+		tuple((tc.id, tc.function.name, hash(tc.function.arguments)) for tc in tool_calls),
+	)
+
+
+class SerializedMessageCache:
+	"""Per-serializer memo of `message -> serialized form`, dropped when the message is garbage collected."""
+
+	def __init__(self):
+		# id(message) -> (weakref to message, {variant: (fingerprint, value)})
+		self._entries: dict[int, tuple[weakref.ref, dict[Hashable, tuple[Hashable, Any]]]] = {}
+
+	def get_or_serialize(self, message: BaseMessage, variant: Hashable, serialize: Callable[[], T]) -> T:
+		"""Return the memoized serialization of `message` for `variant`, computing it with `serialize()` if stale."""
+		key = id(message)
+		fingerprint = message_fingerprint(message)
+
+		entry = self._entries.get(key)
+		if entry is None or entry[0]() is not message:
+			entry = (weakref.ref(message, lambda _, key=key: self._entries.pop(key, None)), {})
+			self._entries[key] = entry
+
+		cached = entry[1].get(variant)
+		if cached is not None and cached[0] == fingerprint:
+			return cached[1]
+
+		value = serialize()
+		entry[1][variant] = (fingerprint, value)
+		return value
+
+	def clear(self) -> None:
+		self._entries.clear()
+
+	def __len__(self) -> int:
+		return len(self._entries)
@@ -8,6 +8,7 @@ from pathlib import Path
 import anyio
 
 from browser_agent.observability import observe_debug
+from browser_agent.screenshots.utils import screenshot_extension
 
 
 class ScreenshotService:
@@ -21,10 +22,19 @@ class ScreenshotService:
 		self.screenshots_dir = self.agent_directory / 'screenshots'
 		self.screenshots_dir.mkdir(parents=True, exist_ok=True)
 
+		# Last stored (screenshot, path): unchanged pages hand out the same screenshot again
+		self._last_stored: tuple[str, str] | None = None
+
 	@observe_debug(ignore_input=True, ignore_output=True, name='store_screenshot')
 	async def store_screenshot(self, screenshot_b64: str, step_number: int) -> str:
-		"""Store screenshot to disk and return the full path as string"""
-		screenshot_filename = f'step_{step_number}.png'
+		"""Store screenshot to disk and return the full path as string.
+
+		A screenshot identical to the previously stored one is not written again, its path is returned instead.
+		"""
+		if self._last_stored is not None and self._last_stored[0] == screenshot_b64:
+			return self._last_stored[1]
+
+		screenshot_filename = f'step_{step_number}.{screenshot_extension(screenshot_b64)}'
 		screenshot_path = self.screenshots_dir / screenshot_filename
 
 		# Decode base64 and save to disk
@@ -33,6 +43,7 @@ class ScreenshotService:
 		async with await anyio.open_file(screenshot_path, 'wb') as f:
 			await f.write(screenshot_data)
 
+		self._last_stored = (screenshot_b64, str(screenshot_path))
 		return str(screenshot_path)
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='get_screenshot_from_disk')
@@ -0,0 +1,66 @@
+"""
+Helpers for step screenshots: sizing for the LLM, image format detection and change detection.
+
+Step screenshots may be PNG, JPEG or WebP (see `BrowserProfile.screenshot_format`), so consumers
+derive the media type and file extension from the image itself instead of assuming PNG.
+"""
+
+import base64
+from io import BytesIO
+
+from browser_agent.llm.messages import SupportedImageMediaType
+
+# Base64 prefixes of each format's magic bytes
+_BASE64_SIGNATURES: tuple[tuple[str, SupportedImageMediaType], ...] = (
+	('iVBORw0KGgo', 'image/png'),
+	('/9j/', 'image/jpeg'),
+	('UklGR', 'image/webp'),
+)
+_EXTENSIONS = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/webp': 'webp'}
+
+
+def fit_within(size: tuple[float, float], max_size: tuple[int, int]) -> tuple[int, int]:
+	"""`size` scaled uniformly (up or down) to the largest size that fits inside `max_size`.
+
+	This is the size step screenshots are sent to the LLM at when `llm_screenshot_size` is set.
+	"""
+	scale = min(max_size[0] / size[0], max_size[1] / size[1])
+	return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def screenshot_media_type(screenshot_b64: str) -> SupportedImageMediaType:
+	"""MIME type of a base64-encoded screenshot, PNG if the format is not recognized."""
+	for prefix, media_type in _BASE64_SIGNATURES:
+		if screenshot_b64.startswith(prefix):
+			return media_type
+	return 'image/png'
+
+
+def screenshot_extension(screenshot_b64: str) -> str:
+	"""File extension (without dot) matching a base64-encoded screenshot's format."""
+	return _EXTENSIONS[screenshot_media_type(screenshot_b64)]
+
+
+def perceptual_hash(screenshot_b64: str, hash_size: int = 16) -> int:
+	"""Difference hash (dHash) of a screenshot, `hash_size**2` bits.
+
+	Each bit tells whether a pixel of a grayscale `(hash_size + 1) x hash_size` thumbnail is brighter
+	than its right neighbour, so re-encoding, compression noise or tiny repaints leave it unchanged.
+	"""
+	from PIL import Image
+
+	img = Image.open(BytesIO(base64.b64decode(screenshot_b64)))
+	img.draft('L', (hash_size * 8, hash_size * 8))  # JPEG only: decode at reduced size
+	pixels = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+
+	bits = 0
+	for row in range(hash_size):
+		offset = row * (hash_size + 1)
+		for col in range(hash_size):
+			bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+	return bits
+
+
+def hash_distance(a: int, b: int) -> int:
+	"""Number of differing bits between two perceptual hashes."""
+	return (a ^ b).bit_count()
@@ -0,0 +1,209 @@
+"""
+Process-wide model pricing table shared by every `TokenCost`.
+
+The LiteLLM price list is several megabytes of JSON. Instead of every agent reading and parsing its own
+copy, `pricing_table` loads it once per process and keeps only the price and context window fields of each
+model in a read-only mapping. Once the data is older than a day it is refreshed in the background while the
+old prices stay in use. Refreshed data is cached on disk in that compact form, so later processes parse a
+fraction of the original size.
+
+In offline mode (`pricing_table.configure(offline=True)` or BROWSER_AGENT_PRICING_OFFLINE=true) nothing is
+fetched: prices come from `custom_pricing.py` and the on-disk cache, whatever its age.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+import anyio
+import httpx
+
+from browser_agent.config import CONFIG
+from browser_agent.tokens.custom_pricing import CUSTOM_MODEL_PRICING
+from browser_agent.tokens.mappings import MODEL_TO_LITELLM
+from browser_agent.tokens.views import CachedPricingData, ModelPricing
+from browser_agent.utils import create_task_with_error_handling
+
+logger = logging.getLogger(__name__)
+
+# Fields of a LiteLLM model entry that TokenCost uses, in ModelPricing order
+PRICING_FIELDS = (
+	'input_cost_per_token',
+	'output_cost_per_token',
+	'cache_read_input_token_cost',
+	'cache_creation_input_token_cost',
+	'max_tokens',
+	'max_input_tokens',
+	'max_output_tokens',
+)
+
+
+def xdg_cache_home() -> Path:
+	default = Path.home() / '.cache'
+	if CONFIG.XDG_CACHE_HOME and (path := Path(CONFIG.XDG_CACHE_HOME)).is_absolute():
+		return path
+	return default
+
+
+def _compact(data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+	"""Keep only priced models and their `PRICING_FIELDS` (drops e.g. LiteLLM's `sample_spec` entry)."""
+	compact: dict[str, dict[str, Any]] = {}
+	for model, entry in data.items():
+		if not isinstance(entry, dict):
+			continue
+		if not any(isinstance(entry.get(key), int | float) for key in ('input_cost_per_token', 'output_cost_per_token')):
+			continue
+		compact[model] = {key: entry[key] for key in PRICING_FIELDS if entry.get(key) is not None}
+	return compact
+
+
+class PricingTable:
+	"""Lazily loaded, read-only LiteLLM pricing index with background refresh."""
+
+	CACHE_DIR_NAME = 'browser_agent/token_cost'
+	CACHE_DURATION = timedelta(days=1)
+	PRICING_URL = 'https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json'
+
+	def __init__(self, cache_dir: Path | None = None, offline: bool | None = None, keep_cache_files: int = 3):
+		self._cache_dir = cache_dir
+		self.offline = offline if offline is not None else os.getenv('BROWSER_AGENT_PRICING_OFFLINE', 'false').lower() == 'true'
+		self.keep_cache_files = keep_cache_files
+		self._models: Mapping[str, tuple[Any, ...]] = MappingProxyType({})
+		self._timestamp: datetime | None = None
+		self._loaded = False
+		self._load_lock = threading.Lock()
+		self._refresh_task: asyncio.Task[bool] | None = None
+
+	def configure(self, cache_dir: Path | str | None = None, offline: bool | None = None) -> None:
+		"""Change the cache directory and/or offline mode. A new cache directory is read on next use."""
+		if cache_dir is not None:
+			self._cache_dir = Path(cache_dir)
+			self._loaded = False
+		if offline is not None:
+			self.offline = offline
+
+	@property
+	def cache_dir(self) -> Path:
+		return self._cache_dir or xdg_cache_home() / self.CACHE_DIR_NAME
+
+	@property
+	def timestamp(self) -> datetime | None:
+		"""When the loaded prices were fetched, None if there are none."""
+		return self._timestamp
+
+	def __len__(self) -> int:
+		return len(self._models)
+
+	async def ensure_loaded(self) -> None:
+		"""Load the cached prices on first use and start a refresh if they are missing or expired.
+
+		Only waits for the network when there is no cached data at all (and not offline).
+		"""
+		if not self._loaded:
+			await asyncio.to_thread(self._load_from_disk)
+		if self.offline:
+			return
+		if self._timestamp is None:
+			await self.refresh()
+		elif datetime.now() - self._timestamp >= self.CACHE_DURATION:
+			self._start_refresh()
+
+	async def refresh(self) -> bool:
+		"""Fetch the latest prices now, joining a refresh that is already running. Returns False on failure."""
+		if self.offline:
+			return False
+		return await asyncio.shield(self._start_refresh())
+
+	def get(self, model_name: str) -> ModelPricing | None:
+		"""Pricing of a model from `custom_pricing.py` or the loaded LiteLLM data. Does not load anything."""
+		if model_name in CUSTOM_MODEL_PRICING:
+			data = CUSTOM_MODEL_PRICING[model_name]
+			return ModelPricing(model=model_name, **{key: data.get(key) for key in PRICING_FIELDS})
+
+		values = self._models.get(MODEL_TO_LITELLM.get(model_name, model_name))
+		if values is None:
+			return None
+		return ModelPricing(model=model_name, **dict(zip(PRICING_FIELDS, values)))
+
+	async def clean_old_caches(self, keep_count: int | None = None) -> None:
+		"""Delete all but the most recent cache files."""
+		await asyncio.to_thread(self._clean_old_caches, self.keep_cache_files if keep_count is None else keep_count)
+
+	def _start_refresh(self) -> asyncio.Task[bool]:
+		task = self._refresh_task
+		if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+			task = self._refresh_task = create_task_with_error_handling(
+				self._fetch(), name='refresh_pricing_table', logger_instance=logger, suppress_exceptions=True
+			)
+		return task
+
+	def _set(self, data: dict[str, dict[str, Any]], timestamp: datetime) -> None:
+		self._models = MappingProxyType({model: tuple(entry.get(key) for key in PRICING_FIELDS) for model, entry in data.items()})
+		self._timestamp = timestamp
+
+	def _load_from_disk(self) -> None:
+		"""Load the most recent readable cache file, expired or not. Runs in a worker thread."""
+		with self._load_lock:
+			if self._loaded:
+				return
+			try:
+				cache_files = sorted(self.cache_dir.glob('*.json'), key=lambda f: f.stat().st_mtime, reverse=True)
+			except Exception:
+				cache_files = []
+			for cache_file in cache_files:
+				try:
+					cached = CachedPricingData.model_validate_json(cache_file.read_bytes())
+				except Exception as e:
+					logger.debug(f'Error loading cached pricing data from {cache_file}: {e}')
+					continue
+				# Older caches hold the full LiteLLM file
+				self._set(_compact(cached.data), cached.timestamp)
+				break
+			self._loaded = True
+
+	async def _fetch(self) -> bool:
+		"""Fetch pricing data from LiteLLM GitHub, swap it in and cache it with timestamp"""
+		try:
+			async with httpx.AsyncClient() as client:
+				response = await client.get(self.PRICING_URL, timeout=30)
+				response.raise_for_status()
+			data = _compact(response.json())
+		except Exception as e:
+			logger.debug(f'Error fetching pricing data: {e}')
+			return False
+
+		timestamp = datetime.now()
+		self._set(data, timestamp)
+
+		try:
+			cache_dir = anyio.Path(self.cache_dir)
+			await cache_dir.mkdir(parents=True, exist_ok=True)
+			cache_file = cache_dir / f'pricing_{timestamp.strftime("%Y%m%d_%H%M%S")}.json'
+			tmp_file = cache_dir / f'.{cache_file.name}.{os.getpid()}.tmp'
+			await tmp_file.write_text(CachedPricingData(timestamp=timestamp, data=data).model_dump_json())
+			await tmp_file.replace(cache_file)
+			await self.clean_old_caches()
+		except Exception as e:
+			logger.debug(f'Error caching pricing data: {e}')
+		return True
+
+	def _clean_old_caches(self, keep_count: int) -> None:
+		try:
+			cache_files = sorted(self.cache_dir.glob('*.json'), key=lambda f: f.stat().st_mtime)
+			for cache_file in cache_files[: max(0, len(cache_files) - keep_count)]:
+				try:
+					os.remove(cache_file)
+				except Exception:
+					pass
+		except Exception as e:
+			logger.debug(f'Error cleaning old cache files: {e}')
+
+
+# Shared by every TokenCost in the process
+pricing_table = PricingTable()
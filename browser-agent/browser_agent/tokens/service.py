@@ -1,26 +1,20 @@
 """
 Token cost service that tracks LLM token usage and costs.
 
-Fetches pricing data from LiteLLM repository and caches it for 1 day.
+Prices come from the process-wide `pricing_table` (LiteLLM data, cached for 1 day).
 Automatically tracks token usage when LLMs are registered and invoked.
 """
 
 import logging
 import os
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any
+from datetime import datetime
 
-import anyio
-import httpx
 from dotenv import load_dotenv
 
 from browser_agent.llm.base import BaseChatModel
 from browser_agent.llm.views import ChatInvokeUsage
-from browser_agent.tokens.custom_pricing import CUSTOM_MODEL_PRICING
-from browser_agent.tokens.mappings import MODEL_TO_LITELLM
+from browser_agent.tokens.pricing import pricing_table
 from browser_agent.tokens.views import (
-	CachedPricingData,
 	ModelPricing,
 	ModelUsageStats,
 	ModelUsageTokens,
@@ -32,169 +26,34 @@ from browser_agent.utils import create_task_with_error_handling
 
 load_dotenv()
 
-from browser_agent.config import CONFIG
-
 logger = logging.getLogger(__name__)
 cost_logger = logging.getLogger('cost')
 
 
-def xdg_cache_home() -> Path:
-	default = Path.home() / '.cache'
-	if CONFIG.XDG_CACHE_HOME and (path := Path(CONFIG.XDG_CACHE_HOME)).is_absolute():
-		return path
-	return default
-
-
 class TokenCost:
 	"""Service for tracking token usage and calculating costs"""
 
-	CACHE_DIR_NAME = 'browser_agent/token_cost'
-	CACHE_DURATION = timedelta(days=1)
-	PRICING_URL = 'https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json'
-
 	def __init__(self, include_cost: bool = False):
 		self.include_cost = include_cost or os.getenv('BROWSER_AGENT_CALCULATE_COST', 'false').lower() == 'true'
 
 		self.usage_history: list[TokenUsageEntry] = []
 		self.registered_llms: dict[str, BaseChatModel] = {}
-		self._pricing_data: dict[str, Any] | None = None
 		self._initialized = False
-		self._cache_dir = xdg_cache_home() / self.CACHE_DIR_NAME
 
 	async def initialize(self) -> None:
-		"""Initialize the service by loading pricing data"""
+		"""Initialize the service by loading the shared pricing data"""
 		if not self._initialized:
 			if self.include_cost:
-				await self._load_pricing_data()
+				await pricing_table.ensure_loaded()
 			self._initialized = True
 
-	async def _load_pricing_data(self) -> None:
-		"""Load pricing data from cache or fetch from GitHub"""
-		# Try to find a valid cache file
-		cache_file = await self._find_valid_cache()
-
-		if cache_file:
-			await self._load_from_cache(cache_file)
-		else:
-			await self._fetch_and_cache_pricing_data()
-
-	async def _find_valid_cache(self) -> Path | None:
-		"""Find the most recent valid cache file"""
-		try:
-			# Ensure cache directory exists
-			self._cache_dir.mkdir(parents=True, exist_ok=True)
-
-			# List all JSON files in the cache directory
-			cache_files = list(self._cache_dir.glob('*.json'))
-
-			if not cache_files:
-				return None
-
-			# Sort by modification time (most recent first)
-			cache_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-
-			# Check each file until we find a valid one
-			for cache_file in cache_files:
-				if await self._is_cache_valid(cache_file):
-					return cache_file
-				else:
-					# Clean up old cache files
-					try:
-						os.remove(cache_file)
-					except Exception:
-						pass
-
-			return None
-		except Exception:
-			return None
-
-	async def _is_cache_valid(self, cache_file: Path) -> bool:
-		"""Check if a specific cache file is valid and not expired"""
-		try:
-			if not cache_file.exists():
-				return False
-
-			# Read the cached data
-			cached = CachedPricingData.model_validate_json(await anyio.Path(cache_file).read_text())
-
-			# Check if cache is still valid
-			return datetime.now() - cached.timestamp < self.CACHE_DURATION
-		except Exception:
-			return False
-
-	async def _load_from_cache(self, cache_file: Path) -> None:
-		"""Load pricing data from a specific cache file"""
-		try:
-			content = await anyio.Path(cache_file).read_text()
-			cached = CachedPricingData.model_validate_json(content)
-			self._pricing_data = cached.data
-		except Exception as e:
-			logger.debug(f'Error loading cached pricing data from {cache_file}: {e}')
-			# Fall back to fetching
-			await self._fetch_and_cache_pricing_data()
-
-	async def _fetch_and_cache_pricing_data(self) -> None:
-		"""Fetch pricing data from LiteLLM GitHub and cache it with timestamp"""
-		try:
-			async with httpx.AsyncClient() as client:
-				response = await client.get(self.PRICING_URL, timeout=30)
-				response.raise_for_status()
-
-				self._pricing_data = response.json()
-
-			# Create cache object with timestamp
-			cached = CachedPricingData(timestamp=datetime.now(), data=self._pricing_data or {})
-
-			# Ensure cache directory exists
-			self._cache_dir.mkdir(parents=True, exist_ok=True)
-
-			# Create cache file with timestamp in filename
-			timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-			cache_file = self._cache_dir / f'pricing_{timestamp_str}.json'
-
-			await anyio.Path(cache_file).write_text(cached.model_dump_json(indent=2))
-		except Exception as e:
-			logger.debug(f'Error fetching pricing data: {e}')
-			# Fall back to empty pricing data
-			self._pricing_data = {}
-
 	async def get_model_pricing(self, model_name: str) -> ModelPricing | None:
 		"""Get pricing information for a specific model"""
 		# Ensure we're initialized
 		if not self._initialized:
 			await self.initialize()
 
-		# Check custom pricing first
-		if model_name in CUSTOM_MODEL_PRICING:
-			data = CUSTOM_MODEL_PRICING[model_name]
-			return ModelPricing(
-				model=model_name,
-				input_cost_per_token=data.get('input_cost_per_token'),
-				output_cost_per_token=data.get('output_cost_per_token'),
-				max_tokens=data.get('max_tokens'),
-				max_input_tokens=data.get('max_input_tokens'),
-				max_output_tokens=data.get('max_output_tokens'),
-				cache_read_input_token_cost=data.get('cache_read_input_token_cost'),
-				cache_creation_input_token_cost=data.get('cache_creation_input_token_cost'),
-			)
-
-		# Map model name to LiteLLM model name if needed
-		litellm_model_name = MODEL_TO_LITELLM.get(model_name, model_name)
-
-		if not self._pricing_data or litellm_model_name not in self._pricing_data:
-			return None
-
-		data = self._pricing_data[litellm_model_name]
-		return ModelPricing(
-			model=model_name,
-			input_cost_per_token=data.get('input_cost_per_token'),
-			output_cost_per_token=data.get('output_cost_per_token'),
-			max_tokens=data.get('max_tokens'),
-			max_input_tokens=data.get('max_input_tokens'),
-			max_output_tokens=data.get('max_output_tokens'),
-			cache_read_input_token_cost=data.get('cache_read_input_token_cost'),
-			cache_creation_input_token_cost=data.get('cache_creation_input_token_cost'),
-		)
+		return pricing_table.get(model_name)
 
 	async def calculate_cost(self, model: str, usage: ChatInvokeUsage) -> TokenCostCalculated | None:
 		if not self.include_cost:
@@ -549,28 +408,11 @@ class TokenCost:
 	async def refresh_pricing_data(self) -> None:
 		"""Force refresh of pricing data from GitHub"""
 		if self.include_cost:
-			await self._fetch_and_cache_pricing_data()
+			await pricing_table.refresh()
 
 	async def clean_old_caches(self, keep_count: int = 3) -> None:
 		"""Clean up old cache files, keeping only the most recent ones"""
-		try:
-			# List all JSON files in the cache directory
-			cache_files = list(self._cache_dir.glob('*.json'))
-
-			if len(cache_files) <= keep_count:
-				return
-
-			# Sort by modification time (oldest first)
-			cache_files.sort(key=lambda f: f.stat().st_mtime)
-
-			# Remove all but the most recent files
-			for cache_file in cache_files[:-keep_count]:
-				try:
-					os.remove(cache_file)
-				except Exception:
-					pass
-		except Exception as e:
-			logger.debug(f'Error cleaning old cache files: {e}')
+		await pricing_table.clean_old_caches(keep_count)
 
 	async def ensure_pricing_loaded(self) -> None:
 		"""Ensure pricing data is loaded in the background. Call this after creating the service."""
@@ -0,0 +1,125 @@
+"""Merging of per-chunk extraction results when a long page is extracted chunk by chunk in parallel."""
+
+import json
+import re
+from collections import Counter
+from typing import Any
+
+# Item fields that identify a list item, in order of preference
+IDENTIFIER_FIELDS = ('url', 'link', 'href', 'id', 'sku', 'name', 'title')
+# Identifier fields that are not unique per item (e.g. several sizes of the same product share a name)
+LABEL_FIELDS = ('name', 'title')
+
+
+def _normalize(value: Any) -> str:
+	return ' '.join(str(value).split()).casefold()
+
+
+def _identifiers(item: Any) -> list[str]:
+	"""Normalized identifying values of a list item, most specific first; scalars identify themselves."""
+	if isinstance(item, dict):
+		fields = {key.lower(): value for key, value in item.items()}
+		return [
+			_normalize(fields[key])
+			for key in IDENTIFIER_FIELDS
+			if isinstance(fields.get(key), str | int) and str(fields[key]).strip()
+		]
+	if isinstance(item, str | int | float):
+		return [_normalize(item)]
+	return []
+
+
+def _dedup_key(item: Any) -> str:
+	"""Key under which a list item counts as a repeat: its first unique identifier, otherwise its full content."""
+	if isinstance(item, dict):
+		fields = {key.lower(): value for key, value in item.items()}
+		for key in IDENTIFIER_FIELDS:
+			if key not in LABEL_FIELDS and isinstance(fields.get(key), str | int) and str(fields[key]).strip():
+				return _normalize(fields[key])
+	return json.dumps(item, sort_keys=True, default=str)
+
+
+def _is_empty(value: Any) -> bool:
+	return value is None or value == '' or value == [] or value == {}
+
+
+def _merge_values(
+	merged: Any, value: Any, seen: dict[str, set[str]], added: dict[str, set[str]], collected: set[str], path: str
+) -> Any:
+	if isinstance(value, list) and (merged is None or isinstance(merged, list)):
+		merged = [] if merged is None else merged
+		# Only items repeated from earlier chunks are dropped; repeats within one chunk are real (e.g. [1, 2, 2])
+		earlier = seen.get(path, set())
+		keys = added.setdefault(path, set())
+		for item in value:
+			if collected.intersection(_identifiers(item)):
+				continue
+			key = _dedup_key(item)
+			if key in earlier:
+				continue
+			keys.add(key)
+			merged.append(item)
+		return merged
+	if isinstance(value, dict) and (merged is None or isinstance(merged, dict)):
+		merged = {} if merged is None else merged
+		for key, item in value.items():
+			merged[key] = _merge_values(merged.get(key), item, seen, added, collected, f'{path}.{key}')
+		return merged
+	# Scalars: the first chunk that found a value wins
+	return value if _is_empty(merged) else merged
+
+
+def merge_structured_results(results: list[dict[str, Any]], already_collected: list[str] | None = None) -> dict[str, Any]:
+	"""Merge structured extraction results of consecutive chunks into one.
+
+	Lists are concatenated in chunk order, dropping items already returned by an earlier chunk: items with a
+	unique identifier (see `IDENTIFIER_FIELDS`) are compared by it, all others (including items identified only
+	by a name or title) by their full content. Items listed in `already_collected` are dropped as well. Nested
+	objects are merged key by key and scalars keep the first non-empty value.
+	"""
+	collected = {_normalize(item) for item in already_collected or [] if str(item).strip()}
+	seen: dict[str, set[str]] = {}
+	merged: dict[str, Any] = {}
+	for result in results:
+		added: dict[str, set[str]] = {}
+		merged = _merge_values(merged, result, seen, added, collected, '')
+		for path, keys in added.items():
+			seen.setdefault(path, set()).update(keys)
+	return merged
+
+
+def merge_text_results(results: list[str], overlaps: list[str]) -> str:
+	"""Concatenate free-text extraction results of consecutive chunks, dropping what was extracted twice.
+
+	Each chunk is extracted with `overlaps[i]` (its `overlap_prefix`: the tail of the previous chunk and repeated
+	table headers) prepended, so content from that window can show up in two results. Only such repeats are
+	dropped: whole paragraphs identical to one of an earlier result, and lines that appear both in the chunk's
+	overlap window and in an earlier result, at most once per overlap line. Lines that merely repeat on the
+	page (e.g. "Price: $19.99" or "Add to cart" on several items) are kept.
+	"""
+	seen_lines: set[str] = set()
+	seen_blocks: set[str] = set()
+	parts: list[str] = []
+	for result, overlap in zip(results, overlaps, strict=True):
+		window = Counter(key for line in overlap.splitlines() if (key := _normalize(line)) in seen_lines)
+		blocks = []
+		for block in re.split(r'\n\s*\n', result.strip()):
+			keys = [_normalize(line) for line in block.splitlines()]
+			block_key = '\n'.join(key for key in keys if key)
+			if block_key and block_key in seen_blocks:
+				window.subtract(keys)
+				continue
+			lines = []
+			for line, key in zip(block.splitlines(), keys):
+				if window[key] > 0:
+					window[key] -= 1
+					continue
+				lines.append(line)
+			blocks.append((block_key, '\n'.join(lines).strip()))
+		for block_key, _ in blocks:
+			seen_blocks.add(block_key)
+			seen_lines.update(block_key.splitlines())
+		text = '\n\n'.join(text for _, text in blocks if text)
+		if text:
+			parts.append(text)
+	return '\n\n'.join(parts)
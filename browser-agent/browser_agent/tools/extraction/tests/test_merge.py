@@ -0,0 +1,74 @@
+"""Tests for merging the extraction results of overlapping chunks."""
+
+from browser_agent.tools.extraction.merge import merge_structured_results, merge_text_results
+
+
+def test_structured_items_repeated_from_an_earlier_chunk_are_dropped():
+	results = [
+		{'products': [{'url': '/a', 'name': 'Shirt', 'price': 10}, {'url': '/b', 'name': 'Shirt', 'price': 12}]},
+		{'products': [{'url': '/b', 'name': 'Shirt', 'price': 12}, {'url': '/c', 'name': 'Hat', 'price': 5}]},
+	]
+
+	merged = merge_structured_results(results)
+
+	assert [item['url'] for item in merged['products']] == ['/a', '/b', '/c']
+
+
+def test_structured_items_sharing_only_a_name_are_kept():
+	results = [
+		{'products': [{'name': 'Shirt', 'size': 'S'}]},
+		{'products': [{'name': 'Shirt', 'size': 'M'}, {'name': 'Shirt', 'size': 'S'}]},
+	]
+
+	merged = merge_structured_results(results)
+
+	assert merged['products'] == [{'name': 'Shirt', 'size': 'S'}, {'name': 'Shirt', 'size': 'M'}]
+
+
+def test_structured_repeats_within_one_chunk_are_kept():
+	merged = merge_structured_results([{'ratings': [5, 4, 4]}, {'ratings': [4, 3]}])
+
+	assert merged['ratings'] == [5, 4, 4, 3]
+
+
+def test_structured_already_collected_items_and_scalars():
+	results = [
+		{'title': '', 'items': [{'name': 'Old'}, {'name': 'New'}]},
+		{'title': 'Catalog', 'total': 3, 'items': []},
+		{'title': 'Other', 'total': 4},
+	]
+
+	merged = merge_structured_results(results, already_collected=['old'])
+
+	assert merged == {'title': 'Catalog', 'items': [{'name': 'New'}], 'total': 3}
+
+
+def test_text_keeps_lines_repeated_across_items():
+	results = [
+		'Shirt\nPrice: $19.99\nAvailability: In stock\nAdd to cart',
+		'Hat\nPrice: $19.99\nAvailability: In stock\nAdd to cart',
+	]
+
+	merged = merge_text_results(results, ['', 'Shirt details\nFree shipping'])
+
+	assert merged == '\n\n'.join(results)
+
+
+def test_text_drops_lines_from_the_overlap_window_once():
+	results = [
+		'| Name | Price |\n|---|---|\n| Shirt | $19.99 |',
+		'| Name | Price |\n|---|---|\n| Shirt | $19.99 |\n| Hat | $19.99 |\n| Cap | $19.99 |',
+	]
+	overlaps = ['', '| Name | Price |\n|---|---|\n| Shirt | $19.99 |']
+
+	merged = merge_text_results(results, overlaps)
+
+	assert merged == '| Name | Price |\n|---|---|\n| Shirt | $19.99 |\n\n| Hat | $19.99 |\n| Cap | $19.99 |'
+
+
+def test_text_drops_paragraphs_extracted_by_an_earlier_chunk():
+	results = ['Shirt\nPrice: $19.99\n\nHat\nPrice: $5', 'Hat\nPrice: $5\n\nCap\nPrice: $5']
+
+	merged = merge_text_results(results, ['', 'Hat'])
+
+	assert merged == 'Shirt\nPrice: $19.99\n\nHat\nPrice: $5\n\nCap\nPrice: $5'
@@ -37,6 +37,8 @@ class Registry(Generic[Context]):
 		self.telemetry = ProductTelemetry()
 		# Create a new list to avoid mutable default argument issues
 		self.exclude_actions = list(exclude_actions) if exclude_actions is not None else []
+		# Action names (in registry order) -> (signature of the actions the model was built from, model)
+		self._action_model_cache: dict[tuple[str, ...], tuple[tuple, type[ActionModel]]] = {}
 
 	def exclude_action(self, action_name: str) -> None:
 		"""Exclude an action from the registry after initialization.
@@ -510,9 +512,9 @@ class Registry(Generic[Context]):
 
 		Each action model contains only the specific action being used,
 		rather than all actions with most set to None.
-		"""
-		from typing import Union
 
+		Models are cached by the set of available actions, so the same page actions yield the same class.
+		"""
 		# Filter actions based on page_url if provided:
 		#   if page_url is None, only include actions with no filters
 		#   if page_url is provided, only include actions that match the URL
@@ -535,6 +537,20 @@ class Registry(Generic[Context]):
 			if domain_is_allowed:
 				available_actions[name] = action
 
+		# Consecutive steps on the same site match the same actions; reuse the model built for them
+		cache_key = tuple(available_actions)
+		signature = tuple((id(action), action.param_model, action.description) for action in available_actions.values())
+		cached = self._action_model_cache.get(cache_key)
+		if cached is not None and cached[0] == signature:
+			return cached[1]
+		result_model = self._build_action_model(available_actions)
+		self._action_model_cache[cache_key] = (signature, result_model)
+		return result_model
+
+	def _build_action_model(self, available_actions: dict[str, RegisteredAction]) -> type[ActionModel]:
+		"""Build the Union action model for exactly `available_actions`."""
+		from typing import Union
+
 		# Create individual action models for each action
 		individual_action_models: list[type[BaseModel]] = []
 
@@ -2,7 +2,9 @@ import asyncio
 import json
 import logging
 import os
-from typing import Generic, TypeVar
+import secrets
+import time
+from typing import Any, Generic, TypeVar
 
 import anyio
 
@@ -29,21 +31,27 @@ from browser_agent.browser.events import (
 	UploadFileEvent,
 )
 from browser_agent.browser.views import BrowserError
+from browser_agent.browser.watchdogs.traffic_analysis_watchdog import cookie_key
 from browser_agent.dom.service import EnhancedDOMTreeNode
+from browser_agent.dom.views import MarkdownChunk
 from browser_agent.filesystem.file_system import FileSystem
 from browser_agent.llm.base import BaseChatModel
 from browser_agent.llm.messages import SystemMessage, UserMessage
 from browser_agent.observability import observe_debug
+from browser_agent.screenshots.utils import fit_within
 from browser_agent.tools.registry.service import Registry
-from browser_agent.tools.utils import get_click_description
+from browser_agent.tools.utils import get_click_description, summarize_endpoint_probes
 from browser_agent.tools.views import (
+	SENSITIVE_PATH_WORDLISTS,
 	CheckSensitiveEndpointAction,
+	CheckSensitiveEndpointsAction,
 	ClickElementAction,
 	ClickElementActionIndexOnly,
 	CloseTabAction,
 	DoneAction,
 	ExtractAction,
 	FindElementsAction,
+	GetCookieSecurityAction,
 	GetDropdownOptionsAction,
 	GetResponseHeadersAction,
 	InputTextAction,
@@ -64,6 +72,13 @@ from browser_agent.utils import create_task_with_error_handling, sanitize_surrog
 
 logger = logging.getLogger(__name__)
 
+# check_sensitive_endpoints: per-request timeout and how much of each body is read to fingerprint it
+ENDPOINT_PROBE_TIMEOUT_MS = 10_000
+ENDPOINT_PROBE_MAX_BODY_BYTES = 64 * 1024
+# extract(all_chunks=True): concurrent LLM calls, and markdown chars sent in total (~4 chars per token)
+EXTRACT_ALL_CHUNKS_CONCURRENCY = 4
+EXTRACT_ALL_CHUNKS_MAX_CHARS = 400_000
+
 # Import EnhancedDOMTreeNode and rebuild event models that have forward references to it
 # This must be done after all imports are complete
 ClickElementEvent.model_rebuild()
@@ -525,7 +540,8 @@ class Tools(Generic[Context]):
 			"""Convert coordinates from LLM screenshot size to original viewport size."""
 			if browser_session.llm_screenshot_size and browser_session._original_viewport_size:
 				original_width, original_height = browser_session._original_viewport_size
-				llm_width, llm_height = browser_session.llm_screenshot_size
+				# Screenshots are scaled to fit llm_screenshot_size with their aspect ratio kept
+				llm_width, llm_height = fit_within((original_width, original_height), browser_session.llm_screenshot_size)
 
 				# Convert coordinates using fractions
 				actual_x = int((llm_x / llm_width) * original_width)
@@ -952,7 +968,7 @@ class Tools(Generic[Context]):
 				)
 
 		@self.registry.action(
-			"""LLM extracts structured data from page markdown. Use when: on right page, know what to extract, haven't called before on same page+query. Can't get interactive elements. Set extract_links=True for URLs. Set extract_images=True for image src URLs. Use start_from_char if previous extraction was truncated to extract data further down the page. When paginating across pages, pass already_collected with item identifiers (names/URLs) from prior pages to avoid duplicates.""",
+			"""LLM extracts structured data from page markdown. Use when: on right page, know what to extract, haven't called before on same page+query. Can't get interactive elements. Set extract_links=True for URLs. Set extract_images=True for image src URLs. Use start_from_char if previous extraction was truncated to extract data further down the page, or all_chunks=True to extract a long page in one call. When paginating across pages, pass already_collected with item identifiers (names/URLs) from prior pages to avoid duplicates.""",
 			param_model=ExtractAction,
 		)
 		async def extract(
@@ -972,6 +988,7 @@ class Tools(Generic[Context]):
 			already_collected: list[str] = (
 				params.get('already_collected', []) if isinstance(params, dict) else params.already_collected
 			)
+			all_chunks: bool = params.get('all_chunks', False) if isinstance(params, dict) else params.all_chunks
 
 			# Auto-enable extract_images if query contains image-related keywords
 			_IMAGE_KEYWORDS = ['image', 'photo', 'picture', 'thumbnail', 'img url', 'image url', 'photo url', 'product image']
@@ -993,12 +1010,17 @@ class Tools(Generic[Context]):
 					logger.warning(f'Invalid output_schema, falling back to free-text extraction: {exc}')
 					output_schema = None
 
-			# Extract clean markdown using the unified method
+			# Extract clean markdown and split it with structure-aware chunking (instead of naive char-based
+			# truncation); both are cached until the page's DOM changes, so paging with start_from_char is cheap
 			try:
-				from browser_agent.dom.markdown_extractor import extract_clean_markdown
-
-				content, content_stats = await extract_clean_markdown(
-					browser_session=browser_session, extract_links=extract_links, extract_images=extract_images
+				from browser_agent.dom.markdown_extractor import extract_markdown_chunks
+
+				chunks, content_stats = await extract_markdown_chunks(
+					browser_session,
+					extract_links=extract_links,
+					extract_images=extract_images,
+					max_chunk_chars=MAX_CHAR_LIMIT,
+					start_from_char=start_from_char,
 				)
 			except Exception as e:
 				raise RuntimeError(f'Could not extract clean markdown: {type(e).__name__}')
@@ -1006,21 +1028,26 @@ class Tools(Generic[Context]):
 			# Original content length for processing
 			final_filtered_length = content_stats['final_filtered_chars']
 
-			# Structure-aware chunking replaces naive char-based truncation
-			from browser_agent.dom.markdown_extractor import chunk_markdown_by_structure
-
-			chunks = chunk_markdown_by_structure(content, max_chunk_chars=MAX_CHAR_LIMIT, start_from_char=start_from_char)
 			if not chunks:
 				return ActionResult(
 					error=f'start_from_char ({start_from_char}) exceeds content length {final_filtered_length} characters.'
 				)
-			chunk = chunks[0]
-			content = chunk.content
+			if all_chunks:
+				# Map step: every chunk that fits the character budget, extracted concurrently
+				selected = chunks[:1]
+				budget = EXTRACT_ALL_CHUNKS_MAX_CHARS - len(chunks[0].content)
+				for next_chunk in chunks[1:]:
+					if len(next_chunk.content) > budget:
+						break
+					selected.append(next_chunk)
+					budget -= len(next_chunk.content)
+			else:
+				selected = chunks[:1]
+			chunk = selected[-1]
 			truncated = chunk.has_more
 
 			# Prepend overlap context for continuation chunks (e.g. table headers)
-			if chunk.overlap_prefix:
-				content = chunk.overlap_prefix + '\n' + content
+			contents = [c.overlap_prefix + '\n' + c.content if c.overlap_prefix else c.content for c in selected]
 
 			if start_from_char > 0:
 				content_stats['started_from_char'] = start_from_char
@@ -1029,6 +1056,9 @@ class Tools(Generic[Context]):
 				content_stats['next_start_char'] = chunk.char_offset_end
 				content_stats['chunk_index'] = chunk.chunk_index
 				content_stats['total_chunks'] = chunk.total_chunks
+			if len(selected) > 1:
+				content_stats['chunks_extracted'] = len(selected)
+				content_stats['total_chunks'] = chunk.total_chunks
 
 			# Add content statistics to the result
 			original_html_length = content_stats['original_html_chars']
@@ -1039,15 +1069,62 @@ class Tools(Generic[Context]):
 			if start_from_char > 0:
 				stats_summary += f' (started from char {start_from_char:,})'
 			if truncated:
-				chunk_info = f'chunk {chunk.chunk_index + 1} of {chunk.total_chunks}, '
-				stats_summary += f' → {len(content):,} final chars ({chunk_info}use start_from_char={content_stats["next_start_char"]} to continue)'
+				if len(selected) > 1:
+					chunk_info = f'chunks {selected[0].chunk_index + 1}-{chunk.chunk_index + 1} of {chunk.total_chunks}, '
+				else:
+					chunk_info = f'chunk {chunk.chunk_index + 1} of {chunk.total_chunks}, '
+				final_chars = sum(len(c) for c in contents)
+				stats_summary += f' → {final_chars:,} final chars ({chunk_info}use start_from_char={content_stats["next_start_char"]} to continue)'
 			elif chars_filtered > 0:
 				stats_summary += f' (filtered {chars_filtered:,} chars of noise)'
 
 			# Sanitize surrogates from content to prevent UTF-8 encoding errors
-			content = sanitize_surrogates(content)
+			contents = [sanitize_surrogates(c) for c in contents]
 			query = sanitize_surrogates(query)
 
+			def chunk_stats_summary(i: int) -> str:
+				if len(selected) == 1:
+					return stats_summary
+				c = selected[i]
+				return (
+					f'{stats_summary}\nThis is chunk {c.chunk_index + 1} of {c.total_chunks} '
+					f'(chars {c.char_offset_start:,}-{c.char_offset_end:,}). The other chunks are extracted separately '
+					'and merged, so extract only what is in this chunk.'
+				)
+
+			already_collected_section = ''
+			if already_collected:
+				items_str = '\n'.join(f'- {item}' for item in already_collected[:100])
+				already_collected_section = f'\n\n<already_collected>\nSkip items whose name/title/URL matches any of these already-collected identifiers:\n{items_str}\n</already_collected>'
+
+			semaphore = asyncio.Semaphore(EXTRACT_ALL_CHUNKS_CONCURRENCY)
+
+			async def invoke(system_prompt: str, prompt: str, output_format: type[BaseModel] | None = None):
+				async with semaphore:
+					return await asyncio.wait_for(
+						page_extraction_llm.ainvoke(
+							[SystemMessage(content=system_prompt), UserMessage(content=prompt)], output_format=output_format
+						),
+						timeout=120.0,
+					)
+
+			async def invoke_all(
+				system_prompt: str, prompts: list[str], output_format: type[BaseModel] | None = None
+			) -> list[tuple[MarkdownChunk, Any]]:
+				"""Extract every selected chunk, returning (chunk, response) pairs of the chunks that succeeded."""
+				if len(prompts) == 1:
+					return [(selected[0], await invoke(system_prompt, prompts[0], output_format))]
+				results = await asyncio.gather(
+					*(invoke(system_prompt, p, output_format) for p in prompts), return_exceptions=True
+				)
+				failed = [selected[i].chunk_index for i, r in enumerate(results) if isinstance(r, BaseException)]
+				if len(failed) == len(results) and isinstance(results[0], BaseException):
+					raise results[0]
+				if failed:
+					logger.warning(f'Extraction failed for {len(failed)} of {len(results)} chunks, merging the rest')
+					content_stats['failed_chunks'] = failed
+				return [(c, r) for c, r in zip(selected, results) if not isinstance(r, BaseException)]
+
 			# --- Structured extraction path ---
 			if structured_model is not None:
 				assert output_schema is not None
@@ -1068,28 +1145,30 @@ You will be given a query, a JSON Schema, and the markdown of a webpage that has
 """.strip()
 
 				schema_json = json.dumps(output_schema, indent=2)
-				already_collected_section = ''
-				if already_collected:
-					items_str = '\n'.join(f'- {item}' for item in already_collected[:100])
-					already_collected_section = f'\n\n<already_collected>\nSkip items whose name/title/URL matches any of these already-collected identifiers:\n{items_str}\n</already_collected>'
-				prompt = (
+				prompts = [
 					f'<query>\n{query}\n</query>\n\n'
 					f'<output_schema>\n{schema_json}\n</output_schema>\n\n'
-					f'<content_stats>\n{stats_summary}\n</content_stats>\n\n'
+					f'<content_stats>\n{chunk_stats_summary(i)}\n</content_stats>\n\n'
 					f'<webpage_content>\n{content}\n</webpage_content>' + already_collected_section
-				)
+					for i, content in enumerate(contents)
+				]
 
 				try:
-					response = await asyncio.wait_for(
-						page_extraction_llm.ainvoke(
-							[SystemMessage(content=system_prompt), UserMessage(content=prompt)],
-							output_format=structured_model,
-						),
-						timeout=120.0,
-					)
+					responses = await invoke_all(system_prompt, prompts, output_format=structured_model)
 
 					# response.completion is a pydantic model instance
-					result_data: dict = response.completion.model_dump(mode='json')  # type: ignore[union-attr]
+					results: list[dict] = [response.completion.model_dump(mode='json') for _, response in responses]  # type: ignore[union-attr]
+					if len(results) == 1:
+						result_data: dict = results[0]
+					else:
+						# Reduce step: merge the chunk results, dropping duplicates and already collected items
+						from browser_agent.tools.extraction.merge import merge_structured_results
+
+						result_data = merge_structured_results(results, already_collected)
+						try:
+							result_data = structured_model.model_validate(result_data).model_dump(mode='json')
+						except ValueError as e:
+							logger.debug(f'Merged extraction result does not validate against the schema: {e}')
 					result_json = json.dumps(result_data)
 
 					current_url = await browser_session.get_current_page_url()
@@ -1100,7 +1179,7 @@ You will be given a query, a JSON Schema, and the markdown of a webpage that has
 					extraction_meta = ExtractionResult(
 						data=result_data,
 						schema_used=output_schema,
-						is_partial=truncated,
+						is_partial=truncated or 'failed_chunks' in content_stats,
 						source_url=current_url,
 						content_stats=content_stats,
 					)
@@ -1149,25 +1228,28 @@ You will be given a query and the markdown of a webpage that has been filtered t
 </output>
 """.strip()
 
-			already_collected_section = ''
-			if already_collected:
-				items_str = '\n'.join(f'- {item}' for item in already_collected[:100])
-				already_collected_section = f'\n\n<already_collected>\nSkip items whose name/title/URL matches any of these already-collected identifiers:\n{items_str}\n</already_collected>'
-			prompt = (
-				f'<query>\n{query}\n</query>\n\n<content_stats>\n{stats_summary}\n</content_stats>\n\n<webpage_content>\n{content}\n</webpage_content>'
+			prompts = [
+				f'<query>\n{query}\n</query>\n\n<content_stats>\n{chunk_stats_summary(i)}\n</content_stats>\n\n<webpage_content>\n{content}\n</webpage_content>'
 				+ already_collected_section
-			)
+				for i, content in enumerate(contents)
+			]
 
 			try:
-				response = await asyncio.wait_for(
-					page_extraction_llm.ainvoke([SystemMessage(content=system_prompt), UserMessage(content=prompt)]),
-					timeout=120.0,
-				)
+				responses = await invoke_all(system_prompt, prompts)
+				if len(responses) == 1:
+					completion = responses[0][1].completion
+				else:
+					# Reduce step: chunks overlap, so drop what was already extracted from an earlier chunk's overlap
+					from browser_agent.tools.extraction.merge import merge_text_results
+
+					completion = merge_text_results(
+						[response.completion for _, response in responses], [c.overlap_prefix for c, _ in responses]
+					)
+					if truncated:
+						completion += f'\n\n(Extracted chunks {selected[0].chunk_index + 1}-{chunk.chunk_index + 1} of {chunk.total_chunks}; use start_from_char={chunk.char_offset_end} for the rest of the page.)'
 
 				current_url = await browser_session.get_current_page_url()
-				extracted_content = (
-					f'<url>\n{current_url}\n</url>\n<query>\n{query}\n</query>\n<result>\n{response.completion}\n</result>'
-				)
+				extracted_content = f'<url>\n{current_url}\n</url>\n<query>\n{query}\n</query>\n<result>\n{completion}\n</result>'
 
 				# Simple memory handling
 				MAX_MEMORY_LENGTH = 10000
@@ -1808,6 +1890,21 @@ Validated Code (after quote fixing):
 			param_model=GetResponseHeadersAction,
 		)
 		async def get_response_headers(params: GetResponseHeadersAction, browser_session: BrowserSession):
+			# Answer from headers the browser already received for this page, without another request
+			traffic_watchdog = browser_session._traffic_analysis_watchdog
+			if traffic_watchdog is not None:
+				# A page target's main frame id is its target id
+				observed = traffic_watchdog.document_headers(
+					await browser_session.get_current_page_url(), frame_id=browser_session.agent_focus_target_id
+				)
+				if observed is not None:
+					document_url, headers = observed
+					value = json.dumps(headers, ensure_ascii=False)
+					return ActionResult(
+						extracted_content=f'HTTP response headers (JSON, observed on {document_url}): {value}',
+						long_term_memory=f'HTTP response headers: {value}',
+					)
+
 			script = """(async () => {
 	try {
 		const r = await fetch(window.location.href, {method: 'HEAD'});
@@ -1835,6 +1932,49 @@ Validated Code (after quote fixing):
 			except Exception as e:
 				return ActionResult(error=f'Failed to get response headers: {type(e).__name__}: {e}')
 
+		@self.registry.action(
+			'List the cookies set via Set-Cookie by responses from the current origin, with their Secure, HttpOnly, SameSite '
+			'and persistence flags, plus any other cookies in the browser for the current URL. '
+			'Use this to check for cookies missing HttpOnly or Secure. Answered from recorded traffic, no request is made.',
+			param_model=GetCookieSecurityAction,
+		)
+		async def get_cookie_security(params: GetCookieSecurityAction, browser_session: BrowserSession):
+			url = await browser_session.get_current_page_url()
+			traffic_watchdog = browser_session._traffic_analysis_watchdog
+			cookies = {cookie.key: cookie.to_dict() for cookie in (traffic_watchdog.cookies(url) if traffic_watchdog else [])}
+
+			# Cookies set by page scripts or earlier sessions never appear in Set-Cookie; the cookie jar has their flags
+			try:
+				cdp_session = await browser_session.get_or_create_cdp_session()
+				jar = await cdp_session.cdp_client.send.Network.getCookies(
+					params={'urls': [url]}, session_id=cdp_session.session_id
+				)
+				for cookie in jar.get('cookies', []):
+					cookies.setdefault(
+						cookie_key(cookie['name'], cookie.get('domain', ''), cookie.get('path', '')),
+						{
+							'name': cookie['name'],
+							'set_by': 'cookie jar',
+							'secure': cookie.get('secure', False),
+							'http_only': cookie.get('httpOnly', False),
+							'same_site': cookie.get('sameSite'),
+							'domain': cookie.get('domain'),
+							'path': cookie.get('path'),
+							'persistent': not cookie.get('session', True),
+						},
+					)
+			except Exception as e:
+				logger.debug(f'Failed to read cookie jar for {url}: {e}')
+
+			if not cookies:
+				return ActionResult(extracted_content=f'No cookies observed for {url}', long_term_memory=f'No cookies for {url}')
+			value = json.dumps(list(cookies.values()), ensure_ascii=False)
+			flagged = [cookie['name'] for cookie in cookies.values() if not cookie['http_only'] or not cookie['secure']]
+			return ActionResult(
+				extracted_content=f'Cookies for {url} (JSON): {value}',
+				long_term_memory=f'{len(cookies)} cookies for {url}, missing HttpOnly or Secure: {", ".join(flagged) or "none"}',
+			)
+
 		@self.registry.action(
 			'Probe a path relative to the current origin and return its HTTP status code, without navigating away from the current page. '
 			'Use this to check for exposed sensitive files such as /.git/HEAD, /.env, /phpinfo.php, /backup.sql, /wp-config.php, etc. '
@@ -1869,6 +2009,89 @@ Validated Code (after quote fixing):
 			except Exception as e:
 				return ActionResult(error=f'Failed to check sensitive endpoint: {type(e).__name__}: {e}')
 
+		@self.registry.action(
+			'Probe many paths relative to the current origin in one call, concurrently and without navigating away. '
+			'Pass explicit "paths" and/or a built-in "wordlist" ("sensitive-files" or "extended"). '
+			"Responses identical to the server's answer for random missing paths (soft-404s and catch-all routes) are "
+			'filtered out; paths returning the same content as each other are still reported. '
+			'Returns a table of accessible paths and a summary of the rest. '
+			'Prefer this over calling check_sensitive_endpoint once per path.',
+			param_model=CheckSensitiveEndpointsAction,
+		)
+		async def check_sensitive_endpoints(params: CheckSensitiveEndpointsAction, browser_session: BrowserSession):
+			paths = list(dict.fromkeys([*params.paths, *SENSITIVE_PATH_WORDLISTS.get(params.wordlist or '', ())]))
+			if not paths:
+				return ActionResult(error='Provide "paths" or a "wordlist" to probe')
+
+			# Random paths show what this server answers for missing files, per routing style
+			token = secrets.token_hex(8)
+			baseline_paths = [f'/{token}', f'/.{token}', f'/{token}.php']
+
+			script = f"""(async () => {{
+	const paths = {json.dumps(baseline_paths + paths)};
+	const method = {json.dumps(params.method)};
+	const maxBytes = {ENDPOINT_PROBE_MAX_BODY_BYTES};
+	const fnv = (h, bytes) => {{ for (let i = 0; i < bytes.length; i++) {{ h ^= bytes[i]; h = Math.imul(h, 16777619); }} return h; }};
+	const probe = async (path) => {{
+		const controller = new AbortController();
+		const timer = setTimeout(() => controller.abort(), {ENDPOINT_PROBE_TIMEOUT_MS});
+		try {{
+			const url = new URL(path, window.location.origin);
+			const r = await fetch(url.toString(), {{method, redirect: 'manual', cache: 'no-store', signal: controller.signal}});
+			const contentLength = r.headers.get('content-length');
+			const out = {{path, status: r.status, type: r.type, contentType: (r.headers.get('content-type') || '').split(';')[0],
+				length: contentLength === null ? -1 : Number(contentLength)}};
+			if (method === 'GET' && r.body) {{
+				// Hash at most maxBytes so an exposed multi-GB dump isn't downloaded
+				const reader = r.body.getReader();
+				let received = 0, hash = 2166136261;
+				while (true) {{
+					const {{done, value}} = await reader.read();
+					if (done) break;
+					const chunk = value.subarray(0, maxBytes - received);
+					hash = fnv(hash, chunk);
+					received += chunk.length;
+					if (received >= maxBytes) {{ await reader.cancel(); break; }}
+				}}
+				out.hash = (hash >>> 0).toString(16);
+				// Without a Content-Length header, a body cut off at maxBytes only gives a lower bound
+				if (out.length < 0) {{ out.length = received; out.partial = received >= maxBytes; }}
+			}}
+			return out;
+		}} catch (e) {{
+			return {{path, status: 0, error: e.name === 'AbortError' ? 'timeout' : e.message}};
+		}} finally {{
+			clearTimeout(timer);
+		}}
+	}};
+	const results = new Array(paths.length);
+	let next = 0;
+	const worker = async () => {{ while (next < paths.length) {{ const i = next++; results[i] = await probe(paths[i]); }} }};
+	await Promise.all(Array.from({{length: Math.min({params.max_concurrency}, paths.length)}}, worker));
+	return JSON.stringify(results);
+}})()"""
+			try:
+				cdp_session = await browser_session.get_or_create_cdp_session()
+				result = await cdp_session.cdp_client.send.Runtime.evaluate(
+					params={'expression': script, 'returnByValue': True, 'awaitPromise': True},
+					session_id=cdp_session.session_id,
+				)
+				if result.get('exceptionDetails'):
+					error_text = result['exceptionDetails'].get('text', 'Unknown error')
+					return ActionResult(error=f'Failed to probe endpoints: {error_text}')
+				probes = json.loads(result.get('result', {}).get('value', '[]'))
+			except Exception as e:
+				return ActionResult(error=f'Failed to check sensitive endpoints: {type(e).__name__}: {e}')
+
+			baselines, probes = probes[: len(baseline_paths)], probes[len(baseline_paths) :]
+			table, accessible = summarize_endpoint_probes(probes, baselines)
+			msg = f'Probed {len(probes)} paths with {params.method}:\n{table}'
+			logger.info(f'🔎 Probed {len(probes)} endpoints, {len(accessible)} accessible')
+			return ActionResult(
+				extracted_content=msg,
+				long_term_memory=f'Probed {len(probes)} sensitive endpoints, accessible: {", ".join(accessible) or "none"}',
+			)
+
 	def _validate_and_fix_javascript(self, code: str) -> str:
 		"""Validate and fix common JavaScript issues before execution"""
 
@@ -2133,6 +2356,7 @@ Validated Code (after quote fixing):
 
 					span_context = nullcontext()
 
+				browser_session._last_action_started = time.time()
 				with span_context:
 					try:
 						result = await self.registry.execute_action(
@@ -0,0 +1,28 @@
+"""Tests for the endpoint probe summary of the sensitive endpoint check."""
+
+from browser_agent.tools.utils import summarize_endpoint_probes
+
+
+def _probe(path: str, status: int = 200, length: int = 512, hash: str = 'abc') -> dict:
+	return {'path': path, 'status': status, 'length': length, 'hash': hash, 'contentType': 'text/plain'}
+
+
+def test_identical_responses_are_not_treated_as_catch_all():
+	"""Several probed paths returning the same body are real exposures unless random paths return it too."""
+	probes = [_probe('/.env'), _probe('/.env.local'), _probe('/.env.production'), _probe('/admin', status=404)]
+	baselines = [_probe('/__missing_1', status=404, length=12, hash='404')]
+
+	table, accessible = summarize_endpoint_probes(probes, baselines)
+
+	assert accessible == ['/.env', '/.env.local', '/.env.production']
+	assert 'catch-all' not in table
+
+
+def test_responses_matching_the_baseline_are_soft_404s():
+	probes = [_probe('/.env', hash='spa'), _probe('/.git/config', hash='git')]
+	baselines = [_probe('/__missing_1', hash='spa'), _probe('/__missing_2', hash='spa')]
+
+	table, accessible = summarize_endpoint_probes(probes, baselines)
+
+	assert accessible == ['/.git/config']
+	assert '- soft-404: /.env' in table
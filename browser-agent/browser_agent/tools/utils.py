@@ -80,3 +80,44 @@ def get_click_description(node: EnhancedDOMTreeNode) -> str:
 			parts.append(f'{attr}={node.attributes[attr][:20]}')
 
 	return ' '.join(parts)
+
+
+def summarize_endpoint_probes(probes: list[dict], baselines: list[dict]) -> tuple[str, list[str]]:
+	"""Render batch endpoint probe results as a compact table. Returns (table, accessible paths).
+
+	A 2xx/3xx response is only reported as accessible if it differs from what the server returns for
+	random missing paths (`baselines`), i.e. a soft-404 or an SPA catch-all route. Probed paths that
+	return the same response as each other are still reported: several real files can be identical.
+	"""
+
+	def fingerprint(probe: dict) -> tuple:
+		return (probe.get('status'), probe.get('length'), probe.get('hash') or probe.get('contentType'))
+
+	baseline_fingerprints = {fingerprint(b) for b in baselines if not b.get('error') and b.get('status')}
+
+	accessible: list[dict] = []
+	rejected: dict[str, list[str]] = {}
+	for probe in probes:
+		path, status = probe['path'], probe.get('status', 0)
+		if probe.get('error'):
+			rejected.setdefault('error', []).append(f'{path} ({probe["error"]})')
+		elif probe.get('type') == 'opaqueredirect':
+			rejected.setdefault('redirect', []).append(path)
+		elif status >= 400 or status == 0:
+			rejected.setdefault(str(status), []).append(path)
+		elif fingerprint(probe) in baseline_fingerprints:
+			rejected.setdefault('soft-404', []).append(path)
+		else:
+			accessible.append(probe)
+
+	lines = [f'ACCESSIBLE ({len(accessible)}):']
+	if accessible:
+		lines.append('| path | status | size | content-type |')
+		for probe in accessible:
+			size = probe.get('length', -1)
+			size_text = '?' if size is None or size < 0 else f'{size}{"+" if probe.get("partial") else ""}'
+			lines.append(f'| {probe["path"]} | {probe["status"]} | {size_text} | {probe.get("contentType") or "-"} |')
+	lines.append(f'NOT ACCESSIBLE ({len(probes) - len(accessible)}):')
+	for reason, paths in rejected.items():
+		lines.append(f'- {reason}: {", ".join(paths)}')
+	return '\n'.join(lines), [probe['path'] for probe in accessible]
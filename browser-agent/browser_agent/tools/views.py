@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar
+from typing import Generic, Literal, TypeVar
 
 from pydantic import BaseModel, ConfigDict, Field
 from pydantic.json_schema import SkipJsonSchema
@@ -17,6 +17,10 @@ class ExtractAction(BaseModel):
 	start_from_char: int = Field(
 		default=0, description='Use this for long markdowns to start from a specific character (not index in browser_state)'
 	)
+	all_chunks: bool = Field(
+		default=False,
+		description='Set True for long pages to extract all chunks in parallel and merge the results in one call instead of paging with start_from_char',
+	)
 	output_schema: SkipJsonSchema[dict | None] = Field(
 		default=None,
 		description='Optional JSON Schema dict. When provided, extraction returns validated JSON matching this schema instead of free-text.',
@@ -185,5 +189,82 @@ class GetResponseHeadersAction(NoParamsAction):
 	pass
 
 
+class GetCookieSecurityAction(NoParamsAction):
+	pass
+
+
 class CheckSensitiveEndpointAction(BaseModel):
 	path: str = Field(description='Path relative to current origin to probe, e.g. "/.git/HEAD" or "/.env"')
+
+
+# Named path lists for check_sensitive_endpoints, so the model doesn't have to spell out dozens of paths
+_SENSITIVE_FILES = (
+	'/.git/HEAD',
+	'/.git/config',
+	'/.env',
+	'/.env.local',
+	'/.env.production',
+	'/robots.txt',
+	'/.htaccess',
+	'/.htpasswd',
+	'/phpinfo.php',
+	'/admin',
+	'/backup.sql',
+	'/dump.sql',
+	'/db.sql',
+	'/wp-config.php',
+	'/.DS_Store',
+	'/web.config',
+	'/config.php',
+	'/configuration.php',
+)
+SENSITIVE_PATH_WORDLISTS: dict[str, tuple[str, ...]] = {
+	'sensitive-files': _SENSITIVE_FILES,
+	'extended': _SENSITIVE_FILES
+	+ (
+		'/.git/index',
+		'/.svn/entries',
+		'/.hg/requires',
+		'/.env.development',
+		'/.env.backup',
+		'/.npmrc',
+		'/.dockerenv',
+		'/docker-compose.yml',
+		'/Dockerfile',
+		'/composer.json',
+		'/package.json',
+		'/server-status',
+		'/info.php',
+		'/test.php',
+		'/backup.zip',
+		'/backup.tar.gz',
+		'/database.sql',
+		'/wp-config.php.bak',
+		'/config.php.bak',
+		'/.aws/credentials',
+		'/id_rsa',
+		'/sitemap.xml',
+		'/crossdomain.xml',
+		'/.well-known/security.txt',
+		'/swagger.json',
+		'/api-docs',
+		'/actuator/env',
+		'/debug',
+		'/administrator',
+		'/phpmyadmin',
+	),
+}
+
+
+class CheckSensitiveEndpointsAction(BaseModel):
+	paths: list[str] = Field(
+		default_factory=list, description='Paths relative to current origin to probe, e.g. ["/.git/HEAD", "/.env"]'
+	)
+	wordlist: Literal['sensitive-files', 'extended'] | None = Field(
+		default=None,
+		description='Also probe a built-in path list: "sensitive-files" (VCS, env, config, SQL dumps, admin), "extended" adds more',
+	)
+	method: Literal['GET', 'HEAD'] = Field(
+		default='GET', description='GET fingerprints bodies to filter soft-404 pages; HEAD is lighter but only compares length'
+	)
+	max_concurrency: int = Field(default=8, ge=1, le=32, description='Maximum requests in flight at once')
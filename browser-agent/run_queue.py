@@ -0,0 +1,261 @@
+"""Bounded, persistent run queue for the FastAPI server.
+
+Runs are admitted into per-tenant lanes grouped by priority. Higher priorities are always
+served first; within a priority, tenants are served round-robin and each tenant's runs in
+FIFO order, so one busy tenant can't starve the others. Queued runs are mirrored into a
+`RunStore` (SQLite by default) so they survive a process restart. A run stays in the store,
+marked as started, until `task_done()`; runs interrupted by a crash or shutdown are queued
+again by `restore()`.
+"""
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+DEFAULT_RUN_DURATION_SECONDS = 120.0
+
+
+@dataclass
+class QueuedRun:
+	run_id: str
+	url: str
+	task: str
+	max_steps: int = 100
+	system_extension: str | None = None
+	tenant: str = 'default'
+	priority: int = 0
+	enqueued_at: float = field(default_factory=time.time)
+
+
+class QueueFullError(Exception):
+	"""Raised when a run is submitted while the queue is at capacity."""
+
+	def __init__(self, retry_after: float):
+		super().__init__(f'Run queue is full, retry after {retry_after:.0f}s')
+		self.retry_after = retry_after
+
+
+class RunStore(Protocol):
+	"""Persistence backend for queued and running runs and historical run durations."""
+
+	def save(self, run: QueuedRun) -> None: ...
+
+	def mark_started(self, run_id: str) -> None: ...
+
+	def delete(self, run_id: str) -> None: ...
+
+	def load(self) -> list[QueuedRun]:
+		"""All stored runs, started or not, oldest first; marks them as queued again."""
+		...
+
+	def record_duration(self, seconds: float) -> None: ...
+
+	def recent_durations(self, limit: int) -> list[float]: ...
+
+
+class MemoryRunStore:
+	"""Non-persistent store, useful for tests or when durability isn't wanted."""
+
+	def __init__(self):
+		self._runs: dict[str, QueuedRun] = {}
+		self._durations: deque[float] = deque(maxlen=1000)
+
+	def save(self, run: QueuedRun) -> None:
+		self._runs[run.run_id] = run
+
+	def mark_started(self, run_id: str) -> None:
+		pass
+
+	def delete(self, run_id: str) -> None:
+		self._runs.pop(run_id, None)
+
+	def load(self) -> list[QueuedRun]:
+		return sorted(self._runs.values(), key=lambda run: run.enqueued_at)
+
+	def record_duration(self, seconds: float) -> None:
+		self._durations.append(seconds)
+
+	def recent_durations(self, limit: int) -> list[float]:
+		return list(self._durations)[-limit:]
+
+
+class SQLiteRunStore:
+	"""Stores queued runs and run durations in a local SQLite database."""
+
+	def __init__(self, path: str | Path):
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+		self._lock = threading.Lock()  # calls arrive from asyncio.to_thread workers
+		self._conn.execute('PRAGMA journal_mode=WAL')
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS queued_runs (run_id TEXT PRIMARY KEY, enqueued_at REAL, payload TEXT, status TEXT DEFAULT 'queued')"
+		)
+		columns = {row[1] for row in self._conn.execute('PRAGMA table_info(queued_runs)')}
+		if 'status' not in columns:  # databases created before runs were kept while running
+			self._conn.execute("ALTER TABLE queued_runs ADD COLUMN status TEXT DEFAULT 'queued'")
+		self._conn.execute('CREATE TABLE IF NOT EXISTS run_durations (id INTEGER PRIMARY KEY AUTOINCREMENT, seconds REAL)')
+
+	def save(self, run: QueuedRun) -> None:
+		with self._lock:
+			self._conn.execute(
+				"INSERT OR REPLACE INTO queued_runs (run_id, enqueued_at, payload, status) VALUES (?, ?, ?, 'queued')",
+				(run.run_id, run.enqueued_at, json.dumps(asdict(run))),
+			)
+
+	def mark_started(self, run_id: str) -> None:
+		with self._lock:
+			self._conn.execute("UPDATE queued_runs SET status = 'running' WHERE run_id = ?", (run_id,))
+
+	def delete(self, run_id: str) -> None:
+		with self._lock:
+			self._conn.execute('DELETE FROM queued_runs WHERE run_id = ?', (run_id,))
+
+	def load(self) -> list[QueuedRun]:
+		with self._lock:
+			self._conn.execute("UPDATE queued_runs SET status = 'queued' WHERE status = 'running'")
+			rows = self._conn.execute('SELECT payload FROM queued_runs ORDER BY enqueued_at').fetchall()
+		return [QueuedRun(**json.loads(payload)) for (payload,) in rows]
+
+	def record_duration(self, seconds: float) -> None:
+		with self._lock:
+			self._conn.execute('INSERT INTO run_durations (seconds) VALUES (?)', (seconds,))
+			# Keep the table from growing forever, only recent runs matter for estimates
+			self._conn.execute('DELETE FROM run_durations WHERE id <= (SELECT MAX(id) FROM run_durations) - 1000')
+
+	def recent_durations(self, limit: int) -> list[float]:
+		with self._lock:
+			rows = self._conn.execute('SELECT seconds FROM run_durations ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+		return [seconds for (seconds,) in rows]
+
+
+class RunScheduler:
+	"""Admission control and fair ordering for agent runs.
+
+	`submit()` rejects with `QueueFullError` once `max_queued` runs are waiting; `get()` blocks
+	until a run is available and returns the next one in priority / round-robin / FIFO order.
+	Every run returned by `get()` must be passed to `task_done()` once it finished; a run that
+	never is (e.g. the process stopped) is restored on the next start.
+	"""
+
+	def __init__(self, store: RunStore, max_queued: int, concurrency: int):
+		self.store = store
+		self.max_queued = max_queued
+		self.concurrency = max(1, concurrency)
+		# priority -> tenant -> FIFO of runs; tenant order rotates to give round-robin service
+		self._lanes: dict[int, OrderedDict[str, deque[QueuedRun]]] = {}
+		self._depth = 0
+		self._admitting = 0  # submissions being persisted, counted against max_queued
+		self._active = 0
+		self._available = asyncio.Condition()
+		self._avg_duration = self._load_avg_duration()
+
+	@property
+	def depth(self) -> int:
+		return self._depth
+
+	@property
+	def active(self) -> int:
+		return self._active
+
+	async def restore(self) -> list[QueuedRun]:
+		"""Re-enqueue runs persisted by a previous process, including ones it had started. Returns the restored runs."""
+		restored = await asyncio.to_thread(self.store.load)
+		async with self._available:
+			for run in restored:
+				self._push(run)
+			self._available.notify_all()
+		return restored
+
+	async def submit(self, run: QueuedRun) -> None:
+		if self._depth + self._admitting >= self.max_queued:
+			raise QueueFullError(retry_after=max(1.0, self._avg_duration / self.concurrency))
+		self._admitting += 1
+		try:
+			await asyncio.to_thread(self.store.save, run)
+		finally:
+			self._admitting -= 1
+		async with self._available:
+			self._push(run)
+			self._available.notify()
+
+	async def get(self) -> QueuedRun:
+		async with self._available:
+			while self._depth == 0:
+				await self._available.wait()
+			run = self._pop()
+			self._active += 1
+		await asyncio.to_thread(self.store.mark_started, run.run_id)
+		return run
+
+	async def task_done(self, run_id: str, duration_seconds: float | None) -> None:
+		"""Mark a run returned by `get()` as finished, recording its duration for wait estimates."""
+		self._active -= 1
+		await asyncio.to_thread(self.store.delete, run_id)
+		if duration_seconds is not None:
+			await asyncio.to_thread(self.store.record_duration, duration_seconds)
+			self._avg_duration = await asyncio.to_thread(self._load_avg_duration)
+
+	def position(self, run_id: str) -> int | None:
+		"""0-based position of a queued run in service order, or None if it isn't queued."""
+		for position, run in enumerate(self._service_order()):
+			if run.run_id == run_id:
+				return position
+		return None
+
+	def estimated_wait(self, position: int | None = None) -> float:
+		"""Estimated seconds until the run at `position` (default: the back of the queue) starts."""
+		ahead = self._depth if position is None else position
+		waiting_for_slot = ahead + self._active - self.concurrency + 1
+		if waiting_for_slot <= 0:
+			return 0.0
+		return math.ceil(waiting_for_slot / self.concurrency) * self._avg_duration
+
+	def stats(self) -> dict:
+		return {
+			'depth': self._depth,
+			'max_queued': self.max_queued,
+			'avg_run_seconds': round(self._avg_duration, 1),
+			'estimated_wait_seconds': round(self.estimated_wait(), 1),
+			'lanes': {
+				str(priority): {tenant: len(runs) for tenant, runs in tenants.items()}
+				for priority, tenants in sorted(self._lanes.items(), reverse=True)
+			},
+		}
+
+	def _load_avg_duration(self) -> float:
+		durations = self.store.recent_durations(50)
+		return sum(durations) / len(durations) if durations else DEFAULT_RUN_DURATION_SECONDS
+
+	def _push(self, run: QueuedRun) -> None:
+		tenants = self._lanes.setdefault(run.priority, OrderedDict())
+		tenants.setdefault(run.tenant, deque()).append(run)
+		self._depth += 1
+
+	def _pop(self) -> QueuedRun:
+		priority = max(self._lanes)
+		tenants = self._lanes[priority]
+		tenant, runs = next(iter(tenants.items()))
+		run = runs.popleft()
+		# Rotate the served tenant to the back of its priority lane
+		tenants.move_to_end(tenant)
+		if not runs:
+			del tenants[tenant]
+		if not tenants:
+			del self._lanes[priority]
+		self._depth -= 1
+		return run
+
+	def _service_order(self) -> list[QueuedRun]:
+		order: list[QueuedRun] = []
+		for priority in sorted(self._lanes, reverse=True):
+			queues = [list(runs) for runs in self._lanes[priority].values()]
+			for i in range(max(len(q) for q in queues)):
+				order.extend(q[i] for q in queues if i < len(q))
+		return order
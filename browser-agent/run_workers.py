@@ -0,0 +1,250 @@
+"""Multi-process execution of agent runs for the FastAPI server.
+
+When `RUN_WORKER_PROCESSES` > 0 the API process only does admission, run-state bookkeeping
+and fan-out of events/frames to clients. Each run is dispatched to one of N worker processes,
+every one with its own event loop and browser pool, so CPU-heavy DOM serialization or
+markdown extraction in one scan can't stall the CDP handling and SSE streams of the others.
+
+IPC is two `multiprocessing` queues per direction:
+- API -> worker (one queue per worker): ('run', run_fields) | ('message', run_id, text) | ('watch', run_id, bool) | None
+- worker -> API (shared): ('status', run_id, status) | ('event', run_id, event) | ('screenshot', run_id, b64)
+  | ('frame', run_id, jpeg_bytes, url) | ('finished', run_id, status, result, error)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from run_queue import QueuedRun
+
+logger = logging.getLogger(__name__)
+
+WorkerMessage = tuple[Any, ...]
+
+WORKER_CHECK_INTERVAL = 1.0  # seconds between liveness checks of the worker processes
+
+
+class ProcessRunExecutor:
+	"""Dispatches runs to a fixed set of worker processes and relays their messages back."""
+
+	def __init__(self, processes: int, on_message: Callable[[WorkerMessage], None]):
+		self.processes = processes
+		self._on_message = on_message
+		self._ctx = multiprocessing.get_context('spawn')  # fork is unsafe with a running event loop / threads
+		self._results = self._ctx.Queue()
+		self._commands: list[Any] = []
+		self._workers: list[BaseProcess | None] = []
+		self._assigned: dict[str, int] = {}  # run_id -> worker index
+		self._pending: dict[str, asyncio.Future] = {}
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._reader: threading.Thread | None = None
+		self._stopping = False
+
+	def start(self) -> None:
+		self._loop = asyncio.get_running_loop()
+		for index in range(self.processes):
+			self._commands.append(self._ctx.Queue())
+			self._workers.append(None)
+			self._spawn(index)
+		self._reader = threading.Thread(target=self._read_results, name='run-worker-results', daemon=True)
+		self._reader.start()
+
+	async def stop(self, timeout: float = 10.0) -> None:
+		self._stopping = True
+		for commands in self._commands:
+			commands.put(None)
+		for process in self._workers:
+			if process is None:
+				continue
+			await asyncio.to_thread(process.join, timeout)
+			if process.is_alive():
+				process.terminate()
+		for future in self._pending.values():
+			if not future.done():
+				future.cancel()
+
+	async def run(self, run: QueuedRun, messages: Iterable[str] = ()) -> None:
+		"""Execute a run on the least-loaded worker and wait until it finishes.
+
+		`messages` are user messages sent while the run was still queued; they are delivered right after the run.
+		"""
+		assert self._loop is not None, 'ProcessRunExecutor.start() must be called first'
+		loads = [0] * self.processes
+		for index in self._assigned.values():
+			loads[index] += 1
+		index = loads.index(min(loads))
+
+		future = self._loop.create_future()
+		self._pending[run.run_id] = future
+		self._assigned[run.run_id] = index
+		self._commands[index].put(('run', asdict(run)))
+		for content in messages:
+			self._commands[index].put(('message', run.run_id, content))
+		try:
+			await future
+		finally:
+			self._pending.pop(run.run_id, None)
+			self._assigned.pop(run.run_id, None)
+
+	def send_message(self, run_id: str, content: str) -> bool:
+		index = self._assigned.get(run_id)
+		if index is None:
+			return False
+		self._commands[index].put(('message', run_id, content))
+		return True
+
+	def watch(self, run_id: str, enabled: bool) -> None:
+		"""Ask the owning worker to start/stop forwarding screencast frames for a run."""
+		index = self._assigned.get(run_id)
+		if index is not None:
+			self._commands[index].put(('watch', run_id, enabled))
+
+	def _spawn(self, index: int) -> None:
+		process = self._ctx.Process(
+			target=_worker_main,
+			args=(index, self._commands[index], self._results),
+			name=f'run-worker-{index}',
+			daemon=True,
+		)
+		process.start()
+		self._workers[index] = process
+		logger.info(f'Started run worker {index} (pid={process.pid})')
+
+	def _read_results(self) -> None:
+		"""Blocking reader thread: hands every worker message to the event loop, and watches for dead workers."""
+		assert self._loop is not None
+		last_check = time.monotonic()
+		while not self._stopping:
+			# Checked on a timer rather than only when the queue is idle: other workers' traffic must not hide a dead one
+			if time.monotonic() - last_check >= WORKER_CHECK_INTERVAL:
+				last_check = time.monotonic()
+				self._loop.call_soon_threadsafe(self._check_workers)
+			try:
+				message = self._results.get(timeout=WORKER_CHECK_INTERVAL)
+			except queue.Empty:
+				continue
+			except (EOFError, OSError):
+				return
+			self._loop.call_soon_threadsafe(self._dispatch, message)
+
+	def _dispatch(self, message: WorkerMessage) -> None:
+		try:
+			self._on_message(message)
+		except Exception as e:
+			logger.error(f'Error handling worker message {message[0]!r}: {type(e).__name__}: {e}')
+		if message[0] == 'finished':
+			future = self._pending.get(message[1])
+			if future is not None and not future.done():
+				future.set_result(None)
+
+	def _check_workers(self) -> None:
+		if self._stopping:
+			return
+		for index, process in enumerate(self._workers):
+			if process is None or process.is_alive():
+				continue
+			logger.error(f'Run worker {index} died (exitcode={process.exitcode}), failing its runs and respawning')
+			for run_id, assigned in list(self._assigned.items()):
+				if assigned == index:
+					self._dispatch(('finished', run_id, 'error', None, f'Worker process exited with code {process.exitcode}'))
+			self._spawn(index)
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+
+def _worker_main(index: int, commands: Any, results: Any) -> None:
+	asyncio.run(_worker_loop(index, commands, results))
+
+
+async def _worker_loop(index: int, commands: Any, results: Any) -> None:
+	# Imported here, not from `server`, so the child only builds its own browser pool (no run store, no API app)
+	import agent_runner
+	from browser_agent.llm.client_pool import llm_client_pool
+
+	agent_runner.configure_dom_cache()
+	browser_pool = agent_runner.create_browser_pool()
+	await browser_pool.start()
+	runs: dict[str, agent_runner.RunState] = {}
+	run_tasks: set[asyncio.Task] = set()
+	frame_tasks: dict[str, asyncio.Task] = {}
+
+	async def execute(run: QueuedRun, state: agent_runner.RunState) -> None:
+		results.put(('status', run.run_id, 'running'))
+		forwarder = asyncio.create_task(_forward_events(run.run_id, state, results))
+		try:
+			await agent_runner.run_agent(state, browser_pool, run.url, run.task, run.max_steps, run.system_extension)
+			await asyncio.wait_for(forwarder, timeout=5.0)
+		except Exception as e:
+			state.status, state.error = 'error', state.error or str(e)
+		finally:
+			forwarder.cancel()
+			frame_task = frame_tasks.pop(run.run_id, None)
+			if frame_task:
+				frame_task.cancel()
+			runs.pop(run.run_id, None)
+			results.put(('finished', run.run_id, state.status, state.result, state.error))
+
+	while True:
+		command = await asyncio.to_thread(commands.get)
+		if command is None:
+			break
+		kind = command[0]
+		if kind == 'run':
+			run = QueuedRun(**command[1])
+			# Registered before the next command is read, so messages that follow the run find it
+			runs[run.run_id] = agent_runner.RunState(status='queued')
+			task = asyncio.create_task(execute(run, runs[run.run_id]))
+			run_tasks.add(task)
+			task.add_done_callback(run_tasks.discard)
+		elif kind == 'message':
+			state = runs.get(command[1])
+			if state is not None:
+				state.message_queue.put_nowait(command[2])
+		elif kind == 'watch':
+			run_id, enabled = command[1], command[2]
+			existing = frame_tasks.pop(run_id, None)
+			if existing:
+				existing.cancel()
+			if enabled and run_id in runs:
+				frame_tasks[run_id] = asyncio.create_task(_forward_frames(run_id, runs[run_id], results))
+
+	for task in [*run_tasks, *frame_tasks.values()]:
+		task.cancel()
+	await browser_pool.close()
+	await llm_client_pool.aclose()
+
+
+async def _forward_events(run_id: str, state: Any, results: Any) -> None:
+	last_screenshot: str | None = None
+	while True:
+		event = await state.events.get()
+		if state.screenshot_b64 is not None and state.screenshot_b64 is not last_screenshot:
+			last_screenshot = state.screenshot_b64
+			results.put(('screenshot', run_id, last_screenshot))
+		results.put(('event', run_id, event))
+		if event.get('type') in ('done', 'error'):
+			return
+
+
+async def _forward_frames(run_id: str, state: Any, results: Any) -> None:
+	while True:
+		session = state.browser_session
+		if session is None:
+			await asyncio.sleep(0.5)
+			continue
+		# One relay subscription per run; the API process fans frames out to its viewers
+		async with session.frame_hub.subscribe() as subscription:
+			while state.browser_session is session:
+				frame = await subscription.get(timeout=0.5)
+				if frame:
+					results.put(('frame', run_id, frame.data, frame.url))
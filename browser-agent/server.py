@@ -1,14 +1,15 @@
 """Minimal FastAPI wrapper around browser-agent Agent."""
 
 import asyncio
+import base64
 import json
 import logging
+import math
 import os
 import re
 import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from dataclasses import dataclass, field
 from pathlib import Path
 from uuid import uuid4
 
@@ -19,17 +20,35 @@ from pydantic import BaseModel
 
 load_dotenv()
 
-from browser_agent.agent.service import Agent
-from browser_agent.agent.views import AgentOutput
-from browser_agent.browser.session import BrowserSession
-from browser_agent.browser.views import BrowserStateSummary
+from agent_runner import RunState, configure_dom_cache, create_browser_pool, run_agent
+from browser_agent.browser.pool import BrowserPool
+from browser_agent.llm.client_pool import llm_client_pool
+from run_queue import MemoryRunStore, QueuedRun, QueueFullError, RunScheduler, RunStore, SQLiteRunStore
+from run_workers import ProcessRunExecutor, WorkerMessage
 
 logger = logging.getLogger(__name__)
 
 MAX_CONCURRENT_RUNS = int(os.getenv('MAX_CONCURRENT_RUNS', '5'))
 RUN_TTL_SECONDS = int(os.getenv('RUN_TTL_SECONDS', '300'))
+RUN_QUEUE_MAX_SIZE = int(os.getenv('RUN_QUEUE_MAX_SIZE', '100'))
+RUN_QUEUE_BACKEND = os.getenv('RUN_QUEUE_BACKEND', 'sqlite')  # "sqlite" | "memory"
+RUN_QUEUE_DB_PATH = os.getenv('RUN_QUEUE_DB_PATH', str(Path(__file__).parent / 'data' / 'run_queue.sqlite3'))
+RUN_WORKER_PROCESSES = int(os.getenv('RUN_WORKER_PROCESSES', '0'))  # 0 = run agents in the API process
 
-run_semaphore = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+
+def _create_run_store() -> RunStore:
+	if RUN_QUEUE_BACKEND == 'memory':
+		return MemoryRunStore()
+	if RUN_QUEUE_BACKEND == 'sqlite':
+		return SQLiteRunStore(RUN_QUEUE_DB_PATH)
+	raise RuntimeError(f'Unknown RUN_QUEUE_BACKEND: {RUN_QUEUE_BACKEND!r} (expected "sqlite" or "memory")')
+
+
+scheduler: RunScheduler | None = None  # set in lifespan, so importing the module opens no database
+# Browsers live in the worker processes when there are any, each with its own pool
+browser_pool: BrowserPool | None = create_browser_pool() if RUN_WORKER_PROCESSES == 0 else None
+run_executor: ProcessRunExecutor | None = None  # set in lifespan when RUN_WORKER_PROCESSES > 0
+configure_dom_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -51,11 +70,54 @@ async def _cleanup_completed_runs() -> None:
 			logger.info(f'Cleaned up expired run {run_id}')
 
 
+async def _run_worker(scheduler: RunScheduler) -> None:
+	while True:
+		run = await scheduler.get()
+		started_at = time.time()
+		try:
+			state = runs[run.run_id]
+			if run_executor is not None:
+				# Hand messages sent while the run was queued over to the worker along with the run
+				pending = [state.message_queue.get_nowait() for _ in range(state.message_queue.qsize())]
+				await run_executor.run(run, pending)
+			else:
+				assert browser_pool is not None
+				await run_agent(state, browser_pool, run.url, run.task, run.max_steps, run.system_extension)
+		except Exception:
+			await scheduler.task_done(run.run_id, None)
+			raise
+		# A run cancelled by shutdown never gets here: it stays in the store and is restored on the next start
+		state = runs.get(run.run_id)
+		await scheduler.task_done(run.run_id, time.time() - started_at if state and state.status == 'done' else None)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+	global scheduler, run_executor
+	scheduler = RunScheduler(_create_run_store(), max_queued=RUN_QUEUE_MAX_SIZE, concurrency=MAX_CONCURRENT_RUNS)
+	# Runs queued or running at the last shutdown/crash are picked up again
+	for run in await scheduler.restore():
+		runs[run.run_id] = RunState(status='queued')
+		logger.info(f'Restored queued run {run.run_id}')
+
 	cleanup_task = asyncio.create_task(_cleanup_completed_runs())
+	if RUN_WORKER_PROCESSES > 0:
+		run_executor = ProcessRunExecutor(RUN_WORKER_PROCESSES, on_message=_apply_worker_message)
+		run_executor.start()
+	else:
+		assert browser_pool is not None
+		await browser_pool.start()
+	workers = [asyncio.create_task(_run_worker(scheduler)) for _ in range(MAX_CONCURRENT_RUNS)]
 	yield
+	for worker in workers:
+		worker.cancel()
 	cleanup_task.cancel()
+	if run_executor is not None:
+		await run_executor.stop()
+	elif browser_pool is not None:
+		await browser_pool.close()
+		# Runs share LLM connections between each other, they are only closed on shutdown
+		await llm_client_pool.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -65,162 +127,30 @@ app = FastAPI(lifespan=lifespan)
 # In-memory run store
 # ---------------------------------------------------------------------------
 
-
-@dataclass
-class RunState:
-	status: str  # "queued" | "running" | "done" | "error"
-	screenshot_b64: str | None = None
-	events: asyncio.Queue = field(default_factory=asyncio.Queue)
-	message_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
-	result: str | None = None
-	error: str | None = None
-	browser_session: BrowserSession | None = None
-	completed_at: float = 0.0
-
-
 runs: dict[str, RunState] = {}
 
 
-# ---------------------------------------------------------------------------
-# LLM factory
-# ---------------------------------------------------------------------------
-
-
-def get_llm():
-	if os.getenv('OPENAI_API_KEY'):
-		from browser_agent.llm.openai.chat import ChatOpenAI
-
-		return ChatOpenAI(model='gpt-5.1')
-	if os.getenv('ANTHROPIC_API_KEY'):
-		from browser_agent.llm.anthropic.chat import ChatAnthropic
-
-		return ChatAnthropic(model='claude-sonnet-4-5')
-	raise RuntimeError('No LLM API key found. Set OPENAI_API_KEY or ANTHROPIC_API_KEY.')
-
-
-# ---------------------------------------------------------------------------
-# Background agent task
-# ---------------------------------------------------------------------------
-
-
-async def _run_agent(run_id: str, url: str, task: str, max_steps: int = 100, system_extension: str | None = None) -> None:
-	state = runs[run_id]
-	async with run_semaphore:
-		state.status = 'running'
-		agent_ref: list = [None]
-
-		async def register_new_step_callback(
-			browser_state: BrowserStateSummary,
-			agent_output: AgentOutput,
-			step_n: int,
-		) -> None:
-			state.screenshot_b64 = browser_state.screenshot
-
-			# Drain pending user messages and inject into agent
-			while not state.message_queue.empty():
-				msg: str = state.message_queue.get_nowait()
-				if agent_ref[0] is not None:
-					agent_ref[0].message_manager.add_new_task(msg)
-				await state.events.put(
-					{
-						'type': 'user_message',
-						'content': msg,
-						'timestamp': time.time(),
-					}
-				)
-
-		async def register_step_finalized_callback(
-			agent_output: AgentOutput,
-			step_n: int,
-			post_action_url: str,
-		) -> None:
-			# Extract action details
-			action_data = agent_output.action[0] if agent_output.action else None
-			action_name = 'unknown'
-			action_params = {}
-			action_display = 'No action'
-
-			if action_data:
-				action_dict = action_data.model_dump(exclude_unset=True)
-				if action_dict:
-					action_name = list(action_dict.keys())[0]
-					action_params = action_dict[action_name]
-
-					if action_name == 'click':
-						idx = action_params.get('index', 'unknown')
-						action_display = f'Clicked element #{idx}'
-					elif action_name == 'input':
-						idx = action_params.get('index', 'unknown')
-						text = action_params.get('text', '')
-						action_display = f'Typed "{text}" into element #{idx}'
-					elif action_name == 'go_to_url':
-						nav_url = action_params.get('url', '')
-						action_display = f'Navigated to {nav_url}'
-					elif action_name == 'scroll':
-						direction = 'down' if action_params.get('down', True) else 'up'
-						action_display = f'Scrolled {direction}'
-					elif action_name == 'wait':
-						action_display = 'Waited for page to load'
-					elif action_name == 'go_back':
-						action_display = 'Went back to previous page'
-					else:
-						action_display = f'Performed {action_name}'
-
-			event = {
-				'type': 'step',
-				'step': step_n,
-				'timestamp': time.time(),
-				'thinking': agent_output.thinking,
-				'action': {
-					'name': action_name,
-					'params': action_params,
-					'display': action_display,
-				},
-				'context': {
-					'url': post_action_url,
-					'title': '',
-				},
-			}
-
-			await state.events.put(event)
-
-		try:
-			browser_session = BrowserSession(headless=True)
-			state.browser_session = browser_session
-
-			agent = Agent(
-				task=task,
-				llm=get_llm(),
-				browser_session=browser_session,
-				register_new_step_callback=register_new_step_callback,
-				register_step_finalized_callback=register_step_finalized_callback,
-				extend_system_message=system_extension,
-			)
-			agent_ref[0] = agent
-			result = await agent.run(max_steps=max_steps)
-			state.result = result.final_result()
-			state.status = 'done'
-			state.completed_at = time.time()
-			await state.events.put(
-				{
-					'type': 'done',
-					'result': state.result,
-					'timestamp': time.time(),
-				}
-			)
-		except Exception as exc:
-			state.error = str(exc)
-			state.status = 'error'
-			state.completed_at = time.time()
-			await state.events.put(
-				{
-					'type': 'error',
-					'message': state.error,
-					'timestamp': time.time(),
-				}
-			)
-		finally:
-			state.browser_session = None
+def _apply_worker_message(message: WorkerMessage) -> None:
+	"""Mirror state reported by a worker process onto the API-side RunState."""
+	kind, run_id = message[0], message[1]
+	state = runs.get(run_id)
+	if state is None:
+		return
+	if kind == 'status':
+		state.status = message[2]
+	elif kind == 'event':
+		state.events.put_nowait(message[2])
+	elif kind == 'screenshot':
+		state.screenshot_b64 = message[2]
+	elif kind == 'frame':
+		state.remote_frames.publish(message[2], message[3])
+	elif kind == 'finished':
+		state.status, state.result, state.error = message[2], message[3], message[4]
+		state.completed_at = time.time()
+		state.remote_frames.close()
+		if state.status == 'error' and state.error and state.events.empty():
+			# The worker died before it could report the error event itself
+			state.events.put_nowait({'type': 'error', 'message': state.error, 'timestamp': time.time()})
 
 
 # ---------------------------------------------------------------------------
@@ -247,6 +177,8 @@ class RunRequest(BaseModel):
 	task: str | None = None
 	skill: str | None = None
 	max_steps: int = 100
+	tenant: str = 'default'
+	priority: int = 0  # higher runs first
 
 
 @app.post('/runs', status_code=202)
@@ -262,21 +194,48 @@ async def create_run(body: RunRequest):
 		task = body.task
 	else:
 		raise HTTPException(status_code=422, detail='Either task or skill must be provided')
+	assert scheduler is not None
 	run_id = str(uuid4())
 	runs[run_id] = RunState(status='queued')
-	asyncio.create_task(_run_agent(run_id, body.url, task, body.max_steps, system_extension))
-	return {'run_id': run_id, 'status': 'queued'}
+	run = QueuedRun(
+		run_id=run_id,
+		url=body.url,
+		task=task,
+		max_steps=body.max_steps,
+		system_extension=system_extension,
+		tenant=body.tenant,
+		priority=body.priority,
+	)
+	try:
+		await scheduler.submit(run)
+	except QueueFullError as exc:
+		runs.pop(run_id, None)
+		raise HTTPException(status_code=429, detail=str(exc), headers={'Retry-After': str(math.ceil(exc.retry_after))}) from exc
+	position = scheduler.position(run_id)
+	return {
+		'run_id': run_id,
+		'status': 'queued',
+		'queue_position': position,
+		'estimated_wait_seconds': round(scheduler.estimated_wait(position), 1),
+	}
 
 
 @app.get('/runs')
 async def list_runs():
+	assert scheduler is not None
 	return {
 		'max_concurrent': MAX_CONCURRENT_RUNS,
+		# In worker-process mode the pools live in the workers and are not reported here
+		'browser_pool': {'size': browser_pool.size, 'idle': browser_pool.idle, 'max_size': browser_pool.max_size}
+		if browser_pool is not None
+		else None,
 		'active': sum(1 for s in runs.values() if s.status == 'running'),
-		'queued': sum(1 for s in runs.values() if s.status == 'queued'),
+		'queued': scheduler.depth,
+		'queue': scheduler.stats(),
 		'runs': {
 			run_id: {
 				'status': state.status,
+				'queue_position': scheduler.position(run_id) if state.status == 'queued' else None,
 				'has_result': state.result is not None,
 				'has_error': state.error is not None,
 				'completed_at': state.completed_at,
@@ -297,6 +256,9 @@ async def send_message(run_id: str, body: MessageRequest):
 		raise HTTPException(status_code=404, detail='Run not found')
 	if state.status not in ('running', 'queued'):
 		raise HTTPException(status_code=400, detail='Run is not in running or queued state')
+	if run_executor is not None and run_executor.send_message(run_id, body.content):
+		return {'ok': True}
+	# Queued runs pick these up when they start (in worker mode they are forwarded to the worker with the run)
 	await state.message_queue.put(body.content)
 	return {'ok': True}
 
@@ -328,42 +290,58 @@ async def stream_events(run_id: str):
 
 
 @app.websocket('/runs/{run_id}/stream/frames')
-async def stream_frames(websocket: WebSocket, run_id: str):
-	"""WebSocket endpoint for streaming browser frames in real-time."""
+async def stream_frames(websocket: WebSocket, run_id: str, encoding: str = 'binary'):
+	"""WebSocket endpoint for streaming browser frames in real-time.
+
+	Every viewer gets its own subscription, so concurrent viewers don't split the frame rate.
+	With `encoding=binary` (default) each frame is a JSON `frame` header message followed by
+	the raw JPEG as a binary message; `encoding=json` sends the base64 JPEG inline in `data`.
+	"""
 	state = runs.get(run_id)
 	if state is None:
 		await websocket.close(code=404, reason='Run not found')
 		return
 
-	if state.browser_session is None:
+	remote = run_executor is not None
+	if (state.status != 'running') if remote else (state.browser_session is None):
 		await websocket.close(code=400, reason='Browser session not ready')
 		return
 
 	await websocket.accept()
 
-	frame_count = 0
-	last_frame_time = time.time()
+	# The run may have finished and released its browser while the handshake was completing
+	browser_session = state.browser_session
+	if not remote and browser_session is None:
+		await websocket.close(code=1011, reason='Browser session closed')
+		return
+
+	if run_executor is not None:
+		hub = state.remote_frames
+		if hub.subscriber_count == 0:
+			run_executor.watch(run_id, True)
+	else:
+		assert browser_session is not None
+		hub = browser_session.frame_hub
+	subscription = hub.subscribe()
 
 	try:
 		while True:
-			frame = await state.browser_session.get_streaming_frame(timeout=0.5)
+			frame = await subscription.get(timeout=0.5)
 
 			if frame:
-				current_time = time.time()
-				frame_count += 1
-				current_url = await state.browser_session.get_current_page_url()
-
-				await websocket.send_json(
-					{
-						'type': 'frame',
-						'data': frame,
-						'timestamp': current_time,
-						'frame_number': frame_count,
-						'latency_ms': int((current_time - last_frame_time) * 1000),
-						'url': current_url,
-					}
-				)
-				last_frame_time = current_time
+				header = {
+					'type': 'frame',
+					'timestamp': frame.timestamp,
+					'frame_number': frame.seq,
+					'latency_ms': int((time.time() - frame.timestamp) * 1000),
+					'url': frame.url,
+					'dropped': subscription.dropped,
+				}
+				if encoding == 'json':
+					await websocket.send_json({**header, 'data': base64.b64encode(frame.data).decode('ascii')})
+				else:
+					await websocket.send_json({**header, 'size': len(frame.data)})
+					await websocket.send_bytes(frame.data)
 
 			if state.status in ('done', 'error'):
 				break
@@ -381,4 +359,7 @@ async def stream_frames(websocket: WebSocket, run_id: str):
 		except Exception:
 			pass
 	finally:
+		subscription.close()
+		if remote and hub.subscriber_count == 0 and run_executor is not None:
+			run_executor.watch(run_id, False)
 		await websocket.close()
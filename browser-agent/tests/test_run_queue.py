@@ -0,0 +1,86 @@
+"""Tests for the server run queue: ordering, admission control and persistence."""
+
+import pytest
+
+from run_queue import MemoryRunStore, QueuedRun, QueueFullError, RunScheduler, SQLiteRunStore
+
+
+def _run(run_id: str, tenant: str = 'default', priority: int = 0, enqueued_at: float = 0.0) -> QueuedRun:
+	return QueuedRun(
+		run_id=run_id, url='https://example.com', task='task', tenant=tenant, priority=priority, enqueued_at=enqueued_at
+	)
+
+
+async def _drain(scheduler: RunScheduler) -> list[str]:
+	order = []
+	while scheduler.depth:
+		run = await scheduler.get()
+		order.append(run.run_id)
+		await scheduler.task_done(run.run_id, None)
+	return order
+
+
+async def test_higher_priority_runs_are_served_first():
+	scheduler = RunScheduler(MemoryRunStore(), max_queued=10, concurrency=1)
+	await scheduler.submit(_run('low', priority=0))
+	await scheduler.submit(_run('high', priority=5))
+	await scheduler.submit(_run('mid', priority=1))
+
+	assert await _drain(scheduler) == ['high', 'mid', 'low']
+
+
+async def test_tenants_are_served_round_robin_and_each_tenant_fifo():
+	scheduler = RunScheduler(MemoryRunStore(), max_queued=10, concurrency=1)
+	for run_id in ('a1', 'a2', 'a3'):
+		await scheduler.submit(_run(run_id, tenant='a'))
+	for run_id in ('b1', 'b2'):
+		await scheduler.submit(_run(run_id, tenant='b'))
+
+	assert [scheduler.position(run_id) for run_id in ('a1', 'b1', 'a2', 'b2', 'a3')] == [0, 1, 2, 3, 4]
+	assert await _drain(scheduler) == ['a1', 'b1', 'a2', 'b2', 'a3']
+
+
+async def test_submit_rejects_when_full():
+	scheduler = RunScheduler(MemoryRunStore(), max_queued=2, concurrency=2)
+	await scheduler.submit(_run('r1'))
+	await scheduler.submit(_run('r2'))
+
+	with pytest.raises(QueueFullError) as exc_info:
+		await scheduler.submit(_run('r3'))
+
+	assert exc_info.value.retry_after >= 1.0
+	assert scheduler.position('r3') is None
+	assert scheduler.depth == 2
+
+
+async def test_started_runs_stay_persisted_until_task_done(tmp_path):
+	store = SQLiteRunStore(tmp_path / 'queue.sqlite3')
+	scheduler = RunScheduler(store, max_queued=10, concurrency=1)
+	await scheduler.submit(_run('r1', enqueued_at=1.0))
+	await scheduler.submit(_run('r2', enqueued_at=2.0))
+
+	started = await scheduler.get()
+
+	assert started.run_id == 'r1'
+	assert [run.run_id for run in SQLiteRunStore(tmp_path / 'queue.sqlite3').load()] == ['r1', 'r2']
+
+	await scheduler.task_done(started.run_id, 30.0)
+
+	assert [run.run_id for run in store.load()] == ['r2']
+	assert store.recent_durations(10) == [30.0]
+
+
+async def test_restore_requeues_runs_interrupted_while_running(tmp_path):
+	path = tmp_path / 'queue.sqlite3'
+	previous = RunScheduler(SQLiteRunStore(path), max_queued=10, concurrency=1)
+	await previous.submit(_run('running', tenant='a', priority=1, enqueued_at=1.0))
+	await previous.submit(_run('queued', tenant='b', enqueued_at=2.0))
+	await previous.get()  # the process stops before task_done()
+
+	scheduler = RunScheduler(SQLiteRunStore(path), max_queued=10, concurrency=1)
+	restored = await scheduler.restore()
+
+	assert [run.run_id for run in restored] == ['running', 'queued']
+	assert restored[0].tenant == 'a' and restored[0].priority == 1
+	assert await _drain(scheduler) == ['running', 'queued']
+	assert SQLiteRunStore(path).load() == []